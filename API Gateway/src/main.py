@@ -1,39 +1,73 @@
 import asyncio
+from contextlib import asynccontextmanager
 
-import httpx
 from fastapi import FastAPI, Request
 from fastapi.openapi.utils import get_openapi
 
 from utils.config import load_config
 from utils.proxy import forward
+from utils.response_cache import ResponseCache
+from utils.upstreams import Upstream, UpstreamRegistry
 
-app = FastAPI(title="Gateway", version="1.0.0", docs_url="/")
-settings = load_config()
 
-FILES_API_URL = f"{settings.FILES_API_URL}/openapi.json"
-ANALYSIS_API_URL = f"{settings.ANALYSIS_API_URL}/openapi.json"
+async def fetch_openapi_schema(upstream: Upstream) -> dict:
+    response = await upstream.send(
+        lambda endpoint: upstream.client.build_request("GET", f"{endpoint.base_url}/openapi.json"),
+        retryable=True,
+    )
+    try:
+        await response.aread()
+        return response.json()
+    finally:
+        await response.aclose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    config = load_config()
+    upstreams = UpstreamRegistry(config)
+    app.state.upstreams = upstreams
+    app.state.response_cache = ResponseCache(config.response_cache)
+    upstreams.start()
+    try:
+        app.state.files_openapi, app.state.analysis_openapi = await asyncio.gather(
+            fetch_openapi_schema(upstreams.files),
+            fetch_openapi_schema(upstreams.analysis),
+        )
+        yield
+    finally:
+        app.state.response_cache.clear()
+        await upstreams.close()
+
+
+app = FastAPI(title="Gateway", version="1.0.0", docs_url="/", lifespan=lifespan)
 
 
 @app.api_route("/analysis/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"], include_in_schema=False)
 async def analysis_proxy(path: str, request: Request):
-    return await forward(request, settings.ANALYSIS_API_URL, lambda p: f"/{path}")
+    return await forward(
+        request, request.app.state.upstreams.analysis, lambda p: f"/{path}", request.app.state.response_cache
+    )
 
 
 @app.api_route("/files/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"], include_in_schema=False)
 async def files_proxy(path: str, request: Request):
-    return await forward(request, settings.FILES_API_URL, lambda p: f"/{path}")
+    return await forward(
+        request, request.app.state.upstreams.files, lambda p: f"/{path}", request.app.state.response_cache
+    )
 
 
-@app.on_event("startup")
-async def fetch_openapi_schemas():
-    # ...
-    async with httpx.AsyncClient() as client:
-        files_schema, analysis_schema = await asyncio.gather(
-            client.get(FILES_API_URL),
-            client.get(ANALYSIS_API_URL),
-        )
-    app.state.files_openapi = files_schema.json()
-    app.state.analysis_openapi = analysis_schema.json()
+@app.get("/metrics/response_cache", include_in_schema=False)
+async def response_cache_metrics(request: Request):
+    cache = request.app.state.response_cache
+    if not cache.enabled:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/metrics/upstreams", include_in_schema=False)
+async def upstreams_metrics(request: Request):
+    return {upstream.name: upstream.stats() for upstream in request.app.state.upstreams}
 
 
 def custom_openapi():
@@ -4,7 +4,7 @@ from pathlib import Path
 
 import yaml
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent  # путь до корня проекта
 CONFIG_PATH = BASE_DIR / 'config.yaml'
@@ -29,27 +29,101 @@ def load_yaml_config(path: str = CONFIG_PATH):
     return resolve_env_vars(raw)
 
 
-class AnalysisConfig(BaseModel):
-    host: str
-    port: int
+class RouteTimeoutConfig(BaseModel):
+    # префикс пути в апстриме, самый длинный совпавший побеждает
+    path_prefix: str
+    read_timeout: float
 
 
-class StoreConfig(BaseModel):
+class EndpointConfig(BaseModel):
     host: str
     port: int
 
 
+class HealthCheckConfig(BaseModel):
+    path: str = "/health_check"
+    interval: float = 5.0
+    timeout: float = 2.0
+    # сколько проверок подряд нужно, чтобы сменить состояние реплики
+    unhealthy_threshold: int = 2
+    healthy_threshold: int = 1
+
+
+class OutlierDetectionConfig(BaseModel):
+    # ошибок подряд (соединение или 5xx) до исключения реплики из балансировки
+    consecutive_failures: int = 5
+    # время исключения растёт с каждым повторным исключением
+    base_ejection_time: float = 30.0
+    max_ejection_percent: int = 50
+
+
+class ConcurrencyLimitConfig(BaseModel):
+    initial_limit: int = 20
+    min_limit: int = 1
+    max_limit: int = 200
+    # ответ медленнее порога считается признаком перегрузки
+    latency_threshold: float = 5.0
+    backoff_ratio: float = 0.75
+    # сколько запросов может ждать свободного места и как долго
+    max_queue: int = 50
+    queue_timeout: float = 2.0
+
+
+class CircuitBreakerConfig(BaseModel):
+    failure_threshold: int = 10
+    open_time: float = 15.0
+    half_open_requests: int = 1
+
+
+class UpstreamConfig(BaseModel):
+    endpoints: list[EndpointConfig] = Field(min_length=1)
+    health_check: HealthCheckConfig = HealthCheckConfig()
+    outlier_detection: OutlierDetectionConfig = OutlierDetectionConfig()
+    # повторы идемпотентных запросов без тела на другой реплике
+    retries: int = 1
+    concurrency_limit: ConcurrencyLimitConfig = ConcurrencyLimitConfig()
+    circuit_breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    # сколько запрос ждёт свободного соединения из пула
+    pool_timeout: float = 5.0
+    routes: list[RouteTimeoutConfig] = []
+
+
+class AnalysisConfig(UpstreamConfig):
+    # анализ с построением облака слов бывает долгим
+    read_timeout: float = 120.0
+
+
+class StoreConfig(UpstreamConfig):
+    pass
+
+
+class CacheRuleConfig(BaseModel):
+    # регулярное выражение для пути запроса к шлюзу
+    path_pattern: str
+    ttl: float
+    # учитывать ли query string в ключе кэша
+    vary_query: bool = False
+    # заголовки запроса, от которых зависит ответ апстрима
+    vary_headers: list[str] = []
+
+
+class ResponseCacheConfig(BaseModel):
+    # 0 — кэш выключен
+    max_bytes: int = 0
+    max_item_bytes: int = 1024 * 1024
+    rules: list[CacheRuleConfig] = []
+
+
 class Config(BaseModel):
     analysis_service: AnalysisConfig
     store_service: StoreConfig
-
-    @property
-    def ANALYSIS_API_URL(self):
-        return f"http://{self.analysis_service.host}:{self.analysis_service.port}"
-
-    @property
-    def FILES_API_URL(self):
-        return f"http://{self.store_service.host}:{self.store_service.port}"
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
 
 
 def load_config() -> Config:
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from utils.config import CircuitBreakerConfig, ConcurrencyLimitConfig
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamOverloadedError(Exception):
+    """Запрос отклонён шлюзом, не дойдя до апстрима."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Апстрим перегружен, повторите через {retry_after:.0f} с")
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """
+    Ограничение числа одновременных запросов к апстриму по схеме AIMD:
+    быстрый успешный ответ увеличивает лимит примерно на единицу за «окно» из limit запросов,
+    признак перегрузки (таймаут, 429/503/504, медленный ответ) уменьшает его в backoff_ratio раз.
+    Запросы сверх лимита ждут в очереди ограниченной длины не дольше queue_timeout.
+    """
+
+    def __init__(self, config: ConcurrencyLimitConfig):
+        self.config = config
+        self.limit = float(config.initial_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._decreased_at = 0.0
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.config.max_queue:
+            raise UpstreamOverloadedError(retry_after=self.config.queue_timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.config.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            raise UpstreamOverloadedError(retry_after=self.config.queue_timeout)
+        except asyncio.CancelledError:
+            # место могли успеть отдать прямо перед отменой
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def on_sample(self, started_at: float, overloaded: bool) -> None:
+        latency = time.monotonic() - started_at
+        if not overloaded and latency <= self.config.latency_threshold:
+            self.limit = min(self.config.max_limit, self.limit + 1 / self.limit)
+            self._wake()
+        # запросы, отправленные до последнего снижения, лимит повторно не снижают
+        elif started_at >= self._decreased_at:
+            self.limit = max(self.config.min_limit, self.limit * self.config.backoff_ratio)
+            self._decreased_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"limit": int(self.limit), "in_flight": self.in_flight, "queued": len(self._waiters)}
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class CircuitBreaker:
+    """
+    После failure_threshold ошибок подряд запросы к апстриму отклоняются сразу на open_time секунд.
+    Затем пропускается half_open_requests пробных запросов: успех закрывает цепь, ошибка снова её размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, config: CircuitBreakerConfig):
+        self.name = name
+        self.config = config
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    def allow(self) -> bool:
+        """Возвращает True, если запрос пропущен как пробный."""
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.config.open_time - time.monotonic()
+            if remaining > 0:
+                raise UpstreamOverloadedError(retry_after=remaining)
+            self.state = self.HALF_OPEN
+            self._probes = 0
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.config.half_open_requests:
+                raise UpstreamOverloadedError(retry_after=self.config.open_time)
+            self._probes += 1
+            return True
+        return False
+
+    def record(self, ok: bool | None, probe: bool) -> None:
+        """ok=None — запрос не дал результата (отменён или не отправлен)."""
+        if probe and self.state == self.HALF_OPEN:
+            self._probes -= 1
+        if ok is None:
+            return
+        if ok:
+            self.failures = 0
+            if probe and self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                logger.warning("Цепь к сервису %s снова замкнута", self.name)
+            return
+        self.failures += 1
+        if (probe and self.state == self.HALF_OPEN) or (
+                self.state == self.CLOSED and self.failures >= self.config.failure_threshold
+        ):
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            logger.warning("Цепь к сервису %s разомкнута на %s с", self.name, self.config.open_time)
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
@@ -1,27 +1,136 @@
+import math
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
 from fastapi import Request
-from starlette.responses import Response
-from httpx import AsyncClient, Response as HTTPXResponse
-from typing import Callable
+from starlette import status
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from utils.overload import UpstreamOverloadedError
+from utils.response_cache import CachedResponse, ResponseCache, ResponseTooLargeError
+from utils.upstreams import Endpoint, Upstream
+
+# заголовки одного соединения (RFC 9110, 7.6.1) — прокси их не пересылает
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+})
+
+# такие запросы можно повторить на другой реплике, если у них нет тела
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _strip_hop_by_hop(headers: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    # Connection может перечислять дополнительные заголовки этого соединения
+    listed = {
+        token.strip().lower()
+        for name, value in headers if name.lower() == "connection"
+        for token in value.split(",")
+    }
+    return [(name, value) for name, value in headers if name.lower() not in HOP_BY_HOP_HEADERS | listed]
+
+
+class ProxyResponse(StreamingResponse):
+    """
+    Тело ответа апстрима передаётся клиенту по мере чтения, без буферизации.
+    Соединение с апстримом закрывается в любом случае — в том числе
+    когда клиент отключился, не дочитав ответ.
+    """
+
+    def __init__(self, upstream: httpx.Response, body: AsyncIterator[bytes] | None = None):
+        self.upstream = upstream
+        # body — если начало ответа уже прочитано (попытка положить его в кэш)
+        super().__init__(body or upstream.aiter_raw(), status_code=upstream.status_code)
+        # повторяющиеся заголовки (Set-Cookie и т.п.) сохраняются как есть
+        self.raw_headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in _strip_hop_by_hop(upstream.headers.multi_items())
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.upstream.aclose()
+
+
+def _cached_response(entry: CachedResponse, cache_status: str) -> Response:
+    response = Response(content=entry.body, status_code=entry.status_code)
+    response.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1"))
+        for name, value in _strip_hop_by_hop(entry.headers)
+    ] + [(b"age", str(entry.age()).encode()), (b"x-cache", cache_status.encode())]
+    return response
+
+
+def _has_body(request: Request) -> bool:
+    # тело пересылается потоком; у запросов без тела его нет и у апстрима
+    return "content-length" in request.headers or "transfer-encoding" in request.headers
+
+
+def _build_request(request: Request, upstream: Upstream, endpoint: Endpoint, path: str) -> httpx.Request:
+    url = httpx.URL(endpoint.base_url + path, query=request.url.query.encode("ascii"))
+    headers = [
+        (name, value) for name, value in _strip_hop_by_hop(request.headers.items()) if name.lower() != "host"
+    ]
+    return upstream.client.build_request(
+        request.method,
+        url,
+        headers=headers,
+        content=request.stream() if _has_body(request) else None,
+        timeout=upstream.timeout_for(path),
+    )
+
+
+def _error_response(exc: httpx.RequestError | UpstreamOverloadedError) -> Response:
+    if isinstance(exc, UpstreamOverloadedError):
+        return Response(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
+    if isinstance(exc, httpx.TimeoutException):
+        return Response(status_code=status.HTTP_504_GATEWAY_TIMEOUT)
+    return Response(status_code=status.HTTP_502_BAD_GATEWAY)
 
-_client = AsyncClient()
 
 async def forward(
     request: Request,
-    base_url: str,
+    upstream: Upstream,
     rewrite_path: Callable[[str], str] = lambda p: p,
+    cache: ResponseCache | None = None,
 ) -> Response:
-    url = base_url + rewrite_path(request.url.path)
+    path = rewrite_path(request.url.path)
 
-    response: HTTPXResponse = await _client.request(
-        request.method,
-        url,
-        headers=request.headers.raw,
-        params=request.query_params,
-        content=await request.body(),
-    )
+    def send() -> Awaitable[httpx.Response]:
+        return upstream.send(
+            lambda endpoint: _build_request(request, upstream, endpoint, path),
+            retryable=request.method in IDEMPOTENT_METHODS and not _has_body(request),
+        )
+
+    if cache is not None and (matched := cache.match(request)) is not None:
+        key, rule = matched
+        if (entry := cache.get(key)) is not None:
+            return _cached_response(entry, "HIT")
+        try:
+            entry = await cache.load(key, rule, send)
+            return _cached_response(entry, "MISS")
+        except ResponseTooLargeError as exc:
+            if exc.response is not None:
+                return ProxyResponse(exc.response, exc.body)
+        except (httpx.RequestError, UpstreamOverloadedError) as exc:
+            return _error_response(exc)
+
+    try:
+        response = await send()
+    except (httpx.RequestError, UpstreamOverloadedError) as exc:
+        return _error_response(exc)
 
-    return Response(
-        content=response.content,
-        status_code=response.status_code,
-        headers={k: v for k, v in response.headers.items() if k.lower() != "transfer-encoding"},
-    )
\ No newline at end of file
+    return ProxyResponse(response)
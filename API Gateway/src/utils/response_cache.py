@@ -0,0 +1,238 @@
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Hashable
+
+import httpx
+from fastapi import Request
+
+from utils.config import CacheRuleConfig, ResponseCacheConfig
+from utils.single_flight import SingleFlight
+
+# с такими заголовками ответ зависит от клиента или от его копии — кэш не участвует
+BYPASS_HEADERS = ("authorization", "cookie", "range", "if-range", "if-none-match", "if-modified-since")
+
+UNCACHEABLE_DIRECTIVES = {"no-store", "no-cache", "private"}
+
+# сколько ключей со слишком большими ответами помнится одновременно
+MAX_OVERSIZED_KEYS = 10_000
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    status_code: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    stored_at: float
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+    def age(self) -> int:
+        return int(time.monotonic() - self.stored_at)
+
+
+class ResponseTooLargeError(Exception):
+    """
+    Ответ не помещается в кэш. Если response задан, это уже открытый ответ апстрима:
+    body отдаёт прочитанное начало и остаток тела, закрыть response должен получатель.
+    Без response запрос нужно отправить в апстрим самостоятельно.
+    """
+
+    def __init__(self, response: httpx.Response | None = None, body: AsyncIterator[bytes] | None = None):
+        super().__init__()
+        self.response = response
+        self.body = body
+
+    def claim(self) -> "ResponseTooLargeError":
+        """Открытый ответ достаётся одному получателю, остальным — ошибка без него."""
+        claimed = ResponseTooLargeError(self.response, self.body)
+        self.response = self.body = None
+        return claimed
+
+
+async def _resume(prefix: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield prefix
+    async for chunk in rest:
+        yield chunk
+
+
+def _parse_cache_control(value: str) -> dict[str, str | None]:
+    directives = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+class ResponseCache:
+    """
+    LRU-кэш ответов апстримов в памяти шлюза.
+    Кэшируются только GET-запросы к путям из правил; одновременные промахи
+    по одному ключу объединяются в один запрос к апстриму.
+    """
+
+    def __init__(self, config: ResponseCacheConfig):
+        self.max_bytes = config.max_bytes
+        self.max_item_bytes = min(config.max_item_bytes, config.max_bytes)
+        self._rules = [(re.compile(rule.path_pattern), rule) for rule in config.rules]
+        self._items: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._size = 0
+        self._loads = SingleFlight()
+        # ключи, ответы по которым не поместились: до истечения ttl правила их не буферизуем
+        self._oversized: OrderedDict[Hashable, float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and bool(self._rules)
+
+    def match(self, request: Request) -> tuple[Hashable, CacheRuleConfig] | None:
+        if not self.enabled or request.method != "GET":
+            return None
+        if any(name in request.headers for name in BYPASS_HEADERS):
+            return None
+        if UNCACHEABLE_DIRECTIVES & _parse_cache_control(request.headers.get("cache-control", "")).keys():
+            return None
+        path = request.url.path
+        for pattern, rule in self._rules:
+            if pattern.match(path):
+                key = (
+                    path,
+                    request.url.query if rule.vary_query else "",
+                    tuple(request.headers.get(name, "") for name in rule.vary_headers),
+                )
+                return key, rule
+        return None
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._items.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._pop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def load(
+            self,
+            key: Hashable,
+            rule: CacheRuleConfig,
+            fetch: Callable[[], Awaitable[httpx.Response]],
+    ) -> CachedResponse:
+        """
+        Запрашивает ответ у апстрима и читает его целиком.
+        Ответ, не поместившийся в max_item_bytes, не кэшируется: один из ожидающих
+        получает ResponseTooLargeError с уже открытым ответом и отдаёт его клиенту потоком,
+        остальные — ошибку без ответа и обращаются к апстриму сами. Такой ключ на время
+        ttl правила запоминается, и следующие запросы сразу получают ошибку без ответа.
+        """
+        if (oversized_until := self._oversized.get(key)) is not None:
+            if oversized_until > time.monotonic():
+                raise ResponseTooLargeError
+            del self._oversized[key]
+        try:
+            return await self._loads.do(key, lambda: self._load(key, rule, fetch))
+        except ResponseTooLargeError as exc:
+            raise exc.claim() from None
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "items": len(self._items),
+            "oversized_keys": len(self._oversized),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._oversized.clear()
+        self._size = 0
+
+    async def _load(
+            self,
+            key: Hashable,
+            rule: CacheRuleConfig,
+            fetch: Callable[[], Awaitable[httpx.Response]],
+    ) -> CachedResponse:
+        response = await fetch()
+        chunks = response.aiter_raw()
+        body = bytearray()
+        try:
+            async for chunk in chunks:
+                body += chunk
+                if len(body) > self.max_item_bytes:
+                    self._mark_oversized(key, rule)
+                    # соединение не закрываем: остаток тела дочитает получатель ошибки
+                    raise ResponseTooLargeError(response, _resume(bytes(body), chunks))
+        except ResponseTooLargeError:
+            raise
+        except BaseException:
+            await response.aclose()
+            raise
+        await response.aclose()
+
+        now = time.monotonic()
+        entry = CachedResponse(
+            status_code=response.status_code,
+            headers=response.headers.multi_items(),
+            body=bytes(body),
+            stored_at=now,
+            expires_at=now + self._ttl(rule, response),
+        )
+        if entry.expires_at > now:
+            self._put(key, entry)
+        return entry
+
+    @staticmethod
+    def _ttl(rule: CacheRuleConfig, response: httpx.Response) -> float:
+        # ошибки и ответы с персональными данными не кэшируются
+        if response.status_code != 200 or "set-cookie" in response.headers:
+            return 0
+        vary = {name.strip().lower() for name in response.headers.get("vary", "").split(",") if name.strip()}
+        if not vary <= {name.lower() for name in rule.vary_headers}:
+            return 0
+        directives = _parse_cache_control(response.headers.get("cache-control", ""))
+        if UNCACHEABLE_DIRECTIVES & directives.keys():
+            return 0
+        # апстрим может сократить срок жизни, но не продлить его сверх правила
+        max_age = directives.get("s-maxage") or directives.get("max-age")
+        if max_age is not None:
+            try:
+                return min(rule.ttl, max(0, int(max_age)))
+            except ValueError:
+                return 0
+        return rule.ttl
+
+    def _mark_oversized(self, key: Hashable, rule: CacheRuleConfig) -> None:
+        self._oversized[key] = time.monotonic() + rule.ttl
+        self._oversized.move_to_end(key)
+        while len(self._oversized) > MAX_OVERSIZED_KEYS:
+            self._oversized.popitem(last=False)
+
+    def _put(self, key: Hashable, entry: CachedResponse) -> None:
+        if entry.size > self.max_item_bytes:
+            return
+        self._pop(key)
+        while self._items and self._size + entry.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= evicted.size
+            self.evictions += 1
+        self._items[key] = entry
+        self._size += entry.size
+
+    def _pop(self, key: Hashable) -> None:
+        if (entry := self._items.pop(key, None)) is not None:
+            self._size -= entry.size
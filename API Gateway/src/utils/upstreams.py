@@ -0,0 +1,282 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, Sequence
+
+import httpx
+from httpx import AsyncClient, Limits, Timeout
+
+from utils.config import Config, EndpointConfig, UpstreamConfig
+from utils.overload import AdaptiveLimiter, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# ошибки, при которых запрос точно не дошёл до обработчика реплики или она не ответила
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+# ответы, которыми апстрим сообщает о перегрузке
+OVERLOAD_STATUSES = frozenset({429, 503, 504})
+
+
+class Endpoint:
+    """Реплика апстрима и её состояние для балансировки."""
+
+    def __init__(self, config: EndpointConfig):
+        self.base_url = f"http://{config.host}:{config.port}"
+        self.outstanding = 0
+        # результат активных проверок /health_check
+        self.healthy = True
+        self.health_streak = 0
+        # пассивное исключение по ошибкам живого трафика
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > time.monotonic()
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and not self.ejected
+
+    def release(self) -> None:
+        self.outstanding -= 1
+
+    def stats(self) -> dict:
+        return {
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "ejected": self.ejected,
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Тело ответа, по закрытию которого реплика перестаёт считаться занятой."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class Upstream:
+    """
+    Сервис за шлюзом: свой пул соединений и свои таймауты.
+    Запросы распределяются между репликами по принципу power of two choices —
+    из двух случайных доступных реплик выбирается та, у которой меньше запросов в работе.
+    Число одновременных запросов к сервису в целом ограничено адаптивным лимитом,
+    а при серии ошибок срабатывает автоматический выключатель.
+    """
+
+    def __init__(self, name: str, config: UpstreamConfig):
+        self.name = name
+        self.config = config
+        self.endpoints = [Endpoint(endpoint) for endpoint in config.endpoints]
+        self.client = AsyncClient(
+            limits=Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=self._timeout(config.read_timeout),
+        )
+        self._routes = sorted(config.routes, key=lambda route: len(route.path_prefix), reverse=True)
+        self.limiter = AdaptiveLimiter(config.concurrency_limit)
+        self.breaker = CircuitBreaker(name, config.circuit_breaker)
+        self._health_task: asyncio.Task | None = None
+
+    def _timeout(self, read_timeout: float) -> Timeout:
+        return Timeout(
+            connect=self.config.connect_timeout,
+            read=read_timeout,
+            write=self.config.write_timeout,
+            pool=self.config.pool_timeout,
+        )
+
+    def timeout_for(self, path: str) -> Timeout:
+        for route in self._routes:
+            if path.startswith(route.path_prefix):
+                return self._timeout(route.read_timeout)
+        return self.client.timeout
+
+    def pick(self, exclude: Sequence[Endpoint] = ()) -> Endpoint | None:
+        candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+        if not candidates:
+            return None
+        # если недоступны все реплики, лучше попробовать любую, чем сразу отказать
+        candidates = [endpoint for endpoint in candidates if endpoint.available] or candidates
+        if len(candidates) == 1:
+            return candidates[0]
+        first, second = random.sample(candidates, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+    async def send(
+            self,
+            build_request: Callable[[Endpoint], httpx.Request],
+            retryable: bool = False,
+    ) -> httpx.Response:
+        """
+        Отправляет запрос на выбранную реплику и возвращает потоковый ответ.
+        Запрос, который можно безопасно повторить, при ошибке соединения
+        или 502/503/504 повторяется на другой реплике.
+        Если цепь разомкнута или лимит одновременных запросов исчерпан дольше допустимого,
+        бросает UpstreamOverloadedError, не обращаясь к апстриму.
+        """
+        probe = self.breaker.allow()
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.record(None, probe)
+            raise
+
+        started_at = time.monotonic()
+        try:
+            response, endpoint = await self._send_with_retries(build_request, retryable)
+        except httpx.RequestError:
+            self.limiter.release()
+            # таймаут, отказ в соединении или оборванный ответ — не успешный быстрый ответ:
+            # иначе недоступный апстрим разгонял бы лимит до max_limit
+            self.limiter.on_sample(started_at, overloaded=True)
+            self.breaker.record(False, probe)
+            raise
+        except BaseException:
+            self.limiter.release()
+            self.breaker.record(None, probe)
+            raise
+
+        self.limiter.on_sample(started_at, overloaded=response.status_code in OVERLOAD_STATUSES)
+        self.breaker.record(response.status_code < 500, probe)
+
+        def release() -> None:
+            endpoint.release()
+            self.limiter.release()
+
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def _send_with_retries(
+            self,
+            build_request: Callable[[Endpoint], httpx.Request],
+            retryable: bool,
+    ) -> tuple[httpx.Response, Endpoint]:
+        tried: list[Endpoint] = []
+        attempts = 1 + self.config.retries if retryable else 1
+        while True:
+            endpoint = self.pick(exclude=tried)
+            tried.append(endpoint)
+            last_attempt = len(tried) >= attempts or len(tried) >= len(self.endpoints)
+            endpoint.outstanding += 1
+            try:
+                response = await self.client.send(build_request(endpoint), stream=True)
+            except BaseException as exc:
+                endpoint.release()
+                if not isinstance(exc, httpx.RequestError):
+                    raise
+                self._record(endpoint, ok=False)
+                if last_attempt or not isinstance(exc, RETRYABLE_ERRORS):
+                    raise
+                continue
+
+            self._record(endpoint, ok=response.status_code < 500)
+            if not last_attempt and response.status_code in RETRYABLE_STATUSES:
+                await response.aclose()
+                endpoint.release()
+                continue
+            return response, endpoint
+
+    def _record(self, endpoint: Endpoint, ok: bool) -> None:
+        if ok:
+            endpoint.consecutive_failures = 0
+            if not endpoint.ejected:
+                endpoint.ejections = 0
+            return
+
+        endpoint.consecutive_failures += 1
+        outlier = self.config.outlier_detection
+        if endpoint.consecutive_failures < outlier.consecutive_failures or endpoint.ejected:
+            return
+        ejected = sum(other.ejected for other in self.endpoints)
+        if (ejected + 1) * 100 > outlier.max_ejection_percent * len(self.endpoints):
+            return
+        endpoint.ejections += 1
+        endpoint.consecutive_failures = 0
+        endpoint.ejected_until = time.monotonic() + outlier.base_ejection_time * endpoint.ejections
+        logger.warning("Реплика %s сервиса %s исключена после серии ошибок", endpoint.base_url, self.name)
+
+    async def _check(self, endpoint: Endpoint) -> None:
+        health = self.config.health_check
+        try:
+            response = await self.client.get(endpoint.base_url + health.path, timeout=health.timeout)
+            ok = response.status_code == 200
+        except httpx.RequestError:
+            ok = False
+
+        if ok == endpoint.healthy:
+            endpoint.health_streak = 0
+            return
+        endpoint.health_streak += 1
+        if endpoint.health_streak >= (health.healthy_threshold if ok else health.unhealthy_threshold):
+            endpoint.healthy = ok
+            endpoint.health_streak = 0
+            logger.warning(
+                "Реплика %s сервиса %s %s",
+                endpoint.base_url, self.name, "снова доступна" if ok else "не проходит проверку здоровья",
+            )
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self._check(endpoint) for endpoint in self.endpoints))
+            await asyncio.sleep(self.config.health_check.interval)
+
+    def start(self) -> None:
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.stats(),
+            "concurrency": self.limiter.stats(),
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints],
+        }
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        await self.client.aclose()
+
+
+class UpstreamRegistry:
+    """Клиенты всех апстримов; создаются при старте шлюза и закрываются при остановке."""
+
+    def __init__(self, config: Config):
+        self.analysis = Upstream("analysis", config.analysis_service)
+        self.files = Upstream("files", config.store_service)
+
+    def __iter__(self):
+        return iter((self.analysis, self.files))
+
+    def start(self) -> None:
+        for upstream in self:
+            upstream.start()
+
+    async def close(self) -> None:
+        for upstream in self:
+            await upstream.close()
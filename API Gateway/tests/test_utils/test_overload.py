@@ -0,0 +1,291 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from utils.config import CircuitBreakerConfig, ConcurrencyLimitConfig, EndpointConfig, UpstreamConfig
+from utils.overload import AdaptiveLimiter, CircuitBreaker, UpstreamOverloadedError
+from utils.proxy import forward
+from utils.upstreams import Upstream
+
+
+class TestAdaptiveLimiter:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.limiter = AdaptiveLimiter(ConcurrencyLimitConfig(
+            initial_limit=2, min_limit=1, max_limit=4, latency_threshold=1.0,
+            backoff_ratio=0.5, max_queue=1, queue_timeout=0.05,
+        ))
+
+    def test_fast_responses_increase_limit_additively(self):
+        # Act: за «окно» из limit успешных ответов лимит растёт примерно на единицу
+        self.limiter.on_sample(time.monotonic(), overloaded=False)
+        self.limiter.on_sample(time.monotonic(), overloaded=False)
+
+        # Assert
+        assert self.limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+
+        for _ in range(50):
+            self.limiter.on_sample(time.monotonic(), overloaded=False)
+        assert self.limiter.limit == 4
+
+    def test_slow_response_decreases_limit_down_to_min(self):
+        # Act
+        self.limiter.on_sample(time.monotonic() - 5, overloaded=False)
+
+        # Assert
+        assert self.limiter.limit == 1
+
+        self.limiter.on_sample(time.monotonic(), overloaded=True)
+        assert self.limiter.limit == 1
+
+    def test_overload_decreases_limit_once_per_window(self):
+        # Arrange
+        self.limiter.limit = 4
+        sent_at = time.monotonic()
+
+        # Act
+        self.limiter.on_sample(sent_at, overloaded=True)
+        # этот запрос был отправлен до снижения и повторно лимит не снижает
+        self.limiter.on_sample(sent_at, overloaded=True)
+
+        # Assert
+        assert self.limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_queue_overflow_and_timeout_are_rejected(self):
+        # Arrange
+        await self.limiter.acquire()
+        await self.limiter.acquire()
+        queued = asyncio.create_task(self.limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Act / Assert: очередь из одного места уже занята
+        with pytest.raises(UpstreamOverloadedError) as overflow:
+            await self.limiter.acquire()
+        assert overflow.value.retry_after == 0.05
+
+        with pytest.raises(UpstreamOverloadedError):
+            await queued
+        assert self.limiter.stats() == {"limit": 2, "in_flight": 2, "queued": 0}
+
+    @pytest.mark.asyncio
+    async def test_release_hands_slot_to_queued_request(self):
+        # Arrange
+        await self.limiter.acquire()
+        await self.limiter.acquire()
+        queued = asyncio.create_task(self.limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Act
+        self.limiter.release()
+        await queued
+
+        # Assert
+        assert self.limiter.stats() == {"limit": 2, "in_flight": 2, "queued": 0}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_while_queued_leaves_no_slot_behind(self):
+        # Arrange
+        await self.limiter.acquire()
+        await self.limiter.acquire()
+        queued = asyncio.create_task(self.limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Act
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+        # Assert
+        assert self.limiter.stats() == {"limit": 2, "in_flight": 2, "queued": 0}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_right_after_grant_returns_slot(self):
+        # Arrange
+        await self.limiter.acquire()
+        await self.limiter.acquire()
+        queued = asyncio.create_task(self.limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Act: место отдано, но ожидающий отменён раньше, чем успел его забрать
+        self.limiter.release()
+        queued.cancel()
+        try:
+            await queued
+            # до Python 3.12 wait_for отдаёт уже полученный результат, и место остаётся за запросом
+            held = 1
+        except asyncio.CancelledError:
+            held = 0
+
+        # Assert
+        assert self.limiter.stats() == {"limit": 2, "in_flight": 1 + held, "queued": 0}
+
+
+class TestCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.breaker = CircuitBreaker("analysis", CircuitBreakerConfig(
+            failure_threshold=3, open_time=10, half_open_requests=1,
+        ))
+
+    def _fail(self, times: int) -> None:
+        for _ in range(times):
+            self.breaker.record(False, self.breaker.allow())
+
+    def _wait_open_time(self) -> None:
+        self.breaker._opened_at -= self.breaker.config.open_time
+
+    def test_opens_after_consecutive_failures(self):
+        # Act
+        self._fail(2)
+        self.breaker.record(True, self.breaker.allow())
+        self._fail(3)
+
+        # Assert
+        assert self.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(UpstreamOverloadedError) as rejected:
+            self.breaker.allow()
+        assert 9 < rejected.value.retry_after <= 10
+
+    def test_half_open_admits_limited_probes_and_closes_on_success(self):
+        # Arrange
+        self._fail(3)
+        self._wait_open_time()
+
+        # Act
+        probe = self.breaker.allow()
+
+        # Assert
+        assert probe
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(UpstreamOverloadedError):
+            self.breaker.allow()
+
+        self.breaker.record(True, probe)
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        assert self.breaker.failures == 0
+        assert self.breaker.allow() is False
+
+    def test_failed_probe_reopens(self):
+        # Arrange
+        self._fail(3)
+        self._wait_open_time()
+
+        # Act
+        self.breaker.record(False, self.breaker.allow())
+
+        # Assert
+        assert self.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(UpstreamOverloadedError):
+            self.breaker.allow()
+
+    def test_probe_without_result_frees_its_slot(self):
+        # Arrange
+        self._fail(3)
+        self._wait_open_time()
+
+        # Act
+        self.breaker.record(None, self.breaker.allow())
+
+        # Assert
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        assert self.breaker.allow()
+
+
+class _Body(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        yield b"ok"
+
+
+class TestUpstreamOverload:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.status_code = 200
+        self.error: type[httpx.RequestError] | None = None
+        self.requests: list[httpx.Request] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            if self.error is not None:
+                raise self.error("fail", request=request)
+            return httpx.Response(self.status_code, stream=_Body())
+
+        self.upstream = Upstream("analysis", UpstreamConfig(
+            endpoints=[EndpointConfig(host="a", port=8000)],
+            concurrency_limit=ConcurrencyLimitConfig(initial_limit=1, max_queue=0, queue_timeout=1.5),
+            circuit_breaker=CircuitBreakerConfig(failure_threshold=2, open_time=10),
+        ))
+        self.upstream.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        app = FastAPI()
+
+        @app.get("/{path:path}")
+        async def proxy(path: str, request: Request):
+            return await forward(request, self.upstream)
+
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gateway")
+
+    @pytest.mark.asyncio
+    async def test_limiter_overflow_is_503_with_retry_after(self):
+        # Arrange
+        await self.upstream.limiter.acquire()
+
+        # Act
+        response = await self.client.get("/analysis/1")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "2"
+        assert self.requests == []
+
+    @pytest.mark.asyncio
+    async def test_server_errors_open_circuit(self):
+        # Arrange
+        self.status_code = 500
+
+        # Act
+        first = await self.client.get("/analysis/1")
+        second = await self.client.get("/analysis/1")
+        rejected = await self.client.get("/analysis/1")
+
+        # Assert
+        assert (first.status_code, second.status_code) == (500, 500)
+        assert rejected.status_code == 503
+        assert rejected.headers["retry-after"] == "10"
+        assert len(self.requests) == 2
+        assert self.upstream.limiter.in_flight == 0
+        assert self.upstream.stats()["circuit"] == {"state": "open", "consecutive_failures": 2}
+
+    @pytest.mark.asyncio
+    async def test_probe_is_released_when_slot_is_not_granted(self):
+        # Arrange: цепь полуоткрыта, а место в лимите занято
+        self.upstream.breaker.state = CircuitBreaker.OPEN
+        await self.upstream.limiter.acquire()
+
+        # Act
+        response = await self.client.get("/analysis/1")
+        self.upstream.limiter.release()
+        probe = await self.client.get("/analysis/1")
+
+        # Assert
+        assert response.status_code == 503
+        assert probe.status_code == 200
+        assert self.upstream.breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error", [httpx.ConnectError, httpx.RemoteProtocolError, httpx.ReadTimeout])
+    async def test_transport_errors_decrease_limit(self, error):
+        # Arrange
+        self.error = error
+        self.upstream.limiter.limit = 8
+
+        # Act
+        response = await self.client.get("/analysis/1")
+
+        # Assert
+        assert response.status_code in (502, 504)
+        assert self.upstream.limiter.limit == 8 * self.upstream.limiter.config.backoff_ratio
+        assert self.upstream.limiter.in_flight == 0
@@ -0,0 +1,221 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from utils.config import (
+    CacheRuleConfig, EndpointConfig, ResponseCacheConfig, RouteTimeoutConfig, UpstreamConfig,
+)
+from utils.proxy import ProxyResponse, forward
+from utils.response_cache import ResponseCache
+from utils.upstreams import Upstream
+
+
+class _Body(httpx.AsyncByteStream):
+    """Тело ответа апстрима, которое помнит, дочитали ли его и закрыли ли."""
+
+    def __init__(self, chunks: list[bytes], endless: bool = False):
+        self.chunks = chunks
+        self.endless = endless
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        while self.endless:
+            await asyncio.sleep(0.01)
+            yield b"."
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class TestForward:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.requests: list[httpx.Request] = []
+        self.response_headers: list[tuple[str, str]] = []
+        self.body = _Body([b"first ", b"second"])
+        self.cache: ResponseCache | None = None
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return httpx.Response(200, headers=self.response_headers, stream=self.body)
+
+        self.upstream = Upstream("files", UpstreamConfig(
+            endpoints=[EndpointConfig(host="store", port=8000)],
+            read_timeout=30,
+            routes=[
+                RouteTimeoutConfig(path_prefix="/batch", read_timeout=300),
+                RouteTimeoutConfig(path_prefix="/batch/archive", read_timeout=600),
+            ],
+        ))
+        self.upstream.client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), timeout=self.upstream.client.timeout
+        )
+
+        app = FastAPI()
+
+        @app.api_route("/files/{path:path}", methods=["GET", "POST"])
+        async def proxy(path: str, request: Request):
+            return await forward(request, self.upstream, lambda p: f"/{path}", self.cache)
+
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gateway")
+
+    @pytest.mark.asyncio
+    async def test_forwards_request_and_streams_body(self):
+        # Act
+        response = await self.client.get("/files/1?full=true", headers={"X-Request-Id": "abc"})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.content == b"first second"
+        request, = self.requests
+        assert str(request.url) == "http://store:8000/1?full=true"
+        assert request.headers["x-request-id"] == "abc"
+        assert request.headers["host"] == "store:8000"
+        assert self.body.closed
+        assert self.upstream.endpoints[0].outstanding == 0
+
+    @pytest.mark.asyncio
+    async def test_strips_hop_by_hop_headers_both_ways(self):
+        # Arrange
+        self.response_headers = [
+            ("Connection", "close, X-Upstream-Conn"),
+            ("Keep-Alive", "timeout=5"),
+            ("X-Upstream-Conn", "1"),
+            ("Set-Cookie", "a=1"),
+            ("Set-Cookie", "b=2"),
+        ]
+
+        # Act
+        response = await self.client.get("/files/1", headers={
+            "Connection": "X-Client-Conn",
+            "X-Client-Conn": "1",
+            "TE": "trailers",
+            "Proxy-Authorization": "secret",
+            "X-Kept": "yes",
+        })
+
+        # Assert
+        request, = self.requests
+        for name in ("x-client-conn", "te", "proxy-authorization"):
+            assert name not in request.headers
+        assert request.headers["x-kept"] == "yes"
+        for name in ("keep-alive", "x-upstream-conn"):
+            assert name not in response.headers
+        assert response.headers.get_list("set-cookie") == ["a=1", "b=2"]
+
+    @pytest.mark.asyncio
+    async def test_uses_longest_matching_route_timeout(self):
+        # Act
+        await self.client.get("/files/batch/archive/1")
+        await self.client.get("/files/batch-get")
+        await self.client.get("/files/1")
+
+        # Assert
+        assert [request.extensions["timeout"]["read"] for request in self.requests] == [600, 300, 30]
+        assert self.upstream.timeout_for("/other") == self.upstream.client.timeout
+
+    @pytest.mark.asyncio
+    async def test_cached_response_is_served_without_upstream(self):
+        # Arrange
+        self.cache = ResponseCache(ResponseCacheConfig(
+            max_bytes=1024, rules=[CacheRuleConfig(path_pattern=r"^/files/\d+$", ttl=60)]
+        ))
+
+        # Act
+        miss = await self.client.get("/files/1")
+        self.body = _Body([b"changed"])
+        hit = await self.client.get("/files/1")
+
+        # Assert
+        assert (miss.headers["x-cache"], miss.content) == ("MISS", b"first second")
+        assert (hit.headers["x-cache"], hit.content) == ("HIT", b"first second")
+        assert hit.headers["age"] == "0"
+        assert len(self.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_too_large_for_cache_is_streamed_from_the_same_response(self):
+        # Arrange
+        self.cache = ResponseCache(ResponseCacheConfig(
+            max_bytes=1024, max_item_bytes=4, rules=[CacheRuleConfig(path_pattern=r"^/files/\d+$", ttl=60)]
+        ))
+
+        # Act
+        response = await self.client.get("/files/1")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.content == b"first second"
+        assert "x-cache" not in response.headers
+        assert len(self.requests) == 1
+        assert self.body.closed
+        assert self.upstream.limiter.stats()["in_flight"] == 0
+        assert self.cache.stats()["items"] == 0
+
+        # следующий запрос за тем же ключом идёт в апстрим напрямую, без попытки буферизации
+        again = await self.client.get("/files/1")
+        assert again.content == b"first second"
+        assert len(self.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_becomes_gateway_status(self):
+        # Arrange
+        async def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ReadTimeout("slow", request=request)
+
+        self.upstream.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        # Act
+        response = await self.client.get("/files/1")
+
+        # Assert
+        assert response.status_code == 504
+
+
+class TestProxyResponse:
+    @staticmethod
+    def _upstream(body: _Body) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": "text/plain"}, stream=body)
+
+    @pytest.mark.asyncio
+    async def test_sends_chunks_as_they_are_read(self):
+        # Arrange
+        body = _Body([b"one", b"two", b"three"])
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(10)
+
+        async def send(message):
+            sent.append(message)
+
+        # Act
+        await ProxyResponse(self._upstream(body))({"type": "http"}, receive, send)
+
+        # Assert
+        chunks = [message["body"] for message in sent if message["type"] == "http.response.body"]
+        assert chunks[:3] == [b"one", b"two", b"three"]
+        assert body.closed
+
+    @pytest.mark.asyncio
+    async def test_closes_upstream_when_client_disconnects(self):
+        # Arrange
+        body = _Body([b"start"], endless=True)
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        # Act
+        await asyncio.wait_for(ProxyResponse(self._upstream(body))({"type": "http"}, receive, send), timeout=1)
+
+        # Assert
+        assert len(sent) > 2
+        assert body.closed
@@ -0,0 +1,212 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from utils.config import CacheRuleConfig, ResponseCacheConfig
+from utils.response_cache import ResponseCache, ResponseTooLargeError
+
+
+def _request(path: str, query: str = "", headers: dict[str, str] | None = None, method: str = "GET") -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+class _Body(httpx.AsyncByteStream):
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def __aiter__(self):
+        yield self.content
+
+
+class _Chunks(httpx.AsyncByteStream):
+    def __init__(self, chunks: list[bytes]):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _response(content: bytes = b"body", status_code: int = 200, headers: dict[str, str] | None = None):
+    async def fetch() -> httpx.Response:
+        return httpx.Response(status_code, headers=headers, stream=_Body(content))
+
+    return fetch
+
+
+class TestResponseCache:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.rule = CacheRuleConfig(path_pattern=r"^/analysis/\d+$", ttl=60)
+        self.vary_rule = CacheRuleConfig(
+            path_pattern=r"^/files/\d+$", ttl=60, vary_query=True, vary_headers=["Accept-Language"]
+        )
+        self.cache = ResponseCache(ResponseCacheConfig(max_bytes=1024, max_item_bytes=512, rules=[
+            self.rule, self.vary_rule,
+        ]))
+
+    def test_disabled_without_budget_or_rules(self):
+        assert not ResponseCache(ResponseCacheConfig(max_bytes=0, rules=[self.rule])).enabled
+        assert not ResponseCache(ResponseCacheConfig(max_bytes=1024)).enabled
+        assert ResponseCache(ResponseCacheConfig(max_bytes=0, rules=[self.rule])).match(_request("/analysis/1")) is None
+
+    def test_key_rules(self):
+        # Act
+        key, rule = self.cache.match(_request("/analysis/1", query="a=1"))
+        files_key, files_rule = self.cache.match(_request("/files/1", query="a=1", headers={"Accept-Language": "ru"}))
+
+        # Assert
+        assert rule is self.rule
+        assert key == self.cache.match(_request("/analysis/1", query="a=2"))[0]
+        assert files_rule is self.vary_rule
+        assert files_key != self.cache.match(_request("/files/1", query="a=2", headers={"Accept-Language": "ru"}))[0]
+        assert files_key != self.cache.match(_request("/files/1", query="a=1", headers={"Accept-Language": "en"}))[0]
+        assert self.cache.match(_request("/analysis/x")) is None
+        assert self.cache.match(_request("/analysis/1", method="POST")) is None
+
+    @pytest.mark.parametrize("headers", [
+        {"Authorization": "Bearer t"},
+        {"Cookie": "a=1"},
+        {"Range": "bytes=0-1"},
+        {"If-None-Match": '"etag"'},
+        {"Cache-Control": "no-cache"},
+        {"Cache-Control": "no-store"},
+    ])
+    def test_bypass_headers(self, headers):
+        assert self.cache.match(_request("/analysis/1", headers=headers)) is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cache_control, ttl", [
+        ("", 60),
+        ("max-age=10", 10),
+        ("max-age=600", 60),
+        ("max-age=600, s-maxage=5", 5),
+        ("max-age=abc", 0),
+        ("no-store", 0),
+        ("private, max-age=30", 0),
+    ])
+    async def test_ttl_is_clamped_by_cache_control(self, cache_control, ttl):
+        # Act
+        entry = await self.cache.load("k", self.rule, _response(headers={"Cache-Control": cache_control}))
+
+        # Assert
+        assert entry.expires_at - entry.stored_at == ttl
+        assert (self.cache.get("k") is not None) == (ttl > 0)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code, headers", [
+        (404, {}),
+        (200, {"Set-Cookie": "session=1"}),
+    ])
+    async def test_errors_and_personal_responses_are_not_stored(self, status_code, headers):
+        await self.cache.load("k", self.rule, _response(status_code=status_code, headers=headers))
+
+        assert self.cache.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_vary_must_be_covered_by_rule(self):
+        # Act
+        await self.cache.load("a", self.rule, _response(headers={"Vary": "Accept-Language"}))
+        await self.cache.load("b", self.vary_rule, _response(headers={"Vary": "accept-language"}))
+
+        # Assert
+        assert self.cache.get("a") is None
+        assert self.cache.get("b") is not None
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_within_byte_budget(self):
+        # Arrange: каждая запись ~300 байт, в бюджет 1024 помещаются три
+        for key in ("a", "b", "c"):
+            await self.cache.load(key, self.rule, _response(b"x" * 300))
+        self.cache.get("a")
+
+        # Act
+        await self.cache.load("d", self.rule, _response(b"x" * 300))
+
+        # Assert
+        assert self.cache.get("b") is None
+        assert all(self.cache.get(key) is not None for key in ("a", "c", "d"))
+        stats = self.cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["items"] == 3
+        assert stats["size_bytes"] <= stats["max_bytes"]
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_dropped(self, mocker):
+        # Arrange
+        await self.cache.load("k", self.rule, _response())
+        clock = mocker.patch("utils.response_cache.time.monotonic")
+        clock.return_value = self.cache._items["k"].expires_at
+
+        # Act / Assert
+        assert self.cache.get("k") is None
+        assert self.cache.stats()["size_bytes"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        # Arrange
+        calls = 0
+
+        async def fetch() -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, stream=_Body(b"body"))
+
+        # Act
+        entries = await asyncio.gather(*(self.cache.load("k", self.rule, fetch) for _ in range(5)))
+
+        # Assert
+        assert calls == 1
+        assert all(entry is entries[0] for entry in entries)
+
+    @pytest.mark.asyncio
+    async def test_too_large_response_is_handed_over_open(self):
+        # Arrange
+        calls = 0
+
+        async def fetch() -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(200, stream=_Chunks([b"x" * 400, b"y" * 400, b"z"]))
+
+        # Act
+        with pytest.raises(ResponseTooLargeError) as too_large:
+            await self.cache.load("k", self.rule, fetch)
+        body = b"".join([chunk async for chunk in too_large.value.body])
+        await too_large.value.response.aclose()
+
+        # Assert
+        assert body == b"x" * 400 + b"y" * 400 + b"z"
+        assert self.cache.get("k") is None
+
+        # ключ запомнен: повторный запрос не буферизуется и в апстрим через кэш не идёт
+        with pytest.raises(ResponseTooLargeError) as again:
+            await self.cache.load("k", self.rule, fetch)
+        assert again.value.response is None
+        assert calls == 1
+        assert self.cache.stats()["oversized_keys"] == 1
+
+    @pytest.mark.asyncio
+    async def test_open_too_large_response_goes_to_one_waiter(self):
+        # Arrange
+        async def fetch() -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, stream=_Chunks([b"x" * 600]))
+
+        # Act
+        errors = await asyncio.gather(
+            *(self.cache.load("k", self.rule, fetch) for _ in range(3)), return_exceptions=True
+        )
+
+        # Assert
+        assert all(isinstance(error, ResponseTooLargeError) for error in errors)
+        assert sum(error.response is not None for error in errors) == 1
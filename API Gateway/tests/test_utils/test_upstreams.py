@@ -0,0 +1,221 @@
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from utils.config import EndpointConfig, HealthCheckConfig, OutlierDetectionConfig, UpstreamConfig
+from utils.proxy import forward
+from utils.upstreams import Upstream
+
+
+class _Body(httpx.AsyncByteStream):
+    """Потоковое тело, как у настоящего транспорта: реплика освобождается по его закрытию."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def __aiter__(self):
+        yield self.content
+
+
+class TestUpstream:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        # хост -> статус ответа или исключение, которое бросит транспорт
+        self.replies: dict[str, int | type[httpx.RequestError]] = {"a": 200, "b": 200}
+        self.requests: list[httpx.Request] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            reply = self.replies[request.url.host]
+            if isinstance(reply, type):
+                raise reply("fail", request=request)
+            return httpx.Response(reply, stream=_Body(request.url.host.encode()))
+
+        self.upstream = Upstream("analysis", UpstreamConfig(
+            endpoints=[EndpointConfig(host="a", port=8000), EndpointConfig(host="b", port=8000)],
+            health_check=HealthCheckConfig(unhealthy_threshold=2, healthy_threshold=1),
+            outlier_detection=OutlierDetectionConfig(
+                consecutive_failures=2, base_ejection_time=30, max_ejection_percent=50
+            ),
+        ))
+        self.upstream.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.a, self.b = self.upstream.endpoints
+
+    async def _get(self, retryable: bool = True) -> httpx.Response:
+        response = await self.upstream.send(
+            lambda endpoint: self.upstream.client.build_request("GET", f"{endpoint.base_url}/analysis/1"),
+            retryable=retryable,
+        )
+        await response.aread()
+        await response.aclose()
+        return response
+
+    def _hosts(self) -> list[str]:
+        return [request.url.host for request in self.requests]
+
+    def test_pick_prefers_less_loaded_of_two(self):
+        self.a.outstanding = 3
+
+        assert all(self.upstream.pick() is self.b for _ in range(20))
+
+    def test_pick_samples_two_random_candidates(self, mocker):
+        # Arrange
+        self.upstream.endpoints.append(c := type(self.a)(EndpointConfig(host="c", port=8000)))
+        self.b.outstanding, c.outstanding = 2, 1
+        sample = mocker.patch("utils.upstreams.random.sample", return_value=[self.b, c])
+
+        # Act / Assert
+        assert self.upstream.pick() is c
+        sample.assert_called_once_with([self.a, self.b, c], 2)
+
+    def test_pick_skips_unavailable_unless_all_are(self):
+        self.a.healthy = False
+        self.b.outstanding = 10
+
+        assert self.upstream.pick() is self.b
+
+        self.b.ejected_until = time.monotonic() + 60
+
+        assert self.upstream.pick() in (self.a, self.b)
+        assert self.upstream.pick(exclude=[self.a, self.b]) is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failure", [503, httpx.ConnectError])
+    async def test_retries_on_another_replica(self, failure):
+        # Arrange
+        self.replies["a"] = failure
+        self.b.outstanding = 1
+
+        # Act
+        response = await self._get()
+        self.b.outstanding -= 1
+
+        # Assert
+        assert response.status_code == 200
+        assert response.content == b"b"
+        assert self._hosts() == ["a", "b"]
+        assert (self.a.outstanding, self.b.outstanding) == (0, 0)
+        assert self.upstream.limiter.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_read_timeout_or_non_retryable_request(self):
+        # Arrange
+        self.replies["a"] = httpx.ReadTimeout
+        self.b.outstanding = 1
+
+        # Act / Assert
+        with pytest.raises(httpx.ReadTimeout):
+            await self._get()
+        self.replies["a"] = 503
+        assert (await self._get(retryable=False)).status_code == 503
+        assert self._hosts() == ["a", "a"]
+
+    @pytest.mark.asyncio
+    async def test_request_with_body_is_not_retried(self):
+        # Arrange
+        self.replies = {"a": 503, "b": 503}
+        app = FastAPI()
+
+        @app.api_route("/{path:path}", methods=["GET", "PUT"])
+        async def proxy(path: str, request: Request):
+            return await forward(request, self.upstream)
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gateway")
+
+        # Act
+        put = await client.put("/analysis/1", content=b"body")
+        put_attempts = len(self.requests)
+        get = await client.get("/analysis/1")
+
+        # Assert
+        assert (put.status_code, get.status_code) == (503, 503)
+        assert put_attempts == 1
+        assert len(self.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_ejects_failing_replica_within_max_ejection_percent(self):
+        # Arrange
+        self.replies = {"a": 500, "b": 500}
+        self.b.outstanding = 1
+
+        # Act: две ошибки подряд на a
+        await self._get(retryable=False)
+        await self._get(retryable=False)
+
+        # Assert
+        assert self.a.ejected and self.a.ejections == 1
+        assert self.upstream.pick() is self.b
+
+        # Act: b тоже падает, но исключить вторую из двух реплик не даёт лимит в 50%
+        self.b.outstanding = 0
+        await self._get(retryable=False)
+        await self._get(retryable=False)
+
+        # Assert
+        assert self._hosts() == ["a", "a", "b", "b"]
+        assert not self.b.ejected
+        assert self.b.consecutive_failures == 2
+
+    @pytest.mark.asyncio
+    async def test_repeated_ejection_lasts_longer_and_success_resets(self):
+        # Arrange
+        self.replies["a"] = 500
+        self.b.outstanding = 1
+        await self._get(retryable=False)
+        await self._get(retryable=False)
+        self.a.ejected_until = 0
+
+        # Act
+        await self._get(retryable=False)
+        await self._get(retryable=False)
+
+        # Assert
+        assert self.a.ejections == 2
+        assert self.a.ejected_until - time.monotonic() == pytest.approx(60, abs=1)
+
+        # Act: реплика поправилась и после исключения отвечает успешно
+        self.replies["a"] = 200
+        self.a.ejected_until = 0
+        await self._get(retryable=False)
+
+        # Assert
+        assert (self.a.consecutive_failures, self.a.ejections) == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_health_check_thresholds(self):
+        # Arrange
+        self.replies["a"] = 500
+
+        # Act / Assert: одна неудачная проверка ещё не меняет состояние
+        await self.upstream._check(self.a)
+        assert self.a.healthy
+
+        # серия прерывается успешной проверкой
+        self.replies["a"] = 200
+        await self.upstream._check(self.a)
+        self.replies["a"] = httpx.ConnectError
+        await self.upstream._check(self.a)
+        assert self.a.healthy
+
+        await self.upstream._check(self.a)
+        assert not self.a.healthy
+        assert self.requests[-1].url.path == "/health_check"
+
+        # для возврата достаточно одной успешной проверки
+        self.replies["a"] = 200
+        await self.upstream._check(self.a)
+        assert self.a.healthy
+
+    @pytest.mark.asyncio
+    async def test_close_stops_health_loop(self):
+        # Arrange
+        self.upstream.start()
+
+        # Act
+        await self.upstream.close()
+
+        # Assert
+        assert self.upstream._health_task.cancelled()
+        assert self.upstream.client.is_closed
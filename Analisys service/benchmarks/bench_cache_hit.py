@@ -0,0 +1,103 @@
+"""
+Бенчмарк попадания в кэш анализа.
+
+Запуск против базы из docker compose:
+
+    docker compose run --rm analysis-service python -m benchmarks.bench_cache_hit
+
+Заполняет таблицу file_stat, затем проверяет, что повторный анализ файла
+выполняет ровно один SQL-запрос, и этот запрос идёт по индексу.
+"""
+import asyncio
+import random
+import time
+import uuid
+
+from sqlalchemy import delete, event, select, text
+from sqlalchemy.dialects import postgresql
+
+from src.application.services.analysis import AnalysisService
+from src.infrastructure.database.db_context import async_session_maker, engine
+from src.infrastructure.database.models.file_stat import FileStat
+from src.infrastructure.database.repositories.file_stat import SQLFileStat
+
+ROWS = 50_000
+ITERATIONS = 2_000
+FILE_ID_OFFSET = 10_000_000
+
+
+class _Unused:
+    def __getattr__(self, item):
+        raise AssertionError(f"cache hit must not touch {item}")
+
+
+async def seed() -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(FileStat).where(FileStat.file_id >= FILE_ID_OFFSET))
+        await session.execute(
+            FileStat.__table__.insert(),
+            [
+                {
+                    "file_id": FILE_ID_OFFSET + i,
+                    "normalized_hash": uuid.uuid4().hex,
+                    "word_count": 1,
+                    "char_count": 1,
+                    "is_unique": True,
+                    "wordcloud_location": "bench.png",
+                }
+                for i in range(ROWS)
+            ],
+        )
+        await session.execute(text("ANALYZE file_stat"))
+        await session.commit()
+
+
+async def explain(stmt) -> str:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    async with async_session_maker() as session:
+        rows = await session.execute(text(f"EXPLAIN {sql}"))
+        return "\n".join(row[0] for row in rows)
+
+
+async def main() -> None:
+    await seed()
+    service = AnalysisService(
+        text_reader=_Unused(),
+        pic_storage=_Unused(),
+        word_cloud=_Unused(),
+        file_stat_repository=SQLFileStat(),
+    )
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    file_ids = [FILE_ID_OFFSET + random.randrange(ROWS) for _ in range(ITERATIONS)]
+    started = time.perf_counter()
+    for file_id in file_ids:
+        await service.get_file_stat(file_id)
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    lookup_plan = await explain(select(FileStat).filter(FileStat.file_id == file_ids[0]))
+    unique_plan = await explain(select(FileStat).filter(FileStat.normalized_hash == "missing"))
+
+    print(f"queries per hit: {len(statements) / ITERATIONS:.2f}")
+    print(f"mean hit latency: {elapsed / ITERATIONS * 1000:.3f} ms")
+    print(f"get_file_stat plan:\n{lookup_plan}")
+    print(f"check_unique plan:\n{unique_plan}")
+
+    assert len(statements) == ITERATIONS
+    assert "Index" in lookup_plan
+    assert "Index" in unique_plan
+
+    async with async_session_maker() as session:
+        await session.execute(delete(FileStat).where(FileStat.file_id >= FILE_ID_OFFSET))
+        await session.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,22 @@
+import asyncio
 import hashlib
+import logging
 import re
+from contextlib import aclosing
+from typing import AsyncIterator
 
+from src.application.services.minhash import MinHasher
+from src.application.services.terms import TermExtractor
 from src.domain.interfaces.base_file_text_reader import BaseFileTextReader
 from src.domain.interfaces.base_picture_storage import BasePictureStorage
 from src.domain.interfaces.base_wordcloud import BaseWordCloud
 from src.domain.interfaces.repositories.base_file_stat_repository import BaseFileStatRepository
 from src.domain.schemas.file_stats import FileStatSchema
+from src.domain.schemas.similarity import SimilarFile
+from src.domain.schemas.terms import WeightedTerm
+from src.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 
 class AnalysisService:
@@ -14,51 +25,194 @@ class AnalysisService:
             text_reader: BaseFileTextReader,
             pic_storage: BasePictureStorage,
             word_cloud: BaseWordCloud,
-            file_stat_repository: BaseFileStatRepository
+            file_stat_repository: BaseFileStatRepository,
+            term_extractor: TermExtractor | None = None,
+            batch_concurrency: int = 8,
+            min_hasher: MinHasher | None = None,
     ):
         self.text_reader = text_reader
         self.pic_storage = pic_storage
         self.word_cloud = word_cloud
         self.file_stat_repository = file_stat_repository
+        self.term_extractor = term_extractor or TermExtractor()
+        self.min_hasher = min_hasher or MinHasher()
+        self.batch_concurrency = batch_concurrency
+        self._in_flight = SingleFlight()
+        # одна и та же картинка нужна файлам с одинаковым текстом — рисуем её один раз
+        self._renders = SingleFlight()
 
     async def get_file_stat(self, file_id: int) -> FileStatSchema:
         if stat := await self.file_stat_repository.get_file_stat(file_id):
             return stat
-        return await self._get_file_stat(file_id)
+        return await self._in_flight.do(file_id, lambda: self._get_file_stat(file_id))
+
+    async def get_file_stats(
+            self, file_ids: list[int]
+    ) -> AsyncIterator[tuple[int, FileStatSchema | Exception]]:
+        """
+        Статистика для нескольких файлов в порядке готовности: сначала всё,
+        что уже посчитано (одним запросом), затем промахи. Их тексты читаются
+        одним пакетным запросом к хранилищу, а считаются параллельно,
+        не более batch_concurrency одновременно.
+        Ошибка по одному файлу возвращается вместо результата и не прерывает остальные.
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        cached = {stat.file_id: stat for stat in await self.file_stat_repository.get_file_stats(file_ids)}
+        for file_id in file_ids:
+            if file_id in cached:
+                yield file_id, cached[file_id]
+
+        misses = [file_id for file_id in file_ids if file_id not in cached]
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        results: asyncio.Queue[tuple[int, FileStatSchema | Exception]] = asyncio.Queue()
+        tasks: list[asyncio.Task] = []
+
+        async def _compute(file_id: int, file_text: str | None) -> None:
+            try:
+                result = await self._in_flight.do(
+                    file_id, lambda: self._get_file_stat(file_id, file_text)
+                )
+            except Exception as e:
+                result = e
+            results.put_nowait((file_id, result))
+
+        async def _spawn(file_id: int, file_text: str | None) -> None:
+            # слот занимается до запуска и освобождается, только когда результат
+            # отдан потребителю: пока все заняты, пакетный ответ хранилища
+            # не дочитывается, а тексты и результаты не копятся в памяти
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(_compute(file_id, file_text)))
+
+        async def _feed() -> None:
+            pending = set(misses)
+            try:
+                # при отмене генератор закрывается сразу, а с ним и соединение с хранилищем
+                async with aclosing(self.text_reader.get_file_texts_by_ids(misses)) as texts:
+                    async for file_id, file_text in texts:
+                        if file_id in pending:
+                            pending.discard(file_id)
+                            await _spawn(file_id, file_text)
+            except Exception:
+                # оставшиеся файлы дочитаются по одному внутри _get_file_stat
+                logger.warning("Пакетное чтение текстов не удалось", exc_info=True)
+            for file_id in pending:
+                await _spawn(file_id, None)
+
+        feeder = asyncio.create_task(_feed()) if misses else None
+        try:
+            for _ in misses:
+                yield await results.get()
+                semaphore.release()
+        finally:
+            # клиент ушёл — ещё не начатые вычисления не нужны
+            if feeder:
+                feeder.cancel()
+            for task in tasks:
+                task.cancel()
 
     async def get_word_cloud(self, location: str) -> bytes:
         return await self.pic_storage.load(location=location)
 
-    async def _get_file_stat(self, file_id: int) -> FileStatSchema:
-        file_text = await self.text_reader.get_file_text_by_id(file_id)
-        normalized_hash = self._get_text_normalized_hash(file_text)
-        is_unique = await self.file_stat_repository.check_unique(normalized_hash)
-        word_cloud_content = await self.word_cloud.get_word_cloud(file_text)
-        word_cloud_location = await self.pic_storage.save(word_cloud_content)
+    async def get_word_cloud_size(self, location: str) -> int | None:
+        return await self.pic_storage.stat(location)
+
+    def stream_word_cloud(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        return self.pic_storage.stream(location, offset=offset, length=length)
+
+    async def _get_file_stat(self, file_id: int, file_text: str | None = None) -> FileStatSchema:
+        if file_text is None:
+            file_text = await self.text_reader.get_file_text_by_id(file_id)
+        normalized_text = self._normalize_text(file_text)
+        normalized_hash = hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
         char_count = len(file_text)
         word_count = len(file_text.split())
-        file_stat_id = await self.file_stat_repository.add_one(
+        # частоты считаем один раз: они уходят в облако слов и сохраняются вместе со статистикой
+        terms = await asyncio.to_thread(self.term_extractor.extract, file_text)
+
+        # проверки уникальности и сходства и построение облака слов независимы — выполняем
+        # параллельно, при падении одной ветки TaskGroup отменяет остальные
+        try:
+            async with asyncio.TaskGroup() as tg:
+                unique_task = tg.create_task(self.file_stat_repository.check_unique(normalized_hash))
+                similar_task = tg.create_task(self._find_similar(file_id, normalized_text))
+                word_cloud_task = tg.create_task(self._save_word_cloud(normalized_hash, terms))
+        except BaseExceptionGroup as group:
+            raise group.exceptions[0]
+        is_unique = unique_task.result()
+        signature, buckets, similar_files = similar_task.result()
+        similarity = similar_files[0].score if similar_files else 0.0
+        word_cloud_location = word_cloud_task.result()
+        # картинку при ошибке вставки не удаляем: она адресуется содержимым,
+        # может использоваться другими записями и будет переиспользована при повторе
+        file_stat_id, created = await self.file_stat_repository.add_or_get(
             data={
                 "file_id": file_id,
                 "word_count": word_count,
                 "char_count": char_count,
                 "is_unique": is_unique,
                 "wordcloud_location": word_cloud_location,
-                "normalized_hash": normalized_hash
+                "normalized_hash": normalized_hash,
+                "terms": [term.model_dump() for term in terms],
+                "minhash": signature or None,
+                "lsh_buckets": buckets or None,
+                "similarity": similarity,
+                "similar_files": [match.model_dump() for match in similar_files],
             }
         )
+        if not created:
+            # другая реплика успела посчитать тот же файл — отдаём сохранённую версию
+            return await self.file_stat_repository.get_file_stat(file_id)
+
         return FileStatSchema(
             id=file_stat_id,
             file_id=file_id,
             word_count=word_count,
             char_count=char_count,
             is_unique=is_unique,
-            wordcloud_location=word_cloud_location
+            wordcloud_location=word_cloud_location,
+            terms=terms,
+            similarity=similarity,
+            similar_files=similar_files,
         )
 
+    async def _find_similar(
+            self, file_id: int, normalized_text: str
+    ) -> tuple[list[int], list[int], list[SimilarFile]]:
+        """
+        Сигнатура, LSH-корзины и похожие файлы. Кандидаты берутся из LSH-индекса,
+        а не перебором всех документов.
+        """
+        signature = await self.min_hasher.get_signature(normalized_text)
+        buckets = self.min_hasher.buckets(signature)
+        if not buckets:
+            return signature, buckets, []
+        candidates = await self.file_stat_repository.find_similar_candidates(buckets, exclude_file_id=file_id)
+        return signature, buckets, self.min_hasher.rank(signature, candidates)
+
+    async def _save_word_cloud(self, normalized_hash: str, terms: list[WeightedTerm]) -> str:
+        key = self._get_word_cloud_key(normalized_hash)
+        return await self._renders.do(key, lambda: self._render_word_cloud(key, terms))
+
+    async def _render_word_cloud(self, key: str, terms: list[WeightedTerm]) -> str:
+        # другие реплики могут рисовать ту же картинку одновременно: сохранение
+        # не перезаписывает уже созданный объект, поэтому байты по адресу не меняются
+        if location := await self.pic_storage.find(key):
+            return location
+        word_cloud_content = await self.word_cloud.get_word_cloud(terms)
+        return await self.pic_storage.save(word_cloud_content, key=key)
+
+    def _get_word_cloud_key(self, normalized_hash: str) -> str:
+        """Ключ картинки зависит только от содержимого текста и параметров отрисовки."""
+        source = f"{normalized_hash}:{self.term_extractor.fingerprint}:{self.word_cloud.fingerprint}"
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
     @staticmethod
-    def _get_text_normalized_hash(file_text: str) -> str:
-        normalized = re.sub(r"\s+", " ", file_text.strip().lower())
+    def _normalize_text(file_text: str) -> str:
+        return re.sub(r"\s+", " ", file_text.strip().lower())
+
+    @classmethod
+    def _get_text_normalized_hash(cls, file_text: str) -> str:
+        normalized = cls._normalize_text(file_text)
         encoded = normalized.encode("utf-8")
         hash_value = hashlib.sha256(encoded).hexdigest()
         return hash_value
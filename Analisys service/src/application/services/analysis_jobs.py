@@ -0,0 +1,108 @@
+import asyncio
+import logging
+
+from src.application.services.analysis import AnalysisService
+from src.domain.interfaces.repositories.base_analysis_job_repository import BaseAnalysisJobRepository
+from src.domain.schemas.analysis_job import AnalysisJobSchema, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class AnalysisJobService:
+    """
+    Фоновое выполнение анализа: очередью служит таблица задач в БД.
+    Воркеры всех реплик забирают задачи атомарно и держат их под арендой,
+    которую продлевают, пока выполняют. Задача упавшей реплики
+    подхватывается другой, когда аренда истекает.
+    """
+
+    def __init__(
+            self,
+            analysis_service: AnalysisService,
+            job_repository: BaseAnalysisJobRepository,
+            workers: int,
+            queue_size: int,
+            lease_time: float = 60.0,
+            poll_interval: float = 1.0,
+    ):
+        self.analysis_service = analysis_service
+        self.job_repository = job_repository
+        self.workers = workers
+        self.queue_size = queue_size
+        self.lease_time = lease_time
+        self.poll_interval = poll_interval
+        # будит воркеры этой реплики сразу после постановки задачи, не дожидаясь опроса
+        self._wakeup = asyncio.Event()
+        self._worker_tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, file_id: int) -> AnalysisJobSchema:
+        if await self.job_repository.count_queued() >= self.queue_size:
+            raise JobQueueFullError
+        job_id = await self.job_repository.add_one(data={"file_id": file_id, "status": JobStatus.QUEUED})
+        self._wakeup.set()
+        return AnalysisJobSchema(id=job_id, file_id=file_id, status=JobStatus.QUEUED)
+
+    async def get_job(self, job_id: int) -> AnalysisJobSchema | None:
+        job = await self.job_repository.get_job(job_id)
+        if job and job.status == JobStatus.DONE:
+            job.result = await self.analysis_service.get_file_stat(job.file_id)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await self.job_repository.claim(self.lease_time)
+            except Exception:
+                logger.exception("Не удалось забрать задачу анализа")
+                job = None
+            if job is None:
+                await self._wait_for_jobs()
+                continue
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception("Не удалось обработать задачу анализа %s", job.id)
+
+    async def _wait_for_jobs(self) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, job: AnalysisJobSchema) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            await self.analysis_service.get_file_stat(job.file_id)
+        except asyncio.CancelledError:
+            # реплика останавливается — возвращаем задачу в очередь, не дожидаясь истечения аренды
+            await asyncio.shield(self.job_repository.set_status(job.id, JobStatus.QUEUED))
+            raise
+        except Exception as e:
+            logger.exception("Задача анализа %s завершилась ошибкой", job.id)
+            await self.job_repository.set_status(job.id, JobStatus.FAILED, error=str(e))
+            return
+        finally:
+            heartbeat.cancel()
+        await self.job_repository.set_status(job.id, JobStatus.DONE)
+
+    async def _heartbeat(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.lease_time / 3)
+            try:
+                await self.job_repository.renew_lease(job_id, self.lease_time)
+            except Exception:
+                logger.warning("Не удалось продлить аренду задачи %s", job_id, exc_info=True)
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import heapq
+import random
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src.domain.schemas.similarity import SimilarFile
+
+# простое число Мерсенна 2^61 - 1: значения сигнатуры помещаются в BIGINT
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _shingles(normalized_text: str, shingle_size: int, max_shingles: int) -> set[int]:
+    words = normalized_text.split()
+    if len(words) <= shingle_size:
+        return {_hash64(" ".join(words).encode("utf-8"))} if words else set()
+    shingles = {
+        _hash64(" ".join(words[i:i + shingle_size]).encode("utf-8"))
+        for i in range(len(words) - shingle_size + 1)
+    }
+    if max_shingles and len(shingles) > max_shingles:
+        # согласованная выборка: у похожих текстов в неё попадают одни и те же шинглы
+        return set(heapq.nsmallest(max_shingles, shingles))
+    return shingles
+
+
+def _signature(
+        normalized_text: str, perms: list[tuple[int, int]], shingle_size: int, max_shingles: int
+) -> list[int]:
+    shingles = _shingles(normalized_text, shingle_size, max_shingles)
+    if not shingles:
+        return []
+    return [min((a * x + b) % MERSENNE_PRIME for x in shingles) for a, b in perms]
+
+
+class MinHasher:
+    """
+    MinHash-сигнатура текста по словесным шинглам и её LSH-разбиение на полосы.
+
+    Доля совпадающих позиций двух сигнатур оценивает коэффициент Жаккара
+    множеств шинглов. Сигнатура режется на bands полос по rows значений; документы,
+    совпавшие хотя бы в одной полосе, становятся кандидатами. Порог, при котором
+    пара скорее попадёт в кандидаты, чем нет, примерно (1 / bands) ** (1 / rows).
+
+    Сигнатура считается на чистом Python за num_perm проходов по шинглам, поэтому
+    у больших текстов берутся max_shingles шинглов с наименьшими хешами, а сам расчёт
+    в get_signature уходит в пул процессов и не держит GIL цикла событий.
+
+    Смена параметров делает сохранённые сигнатуры несравнимыми с новыми.
+    """
+
+    def __init__(
+            self,
+            num_perm: int = 128,
+            bands: int = 32,
+            shingle_size: int = 3,
+            threshold: float = 0.5,
+            top_k: int = 5,
+            max_shingles: int = 2000,
+            workers: int = 2,
+            seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm должно делиться на bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.top_k = top_k
+        self.max_shingles = max_shingles
+        rnd = random.Random(seed)
+        self._perms = [
+            (rnd.randrange(1, MERSENNE_PRIME), rnd.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    def shingles(self, normalized_text: str) -> set[int]:
+        return _shingles(normalized_text, self.shingle_size, self.max_shingles)
+
+    def signature(self, normalized_text: str) -> list[int]:
+        """Сигнатура нормализованного текста; у пустого текста — пустой список."""
+        return _signature(normalized_text, self._perms, self.shingle_size, self.max_shingles)
+
+    async def get_signature(self, normalized_text: str) -> list[int]:
+        """То же в пуле процессов."""
+        job = partial(_signature, normalized_text, self._perms, self.shingle_size, self.max_shingles)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+
+    def buckets(self, signature: list[int]) -> list[int]:
+        """Ключи LSH-корзин: по одному на полосу, номер полосы входит в хеш."""
+        if len(signature) != self.num_perm:
+            return []
+        return [
+            int.from_bytes(
+                hashlib.blake2b(
+                    struct.pack(f"<I{self.rows}Q", band, *signature[band * self.rows:(band + 1) * self.rows]),
+                    digest_size=8,
+                ).digest(),
+                "little",
+                signed=True,
+            )
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(first: list[int], second: list[int]) -> float:
+        """Оценка коэффициента Жаккара по двум сигнатурам одинаковой длины."""
+        if not first or len(first) != len(second):
+            return 0.0
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+
+    def rank(self, signature: list[int], candidates: list[tuple[int, list[int]]]) -> list[SimilarFile]:
+        """Оставляет кандидатов не ниже порога, top_k самых похожих по убыванию."""
+        matches = [
+            SimilarFile(file_id=file_id, score=round(self.similarity(signature, other), 4))
+            for file_id, other in candidates
+        ]
+        matches = [match for match in matches if match.score >= self.threshold]
+        matches.sort(key=lambda match: (-match.score, match.file_id))
+        return matches[:self.top_k]
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,33 @@
+import re
+from collections import Counter
+
+from src.application.services.stopwords import STOPWORDS
+from src.domain.schemas.terms import WeightedTerm
+
+WORD_RE = re.compile(r"[^\W\d_]{2,}")
+
+
+class TermExtractor:
+    """
+    Считает частоты слов текста без стоп-слов выбранных языков
+    и оставляет top_n самых частых.
+    """
+
+    def __init__(self, top_n: int = 200, languages: list[str] | None = None):
+        self.top_n = top_n
+        languages = ["ru", "en"] if languages is None else languages
+        unknown = set(languages) - STOPWORDS.keys()
+        if unknown:
+            raise ValueError(f"Нет стоп-слов для языков: {', '.join(sorted(unknown))}")
+        self.languages = sorted(languages)
+        self.stopwords = frozenset().union(*(STOPWORDS[lang] for lang in languages))
+
+    @property
+    def fingerprint(self) -> str:
+        return f"{self.top_n}:{','.join(self.languages)}"
+
+    def extract(self, file_text: str) -> list[WeightedTerm]:
+        counts = Counter(
+            word for word in WORD_RE.findall(file_text.lower()) if word not in self.stopwords
+        )
+        return [WeightedTerm(text=word, weight=count) for word, count in counts.most_common(self.top_n)]
@@ -1,7 +1,16 @@
 from abc import ABC,abstractmethod
+from typing import AsyncIterator
 
 
 class BaseFileTextReader(ABC):
     @abstractmethod
     async def get_file_text_by_id(self,file_id:int) -> str:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_file_texts_by_ids(self, file_ids: list[int]) -> AsyncIterator[tuple[int, str | None]]:
+        """
+        Тексты нескольких файлов за один запрос, в порядке готовности.
+        None — текст получить не удалось (файла нет или ошибка чтения).
+        """
+        raise NotImplementedError
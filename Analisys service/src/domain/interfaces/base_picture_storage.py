@@ -1,15 +1,34 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class BasePictureStorage(ABC):
     @abstractmethod
-    async def save(self, content: bytes) -> str:
+    async def save(self, content: bytes, key: str | None = None) -> str:
+        """
+        Сохраняет картинку и возвращает её расположение.
+        Уже существующий объект с тем же key не перезаписывается.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find(self, key: str) -> str | None:
         raise NotImplementedError
 
     @abstractmethod
     async def load(self, location: str) -> bytes:
         raise NotImplementedError
 
+    @abstractmethod
+    async def stat(self, location: str) -> int | None:
+        """Размер объекта в байтах или None, если его нет."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        """Отдаёт объект (или его диапазон) по частям, не читая целиком в память."""
+        raise NotImplementedError
+
     @abstractmethod
     async def delete(self,location:str) -> None:
         raise NotImplementedError
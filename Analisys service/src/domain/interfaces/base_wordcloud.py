@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
 
+from src.domain.schemas.terms import WeightedTerm
+
 
 class BaseWordCloud(ABC):
+    @property
+    @abstractmethod
+    def fingerprint(self) -> str:
+        """Строка, однозначно описывающая бэкенд и параметры отрисовки."""
+        raise NotImplementedError
+
     @abstractmethod
-    async def get_word_cloud(self, file_text: str) -> bytes:
+    async def get_word_cloud(self, terms: list[WeightedTerm]) -> bytes:
         raise NotImplementedError
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+
+from src.domain.interfaces.repositories.base_repository import AbstractRepository
+from src.domain.schemas.analysis_job import AnalysisJobSchema, JobStatus
+
+
+class BaseAnalysisJobRepository(AbstractRepository, ABC):
+    @abstractmethod
+    async def get_job(self, job_id: int) -> AnalysisJobSchema | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_status(self, job_id: int, status: JobStatus, error: str | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count_queued(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def claim(self, lease_time: float) -> AnalysisJobSchema | None:
+        """
+        Атомарно забирает одну задачу: ожидающую или выполняемую с истёкшей арендой.
+        Задача переводится в running и арендуется на lease_time секунд.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def renew_lease(self, job_id: int, lease_time: float) -> None:
+        raise NotImplementedError
@@ -11,4 +11,24 @@ class BaseFileStatRepository(AbstractRepository, ABC):
 
     @abstractmethod
     async def get_file_stat(self, file_id: int) -> FileStatSchema | None:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_file_stats(self, file_ids: list[int]) -> list[FileStatSchema]:
+        """Готовая статистика для нескольких файлов одним запросом."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find_similar_candidates(
+            self, buckets: list[int], exclude_file_id: int, limit: int = 1000
+    ) -> list[tuple[int, list[int]]]:
+        """(file_id, MinHash-сигнатура) файлов, попавших хотя бы в одну из LSH-корзин."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_or_get(self, data: dict) -> tuple[int, bool]:
+        """
+        Сохраняет статистику, если для file_id её ещё нет.
+        Возвращает id записи и признак того, что она создана этим вызовом.
+        """
+        raise NotImplementedError
@@ -0,0 +1,20 @@
+from enum import StrEnum
+
+from pydantic import BaseModel
+
+from src.domain.schemas.file_stats import FileStatSchema
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class AnalysisJobSchema(BaseModel):
+    id: int
+    file_id: int
+    status: JobStatus
+    error: str | None = None
+    result: FileStatSchema | None = None
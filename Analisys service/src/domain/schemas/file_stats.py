@@ -1,5 +1,8 @@
 from pydantic import BaseModel
 
+from src.domain.schemas.similarity import SimilarFile
+from src.domain.schemas.terms import WeightedTerm
+
 
 class FileStatSchema(BaseModel):
     id: int
@@ -8,3 +11,7 @@ class FileStatSchema(BaseModel):
     char_count: int
     is_unique: bool
     wordcloud_location: str
+    terms: list[WeightedTerm] | None = None
+    # максимальная оценка сходства с ранее проанализированными файлами и ближайшие из них
+    similarity: float = 0.0
+    similar_files: list[SimilarFile] | None = None
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class SimilarFile(BaseModel):
+    file_id: int
+    score: float
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class WeightedTerm(BaseModel):
+    text: str
+    weight: int
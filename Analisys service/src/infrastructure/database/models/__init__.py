@@ -1,2 +1,3 @@
 from ..db_context import Base
-from .file_stat import FileStat
\ No newline at end of file
+from .analysis_job import AnalysisJob
+from .file_stat import FileStat
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.domain.schemas.analysis_job import AnalysisJobSchema
+from src.infrastructure.database.db_context import Base
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_job"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    file_id: Mapped[int]
+    status: Mapped[str] = mapped_column(String(16), index=True)
+    error: Mapped[str | None]
+    # до этого момента задачу выполняет забравшая её реплика; потом её может забрать другая
+    lease_until: Mapped[datetime | None]
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
+
+    def to_read_model(self) -> AnalysisJobSchema:
+        return AnalysisJobSchema(
+            id=self.id,
+            file_id=self.file_id,
+            status=self.status,
+            error=self.error,
+        )
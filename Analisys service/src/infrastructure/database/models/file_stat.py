@@ -1,4 +1,5 @@
-from sqlalchemy import String
+from sqlalchemy import JSON, BigInteger, Index, String
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.domain.schemas.file_stats import FileStatSchema
@@ -7,14 +8,23 @@ from src.infrastructure.database.db_context import Base
 
 class FileStat(Base):
     __tablename__ = "file_stat"
+    __table_args__ = (
+        # GIN по массиву корзин: поиск кандидатов через && не сканирует всю таблицу
+        Index("ix_file_stat_lsh_buckets", "lsh_buckets", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     file_id: Mapped[int] = mapped_column(unique=True)
-    normalized_hash: Mapped[str]
+    normalized_hash: Mapped[str] = mapped_column(index=True)
     word_count: Mapped[int]
     char_count: Mapped[int]
     is_unique: Mapped[bool]
     wordcloud_location: Mapped[str] = mapped_column(String)
+    terms: Mapped[list | None] = mapped_column(JSON)
+    minhash: Mapped[list[int] | None] = mapped_column(ARRAY(BigInteger))
+    lsh_buckets: Mapped[list[int] | None] = mapped_column(ARRAY(BigInteger))
+    similarity: Mapped[float] = mapped_column(default=0.0, server_default="0")
+    similar_files: Mapped[list | None] = mapped_column(JSON)
 
     def to_read_model(self) -> FileStatSchema:
         return FileStatSchema(
@@ -24,4 +34,7 @@ class FileStat(Base):
             char_count=self.char_count,
             is_unique=self.is_unique,
             wordcloud_location=self.wordcloud_location,
+            terms=self.terms,
+            similarity=self.similarity,
+            similar_files=self.similar_files,
         )
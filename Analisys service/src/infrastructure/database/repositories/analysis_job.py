@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from sqlalchemy import func, or_, select, update
+
+from src.domain.interfaces.repositories.base_analysis_job_repository import BaseAnalysisJobRepository
+from src.domain.interfaces.repositories.base_repository import SQLAlchemyRepository
+from src.domain.schemas.analysis_job import AnalysisJobSchema, JobStatus
+from src.infrastructure.database.db_context import async_session_maker
+from src.infrastructure.database.models.analysis_job import AnalysisJob
+
+
+class SQLAnalysisJob(SQLAlchemyRepository, BaseAnalysisJobRepository):
+    model = AnalysisJob
+
+    async def get_job(self, job_id: int) -> AnalysisJobSchema | None:
+        async with async_session_maker() as session:
+            job = await session.get(AnalysisJob, job_id)
+            return job.to_read_model() if job else None
+
+    async def set_status(self, job_id: int, status: JobStatus, error: str | None = None) -> None:
+        async with async_session_maker() as session:
+            stmt = (
+                update(AnalysisJob)
+                .filter(AnalysisJob.id == job_id)
+                .values(status=status, error=error, lease_until=None)
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    async def count_queued(self) -> int:
+        async with async_session_maker() as session:
+            stmt = select(func.count()).select_from(AnalysisJob).filter(AnalysisJob.status == JobStatus.QUEUED)
+            return (await session.scalars(stmt)).one()
+
+    async def claim(self, lease_time: float) -> AnalysisJobSchema | None:
+        async with async_session_maker() as session:
+            # SKIP LOCKED: реплики разбирают разные строки и не ждут друг друга
+            claimable = (
+                select(AnalysisJob.id)
+                .filter(or_(
+                    AnalysisJob.status == JobStatus.QUEUED,
+                    (AnalysisJob.status == JobStatus.RUNNING)
+                    & or_(AnalysisJob.lease_until.is_(None), AnalysisJob.lease_until < func.now()),
+                ))
+                .order_by(AnalysisJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            stmt = (
+                update(AnalysisJob)
+                .filter(AnalysisJob.id == claimable)
+                .values(status=JobStatus.RUNNING, lease_until=func.now() + timedelta(seconds=lease_time))
+                .returning(AnalysisJob)
+            )
+            job = (await session.scalars(stmt)).one_or_none()
+            await session.commit()
+            return job.to_read_model() if job else None
+
+    async def renew_lease(self, job_id: int, lease_time: float) -> None:
+        async with async_session_maker() as session:
+            stmt = (
+                update(AnalysisJob)
+                .filter(AnalysisJob.id == job_id, AnalysisJob.status == JobStatus.RUNNING)
+                .values(lease_until=func.now() + timedelta(seconds=lease_time))
+            )
+            await session.execute(stmt)
+            await session.commit()
@@ -1,4 +1,5 @@
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 from src.domain.interfaces.repositories.base_file_stat_repository import BaseFileStatRepository
 from src.domain.interfaces.repositories.base_repository import SQLAlchemyRepository
@@ -17,6 +18,38 @@ class SQLFileStat(SQLAlchemyRepository, BaseFileStatRepository):
 
     async def get_file_stat(self, file_id: int) -> FileStatSchema | None:
         async with async_session_maker() as session:
-            stmt = select(FileStat).filter(FileStat.id == file_id)
+            stmt = select(FileStat).filter(FileStat.file_id == file_id)
             return (await session.scalars(stmt)).one_or_none()
 
+    async def get_file_stats(self, file_ids: list[int]) -> list[FileStatSchema]:
+        async with async_session_maker() as session:
+            stmt = select(FileStat).filter(FileStat.file_id.in_(file_ids))
+            return list((await session.scalars(stmt)).all())
+
+    async def find_similar_candidates(
+            self, buckets: list[int], exclude_file_id: int, limit: int = 1000
+    ) -> list[tuple[int, list[int]]]:
+        async with async_session_maker() as session:
+            stmt = (
+                select(FileStat.file_id, FileStat.minhash)
+                .filter(FileStat.lsh_buckets.overlap(buckets), FileStat.file_id != exclude_file_id)
+                .limit(limit)
+            )
+            return [(file_id, signature) for file_id, signature in await session.execute(stmt)]
+
+    async def add_or_get(self, data: dict) -> tuple[int, bool]:
+        async with async_session_maker() as session:
+            stmt = (
+                insert(self.model)
+                .values(**data)
+                .on_conflict_do_nothing(index_elements=[self.model.file_id])
+                .returning(self.model.id)
+            )
+            file_stat_id = (await session.execute(stmt)).scalar_one_or_none()
+            created = file_stat_id is not None
+            if not created:
+                # статистику уже сохранила другая реплика: INSERT дождался её коммита
+                stmt = select(self.model.id).filter(self.model.file_id == data["file_id"])
+                file_stat_id = (await session.scalars(stmt)).one()
+            await session.commit()
+            return file_stat_id, created
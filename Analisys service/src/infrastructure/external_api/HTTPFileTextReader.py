@@ -1,14 +1,41 @@
+import json
+from typing import AsyncIterator
+
 from httpx import AsyncClient
 
 from src.domain.interfaces.base_file_text_reader import BaseFileTextReader
+from src.infrastructure.external_api.http_client import client_settings
+
 
 class HTTPFileTextReader(BaseFileTextReader):
 
-    def __init__(self, host: str, port: int, path: str, secure: bool = False):
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            path: str,
+            secure: bool = False,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            keepalive_expiry: float = 30.0,
+            connect_timeout: float = 5.0,
+            read_timeout: float = 30.0,
+            http2: bool = False,
+    ):
         self.host = host
         self.port = port
         self.path = path
         self.secure = secure
+        self.client = AsyncClient(
+            **client_settings(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                http2=http2,
+            )
+        )
 
     @property
     def base_url(self):
@@ -16,6 +43,19 @@ class HTTPFileTextReader(BaseFileTextReader):
 
 
     async def get_file_text_by_id(self, file_id: int):
-        async with AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/{file_id}")
-            return response.json()["file_text"]
\ No newline at end of file
+        # сырые байты вместо JSON-обёртки: без экранирования и повторного разбора
+        response = await self.client.get(f"{self.base_url}/{file_id}/raw")
+        response.raise_for_status()
+        return response.content.decode("utf-8")
+
+    async def get_file_texts_by_ids(self, file_ids: list[int]) -> AsyncIterator[tuple[int, str | None]]:
+        # ответ читается построчно (NDJSON), пока потребитель забирает тексты
+        async with self.client.stream("POST", f"{self.base_url}/batch-get", json={"file_ids": file_ids}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    item = json.loads(line)
+                    yield item["file_id"], item.get("file_text")
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -1,6 +1,8 @@
 from httpx import AsyncClient
 
 from src.domain.interfaces.base_wordcloud import BaseWordCloud
+from src.domain.schemas.terms import WeightedTerm
+from src.infrastructure.external_api.http_client import client_settings
 
 
 class HTTPWordCloud(BaseWordCloud):
@@ -14,6 +16,12 @@ class HTTPWordCloud(BaseWordCloud):
             font_family: str,
             font_scale: int,
             scale: str,
+            max_connections: int = 50,
+            max_keepalive_connections: int = 10,
+            keepalive_expiry: float = 60.0,
+            connect_timeout: float = 5.0,
+            read_timeout: float = 60.0,
+            http2: bool = True,
     ):
         self.host = host
         self.path = path
@@ -23,26 +31,47 @@ class HTTPWordCloud(BaseWordCloud):
         self.fontFamily = font_family
         self.fontScale = font_scale
         self.scale = scale
+        self.client = AsyncClient(
+            **client_settings(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                http2=http2,
+            )
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        return (
+            f"http:{self.host}/{self.path.strip('/')}:{self.format}:{self.width}x{self.height}:"
+            f"{self.fontFamily}:{self.fontScale}:{self.scale}"
+        )
 
     @property
     def base_url(self):
         return f"https://{self.host}/{self.path.strip('/')}"
 
-    async def get_word_cloud(self, file_text: str) -> bytes:
-        async with AsyncClient() as client:
-            payload = {
-                "format": self.format,
-                "width": self.width,
-                "height": self.height,
-                "fontFamily": self.fontFamily,
-                "fontScale": self.fontScale,
-                "scale": self.scale,
-                "text": file_text
-            }
-            headers = {
-                "Content-Type": "application/json",
-            }
-
-            response = await client.post(url=self.base_url, json=payload, headers=headers)
-            response.raise_for_status()
-            return response.content
+    async def get_word_cloud(self, terms: list[WeightedTerm]) -> bytes:
+        payload = {
+            "format": self.format,
+            "width": self.width,
+            "height": self.height,
+            "fontFamily": self.fontFamily,
+            "fontScale": self.fontScale,
+            "scale": self.scale,
+            # готовый список "слово:вес" вместо полного текста документа
+            "useWordList": True,
+            "text": ",".join(f"{term.text}:{term.weight}" for term in terms)
+        }
+        headers = {
+            "Content-Type": "application/json",
+        }
+
+        response = await self.client.post(url=self.base_url, json=payload, headers=headers)
+        response.raise_for_status()
+        return response.content
+
+    async def close(self) -> None:
+        await self.client.aclose()
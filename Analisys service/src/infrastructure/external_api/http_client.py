@@ -0,0 +1,26 @@
+from importlib.util import find_spec
+
+from httpx import Limits, Timeout
+
+# httpx умеет HTTP/2 только при установленном пакете h2
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+def client_settings(
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        connect_timeout: float,
+        read_timeout: float,
+        http2: bool,
+) -> dict:
+    """Параметры долгоживущего httpx.AsyncClient с пулом соединений."""
+    return {
+        "limits": Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        "timeout": Timeout(read_timeout, connect=connect_timeout),
+        "http2": http2 and HTTP2_AVAILABLE,
+    }
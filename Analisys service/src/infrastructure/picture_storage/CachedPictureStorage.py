@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from typing import AsyncIterator
+
+from src.domain.interfaces.base_picture_storage import BasePictureStorage
+from src.utils.single_flight import SingleFlight
+
+
+class CachedPictureStorage(BasePictureStorage):
+    """
+    LRU-кэш картинок в памяти поверх другого хранилища.
+    Размер ограничен суммарным числом байт, а не количеством записей.
+    """
+
+    def __init__(self, storage: BasePictureStorage, max_bytes: int, max_item_bytes: int | None = None):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        # одна огромная картинка не должна вытеснять весь кэш
+        self.max_item_bytes = max_item_bytes if max_item_bytes is not None else max_bytes // 4
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._loads = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def save(self, content: bytes, key: str | None = None) -> str:
+        location = await self.storage.save(content, key=key)
+        if key is None:
+            self._put(location, content)
+        else:
+            # объект с этим ключом мог создать другой процесс, и тогда
+            # в хранилище лежат не наши байты — они загрузятся при первом чтении
+            self._pop(location)
+        return location
+
+    async def find(self, key: str) -> str | None:
+        return await self.storage.find(key)
+
+    async def load(self, location: str) -> bytes:
+        if (content := self._items.get(location)) is not None:
+            self._items.move_to_end(location)
+            self.hits += 1
+            return content
+        self.misses += 1
+        return await self._loads.do(location, lambda: self._load(location))
+
+    async def stat(self, location: str) -> int | None:
+        if (content := self._items.get(location)) is not None:
+            return len(content)
+        return await self.storage.stat(location)
+
+    async def stream(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        if (content := self._items.get(location)) is not None:
+            self._items.move_to_end(location)
+            self.hits += 1
+            yield content[offset:offset + length if length is not None else None]
+            return
+        self.misses += 1
+        # целиком прочитанный объект подходящего размера попадает в кэш по пути к клиенту
+        whole = offset == 0 and length is None
+        buffer: list[bytes] | None = [] if whole else None
+        buffered = 0
+        async for chunk in self.storage.stream(location, offset=offset, length=length):
+            if buffer is not None:
+                buffered += len(chunk)
+                buffer = buffer if buffered <= self.max_item_bytes else None
+                if buffer is not None:
+                    buffer.append(chunk)
+            yield chunk
+        if buffer is not None:
+            self._put(location, b"".join(buffer))
+
+    async def delete(self, location: str) -> None:
+        self._pop(location)
+        await self.storage.delete(location)
+
+    async def close(self) -> None:
+        self._items.clear()
+        self._size = 0
+        await self.storage.close()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "items": len(self._items),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    async def _load(self, location: str) -> bytes:
+        content = await self.storage.load(location=location)
+        self._put(location, content)
+        return content
+
+    def _put(self, location: str, content: bytes) -> None:
+        if len(content) > self.max_item_bytes:
+            return
+        self._pop(location)
+        while self._items and self._size + len(content) > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+        self._items[location] = content
+        self._size += len(content)
+
+    def _pop(self, location: str) -> None:
+        if (content := self._items.pop(location, None)) is not None:
+            self._size -= len(content)
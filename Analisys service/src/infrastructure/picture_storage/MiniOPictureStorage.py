@@ -1,8 +1,10 @@
 import asyncio
 import uuid
-from typing import Union
+from functools import partial
+from typing import AsyncIterator
 
 from minio import Minio
+from minio.error import S3Error
 
 from src.domain.interfaces.base_picture_storage import BasePictureStorage
 
@@ -12,6 +14,8 @@ class MiniOPictureStorage(BasePictureStorage):
         Асинхронная обёртка над MinIO Python SDK.
         """
 
+    chunk_size = 64 * 1024
+
     def __init__(
             self,
             endpoint: str,
@@ -44,23 +48,62 @@ class MiniOPictureStorage(BasePictureStorage):
 
         await asyncio.get_running_loop().run_in_executor(None, _create_bucket)
 
-    async def save(self, content: bytes) -> str:
-        """Сохраняет строку или байты в MinIO."""
+    def _location(self, key: str) -> str:
+        return f"{self.prefix}{key}.png"
+
+    async def save(self, content: bytes, key: str | None = None) -> str:
+        """
+        Сохраняет байты в MinIO под ключом key (по умолчанию — случайным).
+        Объект с заданным key не перезаписывается: запись условная (If-None-Match: *),
+        и если объект уже создан другим процессом, остаётся его содержимое.
+        """
         await self.init()
 
-        key = f"{self.prefix}{uuid.uuid4()}.png"
+        location = self._location(key or str(uuid.uuid4()))
 
         def _put():
             from io import BytesIO
-            self.client.put_object(
-                bucket_name=self.bucket_name,
-                object_name=key,
-                data=BytesIO(content),
-                length=len(content),
-            )
+            if key is None:
+                self.client.put_object(
+                    bucket_name=self.bucket_name,
+                    object_name=location,
+                    data=BytesIO(content),
+                    length=len(content),
+                )
+                return
+            try:
+                # put_object не пропускает условные заголовки, поэтому — одиночный PUT напрямую
+                self.client._put_object(
+                    self.bucket_name,
+                    location,
+                    content,
+                    headers={"Content-Type": "application/octet-stream", "If-None-Match": "*"},
+                )
+            except S3Error as e:
+                if e.code not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                    raise
 
         await asyncio.get_running_loop().run_in_executor(None, _put)
-        return key
+        return location
+
+    async def find(self, key: str) -> str | None:
+        """Возвращает расположение объекта с ключом key, если он уже есть в MinIO."""
+        location = self._location(key)
+        return location if await self.stat(location) is not None else None
+
+    async def stat(self, location: str) -> int | None:
+        """Размер объекта в байтах или None, если объекта нет."""
+        await self.init()
+
+        def _stat():
+            try:
+                return self.client.stat_object(self.bucket_name, location).size
+            except S3Error as e:
+                if e.code in ("NoSuchKey", "NoSuchObject"):
+                    return None
+                raise
+
+        return await asyncio.get_running_loop().run_in_executor(None, _stat)
 
     async def load(self, location: str) -> bytes:
         """Загружает объект из MinIO по ключу."""
@@ -75,10 +118,33 @@ class MiniOPictureStorage(BasePictureStorage):
 
         return await asyncio.get_running_loop().run_in_executor(None, _get)
 
+    async def stream(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        """
+        Читает объект из MinIO частями по chunk_size. Следующая часть запрашивается,
+        только когда потребитель забрал предыдущую, а соединение освобождается
+        и при обрыве клиента (закрытие генератора).
+        """
+        await self.init()
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None,
+            partial(self.client.get_object, self.bucket_name, location, offset=offset, length=length or 0),
+        )
+        try:
+            while chunk := await loop.run_in_executor(None, response.read, self.chunk_size):
+                yield chunk
+        finally:
+            response.close()
+            response.release_conn()
+
     async def delete(self, location: str) -> None:
         """Удаляет объект из MinIO по ключу."""
 
         def _remove():
             self.client.remove_object(self.bucket_name, location)
 
-        await asyncio.get_running_loop().run_in_executor(None, _remove)
\ No newline at end of file
+        await asyncio.get_running_loop().run_in_executor(None, _remove)
+
+    async def close(self) -> None:
+        """Закрывает пул HTTP-соединений клиента MinIO."""
+        self.client._http.clear()
@@ -0,0 +1,170 @@
+import asyncio
+import math
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+from src.domain.interfaces.base_wordcloud import BaseWordCloud
+from src.domain.schemas.terms import WeightedTerm
+
+PIL_FORMATS = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP"}
+
+# имена семейств, которые понимают браузерные рендереры, но не FreeType
+GENERIC_FONTS = {
+    "sans-serif": "DejaVuSans.ttf",
+    "serif": "DejaVuSerif.ttf",
+    "monospace": "DejaVuSansMono.ttf",
+}
+
+PALETTE = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#17becf"]
+
+SCALES = {
+    "linear": lambda x: x,
+    "sqrt": math.sqrt,
+    "log": math.log1p,
+}
+
+
+class _GridIndex:
+    """Равномерная сетка для быстрого поиска пересечений прямоугольников."""
+
+    def __init__(self, cell: int):
+        self.cell = cell
+        self._cells: dict[tuple[int, int], list[tuple[int, int, int, int]]] = {}
+
+    def _keys(self, box: tuple[int, int, int, int]):
+        left, top, right, bottom = box
+        for cx in range(left // self.cell, right // self.cell + 1):
+            for cy in range(top // self.cell, bottom // self.cell + 1):
+                yield cx, cy
+
+    def intersects(self, box: tuple[int, int, int, int]) -> bool:
+        left, top, right, bottom = box
+        for key in self._keys(box):
+            for o_left, o_top, o_right, o_bottom in self._cells.get(key, ()):
+                if left < o_right and o_left < right and top < o_bottom and o_top < bottom:
+                    return True
+        return False
+
+    def add(self, box: tuple[int, int, int, int]) -> None:
+        for key in self._keys(box):
+            self._cells.setdefault(key, []).append(box)
+
+
+def _load_font(font_family: str, size: int):
+    for name in (font_family, GENERIC_FONTS.get(font_family, ""), "DejaVuSans.ttf"):
+        if not name:
+            continue
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def render_word_cloud(
+        words: list[tuple[str, int]],
+        pic_format: str,
+        width: int,
+        height: int,
+        font_family: str,
+        font_scale: int,
+        scale: str,
+) -> bytes:
+    """
+    Раскладывает слова по архимедовой спирали от центра холста и рисует их.
+    Выполняется в отдельном процессе, поэтому принимает и возвращает только простые типы.
+    """
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+
+    if words:
+        words = sorted(words, key=lambda item: item[1], reverse=True)
+        weight = SCALES.get(scale, SCALES["linear"])
+        max_weight = weight(words[0][1]) or 1
+        max_size = max(10, font_scale * height // 100)
+        min_size = max(8, max_size // 8)
+        index = _GridIndex(cell=max(16, max_size // 2))
+        fonts: dict[int, ImageFont.ImageFont] = {}
+        center_x, center_y = width // 2, height // 2
+        max_radius = math.hypot(width, height) / 2
+
+        for word, count in words:
+            size = round(min_size + (max_size - min_size) * weight(count) / max_weight)
+            if size not in fonts:
+                fonts[size] = _load_font(font_family, size)
+            font = fonts[size]
+            left, top, right, bottom = font.getbbox(word)
+            box_w, box_h = right - left, bottom - top
+            if box_w >= width or box_h >= height:
+                continue
+
+            angle = 0.0
+            step = max(2.0, size / 4)
+            while (radius := step * angle / (2 * math.pi)) < max_radius:
+                x = int(center_x + radius * math.cos(angle) - box_w / 2)
+                y = int(center_y + radius * math.sin(angle) - box_h / 2)
+                box = (x, y, x + box_w, y + box_h)
+                if x >= 0 and y >= 0 and box[2] <= width and box[3] <= height and not index.intersects(box):
+                    index.add(box)
+                    color = PALETTE[zlib.crc32(word.encode("utf-8")) % len(PALETTE)]
+                    draw.text((x - left, y - top), word, font=font, fill=color)
+                    break
+                angle += 0.35
+
+    buffer = BytesIO()
+    image.save(buffer, format=PIL_FORMATS[pic_format.lower()])
+    return buffer.getvalue()
+
+
+class LocalWordCloud(BaseWordCloud):
+    """
+    Облако слов без внешних сервисов: картинка рисуется в пуле процессов,
+    чтобы не блокировать event loop.
+    """
+
+    def __init__(
+            self,
+            pic_format: str,
+            width: int,
+            height: int,
+            font_family: str,
+            font_scale: int,
+            scale: str,
+            workers: int = 2,
+    ):
+        if pic_format.lower() not in PIL_FORMATS:
+            raise ValueError(f"Формат {pic_format!r} не поддерживается локальным рендерером")
+        self.format = pic_format
+        self.width = width
+        self.height = height
+        self.font_family = font_family
+        self.font_scale = font_scale
+        self.scale = scale
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    @property
+    def fingerprint(self) -> str:
+        return (
+            f"local:{self.format}:{self.width}x{self.height}:"
+            f"{self.font_family}:{self.font_scale}:{self.scale}"
+        )
+
+    async def get_word_cloud(self, terms: list[WeightedTerm]) -> bytes:
+        job = partial(
+            render_word_cloud,
+            [(term.text, term.weight) for term in terms],
+            pic_format=self.format,
+            width=self.width,
+            height=self.height,
+            font_family=self.font_family,
+            font_scale=self.font_scale,
+            scale=self.scale,
+        )
+        return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
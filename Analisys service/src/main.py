@@ -1,10 +1,35 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Annotated
+
+from fastapi import Depends, FastAPI
 
 from src.presentation.API.analysis import router
+from src.presentation.dependencies.analysis_service import get_container
+from src.presentation.dependencies.container import Container
+from src.utils.config import load_config
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    container = Container(load_config())
+    await container.startup()
+    app.state.container = container
+    try:
+        yield
+    finally:
+        await container.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
 
 @app.get("/health_check",tags=["health check"])
 async def health_check():
     return True
+
+
+@app.get("/metrics/picture_cache", tags=["health check"])
+async def picture_cache_metrics(container: Annotated[Container, Depends(get_container)]):
+    if container.picture_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **container.picture_cache.stats()}
@@ -1,10 +1,44 @@
-from fastapi import APIRouter, Response
+import logging
+from typing import AsyncIterator
 
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette import status
+from starlette.responses import StreamingResponse
+
+from src.application.services.analysis_jobs import JobQueueFullError
+from src.application.services.analysis import AnalysisService
+from src.presentation.DTO.AnalysisJobDTO import AnalysisJobDTO
+from src.presentation.DTO.BatchAnalysisDTO import BatchAnalysisItemDTO, BatchAnalysisRequest
 from src.presentation.DTO.FileStatDTO import FileStatDTO
-from src.presentation.dependencies.analysis_service import AnalysisServiceDep
+from src.presentation.dependencies.analysis_service import AnalysisJobServiceDep, AnalysisServiceDep
+from src.presentation.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    RangeNotSatisfiableError,
+    etag_matches,
+    make_etag,
+    parse_range,
+)
 
 router = APIRouter(prefix="/analysis",tags=["Аналитика"])
 
+logger = logging.getLogger(__name__)
+
+
+@router.post("/batch", response_class=StreamingResponse)
+async def get_file_stats(body: BatchAnalysisRequest, analysis_service: AnalysisServiceDep):
+    """Результаты отдаются построчно (NDJSON) по мере готовности, а не в порядке запроса."""
+    return StreamingResponse(_batch_lines(analysis_service, body.file_ids), media_type="application/x-ndjson")
+
+
+async def _batch_lines(analysis_service: AnalysisService, file_ids: list[int]) -> AsyncIterator[str]:
+    async for file_id, result in analysis_service.get_file_stats(file_ids):
+        if isinstance(result, Exception):
+            logger.error("Не удалось проанализировать файл %s", file_id, exc_info=result)
+            item = BatchAnalysisItemDTO(file_id=file_id, error=str(result) or type(result).__name__)
+        else:
+            item = BatchAnalysisItemDTO(file_id=file_id, result=FileStatDTO.model_validate(result, from_attributes=True))
+        yield item.model_dump_json() + "\n"
+
 
 @router.get("/{file_id}", response_model=FileStatDTO)
 async def get_file_stat(file_id: int, analysis_service: AnalysisServiceDep):
@@ -15,10 +49,77 @@ async def get_file_stat(file_id: int, analysis_service: AnalysisServiceDep):
         char_count=stat.char_count,
         is_unique=stat.is_unique,
         wordcloud_location=stat.wordcloud_location,
+        similarity=stat.similarity,
+        similar_files=stat.similar_files,
     )
 
 
+@router.post("/{file_id}/jobs", response_model=AnalysisJobDTO, status_code=status.HTTP_202_ACCEPTED)
+async def create_analysis_job(file_id: int, job_service: AnalysisJobServiceDep, response: Response):
+    try:
+        job = await job_service.submit(file_id)
+    except JobQueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Очередь анализа переполнена, повторите позже",
+            headers={"Retry-After": "5"},
+        )
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.id}"
+    return AnalysisJobDTO.model_validate(job, from_attributes=True)
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobDTO)
+async def get_analysis_job(job_id: int, job_service: AnalysisJobServiceDep):
+    job = await job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Задача с id={job_id} не найдена"
+        )
+    return AnalysisJobDTO.model_validate(job, from_attributes=True)
+
+
 @router.get("/wordcloud/{location:path}")
-async def get_wordcloud(location: str, analysis_service: AnalysisServiceDep):
-    content = await analysis_service.get_word_cloud(location)
-    return Response(content=content, media_type="image/png")
+async def get_wordcloud(location: str, analysis_service: AnalysisServiceDep, request: Request):
+    etag = make_etag(location)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    size = await analysis_service.get_word_cloud_size(location)
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Облако слов {location} не найдено"
+        )
+
+    # If-None-Match, в том числе "*", совпадает, только если объект существует (RFC 9110, 13.1.2)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag:
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+    if byte_range is None:
+        return StreamingResponse(
+            analysis_service.stream_word_cloud(location),
+            media_type="image/png",
+            headers={**headers, "Content-Length": str(size)},
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        analysis_service.stream_word_cloud(location, offset=start, length=end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="image/png",
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)},
+    )
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+from src.domain.schemas.analysis_job import JobStatus
+from src.presentation.DTO.FileStatDTO import FileStatDTO
+
+
+class AnalysisJobDTO(BaseModel):
+    id: int
+    file_id: int
+    status: JobStatus
+    error: str | None = None
+    result: FileStatDTO | None = None
+
+    class Config:
+        from_attributes = True
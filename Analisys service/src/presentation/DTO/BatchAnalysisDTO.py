@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+from src.presentation.DTO.FileStatDTO import FileStatDTO
+
+
+class BatchAnalysisRequest(BaseModel):
+    file_ids: list[int] = Field(min_length=1, max_length=1000)
+
+
+class BatchAnalysisItemDTO(BaseModel):
+    """Одна строка NDJSON-ответа пакетного анализа."""
+    file_id: int
+    result: FileStatDTO | None = None
+    error: str | None = None
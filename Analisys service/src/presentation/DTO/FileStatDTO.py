@@ -1,12 +1,22 @@
 from pydantic import BaseModel
 
 
+class SimilarFileDTO(BaseModel):
+    file_id: int
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
 class FileStatDTO(BaseModel):
     file_id: int
     word_count: int
     char_count: int
     is_unique: bool
     wordcloud_location: str
+    similarity: float = 0.0
+    similar_files: list[SimilarFileDTO] | None = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
@@ -0,0 +1,91 @@
+from src.application.services.analysis import AnalysisService
+from src.application.services.analysis_jobs import AnalysisJobService
+from src.application.services.minhash import MinHasher
+from src.application.services.terms import TermExtractor
+from src.domain.interfaces.base_wordcloud import BaseWordCloud
+from src.infrastructure.database.db_context import engine
+from src.infrastructure.database.repositories.analysis_job import SQLAnalysisJob
+from src.infrastructure.database.repositories.file_stat import SQLFileStat
+from src.infrastructure.external_api.HTTPFileTextReader import HTTPFileTextReader
+from src.infrastructure.external_api.HTTPWordCloud import HTTPWordCloud
+from src.infrastructure.picture_storage.CachedPictureStorage import CachedPictureStorage
+from src.infrastructure.picture_storage.MiniOPictureStorage import MiniOPictureStorage
+from src.infrastructure.word_cloud.LocalWordCloud import LocalWordCloud
+from src.utils.config import Config, WordCloudConfig
+
+
+class Container:
+    """
+    Зависимости сервиса, создаваемые один раз на время жизни приложения.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.text_reader = HTTPFileTextReader(
+            **config.file_store_service.model_dump()
+        )
+        self.pic_storage = MiniOPictureStorage(
+            endpoint=config.minio.endpoint,
+            access_key=config.minio.access_key,
+            secret_key=config.minio.secret_key,
+            bucket_name=config.minio.bucket_name,
+            secure=config.minio.secure,
+            prefix="picture"
+        )
+        self.picture_cache: CachedPictureStorage | None = None
+        if config.picture_cache.max_bytes > 0:
+            self.picture_cache = self.pic_storage = CachedPictureStorage(
+                storage=self.pic_storage,
+                max_bytes=config.picture_cache.max_bytes,
+                max_item_bytes=config.picture_cache.max_item_bytes,
+            )
+        self.word_cloud = self._build_word_cloud(config.word_cloud)
+        self.file_stat_repository = SQLFileStat()
+        self.min_hasher = MinHasher(**config.similarity.model_dump())
+        self.analysis_service = AnalysisService(
+            text_reader=self.text_reader,
+            pic_storage=self.pic_storage,
+            word_cloud=self.word_cloud,
+            file_stat_repository=self.file_stat_repository,
+            term_extractor=TermExtractor(
+                top_n=config.terms.top_n,
+                languages=config.terms.languages,
+            ),
+            batch_concurrency=config.batch.concurrency,
+            min_hasher=self.min_hasher,
+        )
+        self.job_service = AnalysisJobService(
+            analysis_service=self.analysis_service,
+            job_repository=SQLAnalysisJob(),
+            workers=config.jobs.workers,
+            queue_size=config.jobs.queue_size,
+            lease_time=config.jobs.lease_time,
+            poll_interval=config.jobs.poll_interval,
+        )
+
+    @staticmethod
+    def _build_word_cloud(config: WordCloudConfig) -> BaseWordCloud:
+        if config.backend == "local":
+            return LocalWordCloud(
+                pic_format=config.pic_format,
+                width=config.width,
+                height=config.height,
+                font_family=config.font_family,
+                font_scale=config.font_scale,
+                scale=config.scale,
+                workers=config.render_workers,
+            )
+        return HTTPWordCloud(
+            **config.model_dump(exclude={"backend", "render_workers"})
+        )
+
+    async def startup(self) -> None:
+        await self.job_service.start()
+
+    async def shutdown(self) -> None:
+        await self.job_service.stop()
+        await self.text_reader.close()
+        await self.word_cloud.close()
+        await self.min_hasher.close()
+        await self.pic_storage.close()
+        await engine.dispose()
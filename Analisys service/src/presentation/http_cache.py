@@ -0,0 +1,51 @@
+import hashlib
+
+# содержимое по одному location никогда не меняется
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class RangeNotSatisfiableError(Exception):
+    pass
+
+
+def make_etag(location: str) -> str:
+    return f'"{hashlib.sha256(location.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Слабое сравнение из If-None-Match (RFC 9110, 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def parse_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Разбирает заголовок Range с одним диапазоном байт и возвращает (start, end) включительно.
+    None — заголовка нет или он не поддерживается, и нужно отдать объект целиком.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header.removeprefix("bytes=").strip()
+    if "," in spec:
+        return None
+    first, sep, last = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiableError
+            start, end = max(size - suffix, 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise RangeNotSatisfiableError
+    return start, end
@@ -1,6 +1,7 @@
 import os
 import re
 from pathlib import Path
+from typing import Literal
 
 import yaml
 from dotenv import load_dotenv
@@ -63,14 +64,24 @@ class MinioConfig(BaseModel):
         return f"{self.host}:{self.port}"
 
 
-class StoreServiceConfig(BaseModel):
+class HTTPClientConfig(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    http2: bool = True
+
+
+class StoreServiceConfig(HTTPClientConfig):
     host: str
     port: int
     secure: bool
     path: str
 
 
-class WordCloudConfig(BaseModel):
+class WordCloudConfig(HTTPClientConfig):
+    backend: Literal["http", "local"] = "http"
     host: str
     path: str
     pic_format: str
@@ -79,6 +90,45 @@ class WordCloudConfig(BaseModel):
     font_family: str
     font_scale: int
     scale: str
+    render_workers: int = 2
+
+
+class TermsConfig(BaseModel):
+    top_n: int = 200
+    languages: list[str] = ["ru", "en"]
+
+
+class PictureCacheConfig(BaseModel):
+    # 0 — кэш выключен
+    max_bytes: int = 64 * 1024 * 1024
+    max_item_bytes: int | None = None
+
+
+class JobsConfig(BaseModel):
+    workers: int = 4
+    # сколько задач может ждать в очереди
+    queue_size: int = 1000
+    # аренда задачи продлевается, пока реплика её выполняет; после падения
+    # реплики задачу подхватит другая, когда аренда истечёт
+    lease_time: float = 60.0
+    # как часто свободный воркер проверяет очередь в БД
+    poll_interval: float = 1.0
+
+
+class BatchConfig(BaseModel):
+    # сколько файлов пакетного запроса анализируется одновременно
+    concurrency: int = 8
+
+
+class SimilarityConfig(BaseModel):
+    # смена num_perm, bands, shingle_size или max_shingles делает старые сигнатуры несравнимыми
+    num_perm: int = 128
+    bands: int = 32
+    shingle_size: int = 3
+    threshold: float = 0.5
+    top_k: int = 5
+    max_shingles: int = 2000
+    workers: int = 2
 
 
 class Config(BaseModel):
@@ -86,6 +136,11 @@ class Config(BaseModel):
     minio: MinioConfig
     file_store_service: StoreServiceConfig
     word_cloud: WordCloudConfig
+    terms: TermsConfig = TermsConfig()
+    picture_cache: PictureCacheConfig = PictureCacheConfig()
+    jobs: JobsConfig = JobsConfig()
+    batch: BatchConfig = BatchConfig()
+    similarity: SimilarityConfig = SimilarityConfig()
 
 
 def load_config() -> Config:
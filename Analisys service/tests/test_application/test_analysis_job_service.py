@@ -0,0 +1,220 @@
+import asyncio
+
+import pytest
+
+from src.application.services.analysis import AnalysisService
+from src.application.services.analysis_jobs import AnalysisJobService, JobQueueFullError
+from src.domain.interfaces.repositories.base_analysis_job_repository import BaseAnalysisJobRepository
+from src.domain.schemas.analysis_job import AnalysisJobSchema, JobStatus
+from src.domain.schemas.file_stats import FileStatSchema
+
+
+class TestAnalysisJobService:
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker):
+        self.mock_analysis_service = mocker.Mock(spec=AnalysisService)
+        self.mock_analysis_service.get_file_stat = mocker.AsyncMock()
+        self.mock_job_repository = mocker.Mock(spec=BaseAnalysisJobRepository)
+        self.mock_job_repository.add_one = mocker.AsyncMock(return_value=11)
+        self.mock_job_repository.set_status = mocker.AsyncMock()
+        self.mock_job_repository.get_job = mocker.AsyncMock(return_value=None)
+        self.mock_job_repository.count_queued = mocker.AsyncMock(return_value=0)
+        self.mock_job_repository.renew_lease = mocker.AsyncMock()
+        # очередь в «БД»: claim отдаёт задачи по одной, пока они есть
+        self.queued: list[AnalysisJobSchema] = []
+        self.mock_job_repository.claim = mocker.AsyncMock(
+            side_effect=lambda lease_time: self.queued.pop(0) if self.queued else None
+        )
+
+        self.service = AnalysisJobService(
+            analysis_service=self.mock_analysis_service,
+            job_repository=self.mock_job_repository,
+            workers=2,
+            queue_size=2,
+            lease_time=0.03,
+            poll_interval=0.01,
+        )
+
+    async def _drain(self):
+        # ждём, пока воркеры разберут очередь и завершат задачи
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            done = [call.args[1] for call in self.mock_job_repository.set_status.await_args_list]
+            if not self.queued and len(done) >= self.expected_done:
+                return
+        raise AssertionError("задачи не обработаны")
+
+    @pytest.mark.asyncio
+    async def test_submit_persists_and_returns_queued_job(self):
+        # Act
+        job = await self.service.submit(5)
+
+        # Assert
+        assert job == AnalysisJobSchema(id=11, file_id=5, status=JobStatus.QUEUED)
+        self.mock_job_repository.add_one.assert_awaited_once_with(
+            data={"file_id": 5, "status": JobStatus.QUEUED}
+        )
+
+    @pytest.mark.asyncio
+    async def test_submit_rejects_when_queue_is_full(self):
+        # Arrange
+        self.mock_job_repository.count_queued.return_value = 2
+
+        # Act & Assert
+        with pytest.raises(JobQueueFullError):
+            await self.service.submit(3)
+        self.mock_job_repository.add_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_worker_runs_claimed_job_and_marks_done(self):
+        # Arrange
+        self.queued = [AnalysisJobSchema(id=11, file_id=5, status=JobStatus.RUNNING)]
+        self.expected_done = 1
+
+        # Act
+        await self.service.start()
+        await self._drain()
+        await self.service.stop()
+
+        # Assert
+        self.mock_analysis_service.get_file_stat.assert_awaited_once_with(5)
+        self.mock_job_repository.claim.assert_awaited_with(0.03)
+        self.mock_job_repository.set_status.assert_awaited_once_with(11, JobStatus.DONE)
+
+    @pytest.mark.asyncio
+    async def test_worker_records_failure(self):
+        # Arrange
+        self.mock_analysis_service.get_file_stat.side_effect = RuntimeError("store down")
+        self.queued = [AnalysisJobSchema(id=11, file_id=5, status=JobStatus.RUNNING)]
+        self.expected_done = 1
+
+        # Act
+        await self.service.start()
+        await self._drain()
+        await self.service.stop()
+
+        # Assert
+        self.mock_job_repository.set_status.assert_awaited_with(11, JobStatus.FAILED, error="store down")
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_by_worker_count(self):
+        # Arrange
+        running = 0
+        peak = 0
+
+        async def slow(file_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        self.mock_analysis_service.get_file_stat.side_effect = slow
+        self.queued = [AnalysisJobSchema(id=i, file_id=i, status=JobStatus.RUNNING) for i in range(6)]
+        self.expected_done = 6
+
+        # Act
+        await self.service.start()
+        await self._drain()
+        await self.service.stop()
+
+        # Assert
+        assert peak == 2
+        assert self.mock_analysis_service.get_file_stat.await_count == 6
+
+    @pytest.mark.asyncio
+    async def test_submit_wakes_idle_worker(self):
+        # Arrange
+        self.service.poll_interval = 10
+        await self.service.start()
+        await asyncio.sleep(0.01)
+
+        # Act
+        self.queued = [AnalysisJobSchema(id=11, file_id=5, status=JobStatus.RUNNING)]
+        self.expected_done = 1
+        await self.service.submit(5)
+        await self._drain()
+        await self.service.stop()
+
+        # Assert
+        self.mock_analysis_service.get_file_stat.assert_awaited_once_with(5)
+
+    @pytest.mark.asyncio
+    async def test_lease_is_renewed_while_job_runs(self):
+        # Arrange
+        async def slow(file_id):
+            await asyncio.sleep(0.05)
+
+        self.mock_analysis_service.get_file_stat.side_effect = slow
+        self.queued = [AnalysisJobSchema(id=11, file_id=5, status=JobStatus.RUNNING)]
+        self.expected_done = 1
+
+        # Act
+        await self.service.start()
+        await self._drain()
+        await self.service.stop()
+
+        # Assert
+        assert self.mock_job_repository.renew_lease.await_count >= 2
+        self.mock_job_repository.renew_lease.assert_awaited_with(11, 0.03)
+
+    @pytest.mark.asyncio
+    async def test_stop_returns_running_job_to_queue(self):
+        # Arrange
+        started = asyncio.Event()
+
+        async def hanging(file_id):
+            started.set()
+            await asyncio.sleep(10)
+
+        self.mock_analysis_service.get_file_stat.side_effect = hanging
+        self.queued = [AnalysisJobSchema(id=11, file_id=5, status=JobStatus.RUNNING)]
+        await self.service.start()
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        # Act
+        await self.service.stop()
+
+        # Assert
+        self.mock_job_repository.set_status.assert_awaited_once_with(11, JobStatus.QUEUED)
+
+    @pytest.mark.asyncio
+    async def test_worker_survives_claim_errors(self):
+        # Arrange
+        job = AnalysisJobSchema(id=11, file_id=5, status=JobStatus.RUNNING)
+        self.mock_job_repository.claim.side_effect = [RuntimeError("db down"), job, None, None, None]
+        self.service.workers = 1
+        self.expected_done = 1
+
+        # Act
+        await self.service.start()
+        await self._drain()
+        await self.service.stop()
+
+        # Assert
+        self.mock_analysis_service.get_file_stat.assert_awaited_once_with(5)
+
+    @pytest.mark.asyncio
+    async def test_get_job_attaches_result_when_done(self):
+        # Arrange
+        stat = FileStatSchema(id=1, file_id=5, word_count=1, char_count=1, is_unique=True, wordcloud_location="x")
+        self.mock_job_repository.get_job.return_value = AnalysisJobSchema(id=11, file_id=5, status=JobStatus.DONE)
+        self.mock_analysis_service.get_file_stat.return_value = stat
+
+        # Act
+        job = await self.service.get_job(11)
+
+        # Assert
+        assert job.result == stat
+
+    @pytest.mark.asyncio
+    async def test_get_job_without_result_while_running(self):
+        # Arrange
+        self.mock_job_repository.get_job.return_value = AnalysisJobSchema(id=11, file_id=5, status=JobStatus.RUNNING)
+
+        # Act
+        job = await self.service.get_job(11)
+
+        # Assert
+        assert job.result is None
+        self.mock_analysis_service.get_file_stat.assert_not_called()
@@ -1,4 +1,6 @@
+import asyncio
 import hashlib
+
 import pytest
 
 from src.application.services.analysis import AnalysisService
@@ -7,6 +9,7 @@ from src.domain.interfaces.base_picture_storage import BasePictureStorage
 from src.domain.interfaces.base_wordcloud import BaseWordCloud
 from src.domain.interfaces.repositories.base_file_stat_repository import BaseFileStatRepository
 from src.domain.schemas.file_stats import FileStatSchema
+from src.domain.schemas.terms import WeightedTerm
 
 
 class BaseTestAnalysisService:
@@ -16,10 +19,15 @@ class BaseTestAnalysisService:
         self.mock_text_reader = mocker.Mock(spec=BaseFileTextReader)
         self.mock_word_cloud  = mocker.Mock(spec=BaseWordCloud)
         self.mock_pic_storage = mocker.Mock(spec=BasePictureStorage)
+        self.mock_word_cloud.fingerprint = "test-render"
+        # По умолчанию — готовой картинки нет
+        self.mock_pic_storage.find = mocker.AsyncMock(return_value=None)
         self.mock_file_stat_repository = mocker.Mock(spec=BaseFileStatRepository)
 
         # По умолчанию — нет статистики
         self.mock_file_stat_repository.get_file_stat = mocker.AsyncMock(return_value=None)
+        # По умолчанию — похожих файлов нет
+        self.mock_file_stat_repository.find_similar_candidates = mocker.AsyncMock(return_value=[])
 
         # И создаём сервис
         self.service = AnalysisService(
@@ -66,7 +74,7 @@ class TestAnalysisService(BaseTestAnalysisService):
 
         self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value=raw)
         self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=True)
-        self.mock_file_stat_repository.add_one = mocker.AsyncMock(return_value=99)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(99, True))
         self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc")
         self.mock_pic_storage.save = mocker.AsyncMock(return_value="loc")
 
@@ -85,17 +93,26 @@ class TestAnalysisService(BaseTestAnalysisService):
         self.mock_file_stat_repository.get_file_stat.assert_awaited_once_with(file_id)
         self.mock_text_reader.get_file_text_by_id.assert_awaited_once_with(file_id)
         self.mock_file_stat_repository.check_unique.assert_awaited_once_with(h)
-        self.mock_word_cloud.get_word_cloud.assert_awaited_once_with(raw)
-        self.mock_pic_storage.save.assert_awaited_once_with(b"wc")
-        data = self.mock_file_stat_repository.add_one.call_args[1]["data"]
+        terms = [WeightedTerm(text="one", weight=1), WeightedTerm(text="two", weight=1)]
+        self.mock_word_cloud.get_word_cloud.assert_awaited_once_with(terms)
+        key = self.service._get_word_cloud_key(h)
+        self.mock_pic_storage.find.assert_awaited_once_with(key)
+        self.mock_pic_storage.save.assert_awaited_once_with(b"wc", key=key)
+        data = self.mock_file_stat_repository.add_or_get.call_args[1]["data"]
         assert data == {
             "file_id": file_id,
             "word_count": 2,
             "char_count": len(raw),
             "is_unique": True,
             "wordcloud_location": "loc",
-            "normalized_hash": h
+            "normalized_hash": h,
+            "terms": [{"text": "one", "weight": 1}, {"text": "two", "weight": 1}],
+            "minhash": self.service.min_hasher.signature(norm),
+            "lsh_buckets": self.service.min_hasher.buckets(self.service.min_hasher.signature(norm)),
+            "similarity": 0.0,
+            "similar_files": [],
         }
+        assert stat.terms == terms
 
 
     @pytest.mark.asyncio
@@ -108,7 +125,7 @@ class TestAnalysisService(BaseTestAnalysisService):
 
         self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value=raw)
         self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=False)
-        self.mock_file_stat_repository.add_one = mocker.AsyncMock(return_value=100)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(100, True))
         self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc2")
         self.mock_pic_storage.save = mocker.AsyncMock(return_value="loc2")
 
@@ -121,6 +138,430 @@ class TestAnalysisService(BaseTestAnalysisService):
         self.mock_file_stat_repository.check_unique.assert_awaited_once_with(h)
 
 
+class TestAnalysisServiceDeduplication(BaseTestAnalysisService):
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_computation(self, mocker):
+        # Arrange
+        release = asyncio.Event()
+
+        async def slow_text(file_id):
+            await release.wait()
+            return "a b c"
+
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(side_effect=slow_text)
+        self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=True)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(1, True))
+        self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc")
+        self.mock_pic_storage.save = mocker.AsyncMock(return_value="loc")
+
+        # Act
+        waiters = [asyncio.create_task(self.service.get_file_stat(3)) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        # Assert
+        assert all(result == results[0] for result in results)
+        self.mock_text_reader.get_file_text_by_id.assert_awaited_once_with(3)
+        self.mock_word_cloud.get_word_cloud.assert_awaited_once()
+        self.mock_pic_storage.save.assert_awaited_once()
+        self.mock_file_stat_repository.add_or_get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stat_saved_by_other_replica_first_is_returned(self, mocker):
+        # Arrange
+        stat = FileStatSchema(id=1, file_id=4, word_count=1, char_count=1, is_unique=True, wordcloud_location="x")
+        self.mock_file_stat_repository.get_file_stat.side_effect = [None, stat]
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value="a b c")
+        self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=True)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(1, False))
+        self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc")
+        self.mock_pic_storage.save = mocker.AsyncMock(return_value="loc")
+
+        # Act
+        got = await self.service.get_file_stat(4)
+
+        # Assert
+        assert got == stat
+        self.mock_file_stat_repository.add_or_get.assert_awaited_once()
+        assert self.mock_file_stat_repository.get_file_stat.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_and_not_cached(self, mocker):
+        # Arrange
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(side_effect=RuntimeError("store down"))
+
+        # Act
+        results = await asyncio.gather(
+            self.service.get_file_stat(5), self.service.get_file_stat(5), return_exceptions=True
+        )
+
+        # Assert
+        assert all(isinstance(result, RuntimeError) for result in results)
+        self.mock_text_reader.get_file_text_by_id.assert_awaited_once_with(5)
+        with pytest.raises(RuntimeError):
+            await self.service.get_file_stat(5)
+        assert self.mock_text_reader.get_file_text_by_id.await_count == 2
+
+
+class TestAnalysisServiceBatch(BaseTestAnalysisService):
+
+    @staticmethod
+    def _stat(file_id):
+        return FileStatSchema(
+            id=file_id, file_id=file_id, word_count=1, char_count=1, is_unique=True, wordcloud_location="x"
+        )
+
+    @pytest.mark.asyncio
+    async def test_cached_stats_come_first_from_one_query(self, mocker):
+        # Arrange
+        self.mock_file_stat_repository.get_file_stats = mocker.AsyncMock(return_value=[self._stat(2), self._stat(1)])
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value="a b")
+        self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=True)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(3, True))
+        self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc")
+        self.mock_pic_storage.save = mocker.AsyncMock(return_value="loc")
+
+        async def texts(file_ids):
+            self.batch_requested = file_ids
+            yield 3, "a b"
+
+        self.mock_text_reader.get_file_texts_by_ids = texts
+
+        # Act
+        results = [item async for item in self.service.get_file_stats([1, 3, 2, 1])]
+
+        # Assert
+        self.mock_file_stat_repository.get_file_stats.assert_awaited_once_with([1, 3, 2])
+        assert [file_id for file_id, _ in results] == [1, 2, 3]
+        assert results[2][1].id == 3
+        assert self.batch_requested == [3]
+        self.mock_text_reader.get_file_text_by_id.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_misses_run_under_semaphore_and_errors_are_per_file(self, mocker):
+        # Arrange
+        self.service.batch_concurrency = 2
+        self.mock_file_stat_repository.get_file_stats = mocker.AsyncMock(return_value=[])
+        running = peak = 0
+
+        async def texts(file_ids):
+            for file_id in file_ids:
+                yield file_id, f"text {file_id}"
+
+        self.mock_text_reader.get_file_texts_by_ids = texts
+
+        async def compute(file_id, file_text):
+            assert file_text == f"text {file_id}"
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if file_id == 4:
+                raise RuntimeError("store down")
+            return self._stat(file_id)
+
+        self.service._get_file_stat = compute
+
+        # Act
+        results = dict([item async for item in self.service.get_file_stats(list(range(1, 7)))])
+
+        # Assert
+        assert peak == 2
+        assert isinstance(results.pop(4), RuntimeError)
+        assert {file_id: stat.file_id for file_id, stat in results.items()} == {1: 1, 2: 2, 3: 3, 5: 5, 6: 6}
+
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_stops_batch_read(self, mocker):
+        # Arrange
+        self.service.batch_concurrency = 2
+        self.mock_file_stat_repository.get_file_stats = mocker.AsyncMock(return_value=[])
+        read = []
+
+        async def texts(file_ids):
+            for file_id in file_ids:
+                read.append(file_id)
+                yield file_id, f"text {file_id}"
+
+        self.mock_text_reader.get_file_texts_by_ids = texts
+
+        async def compute(file_id, file_text):
+            return self._stat(file_id)
+
+        self.service._get_file_stat = compute
+        stats = self.service.get_file_stats(list(range(1, 7)))
+
+        # Act
+        await anext(stats)
+        await asyncio.sleep(0.01)
+        read_while_first_held = len(read)
+        rest = [item async for item in stats]
+
+        # Assert
+        assert read_while_first_held == 3
+        assert len(rest) == 5
+
+    @pytest.mark.asyncio
+    async def test_batch_read_is_closed_when_consumer_leaves(self, mocker):
+        # Arrange
+        self.service.batch_concurrency = 1
+        self.mock_file_stat_repository.get_file_stats = mocker.AsyncMock(return_value=[])
+        closed = asyncio.Event()
+
+        async def texts(file_ids):
+            try:
+                for file_id in file_ids:
+                    yield file_id, f"text {file_id}"
+            finally:
+                closed.set()
+
+        readers = []
+
+        def get_file_texts_by_ids(file_ids):
+            # ссылка не даёт сборщику мусора закрыть генератор вместо сервиса
+            readers.append(texts(file_ids))
+            return readers[-1]
+
+        self.mock_text_reader.get_file_texts_by_ids = get_file_texts_by_ids
+
+        async def compute(file_id, file_text):
+            return self._stat(file_id)
+
+        self.service._get_file_stat = compute
+        stats = self.service.get_file_stats([1, 2, 3])
+
+        # Act: первый результат забран, чтение второго текста ждёт свободного слота
+        await anext(stats)
+        await asyncio.sleep(0.01)
+        await stats.aclose()
+
+        # Assert
+        await asyncio.wait_for(closed.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_single_reads_when_batch_read_fails(self, mocker):
+        # Arrange
+        self.mock_file_stat_repository.get_file_stats = mocker.AsyncMock(return_value=[])
+
+        async def texts(file_ids):
+            yield 1, "one"
+            raise RuntimeError("connection reset")
+
+        self.mock_text_reader.get_file_texts_by_ids = texts
+        calls = []
+
+        async def compute(file_id, file_text):
+            calls.append((file_id, file_text))
+            return self._stat(file_id)
+
+        self.service._get_file_stat = compute
+
+        # Act
+        results = dict([item async for item in self.service.get_file_stats([1, 2])])
+
+        # Assert
+        assert set(results) == {1, 2}
+        assert sorted(calls) == [(1, "one"), (2, None)]
+
+
+class TestAnalysisServiceSimilarity(BaseTestAnalysisService):
+
+    @pytest.fixture(autouse=True)
+    def _pipeline(self, _setup, mocker):
+        self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=True)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(1, True))
+        self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc")
+        self.mock_pic_storage.save = mocker.AsyncMock(return_value="loc")
+
+    @pytest.mark.asyncio
+    async def test_reports_closest_matches_from_lsh_candidates(self, mocker):
+        # Arrange
+        base = " ".join(f"слово{i}" for i in range(200))
+        edited = base.replace("слово100", "другое")
+        hasher = self.service.min_hasher
+        other = " ".join(f"иное{i}" for i in range(200))
+        self.mock_file_stat_repository.find_similar_candidates.return_value = [
+            (2, hasher.signature(base)),
+            (3, hasher.signature(other)),
+        ]
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value=edited.upper())
+
+        # Act
+        stat = await self.service.get_file_stat(9)
+
+        # Assert
+        buckets, = self.mock_file_stat_repository.find_similar_candidates.call_args[0]
+        assert buckets == hasher.buckets(hasher.signature(edited))
+        assert self.mock_file_stat_repository.find_similar_candidates.call_args[1] == {"exclude_file_id": 9}
+        assert [match.file_id for match in stat.similar_files] == [2]
+        assert stat.similarity == stat.similar_files[0].score > 0.9
+        data = self.mock_file_stat_repository.add_or_get.call_args[1]["data"]
+        assert data["similar_files"] == [{"file_id": 2, "score": stat.similarity}]
+
+    @pytest.mark.asyncio
+    async def test_empty_text_skips_similarity_lookup(self, mocker):
+        # Arrange
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value="   ")
+
+        # Act
+        stat = await self.service.get_file_stat(1)
+
+        # Assert
+        self.mock_file_stat_repository.find_similar_candidates.assert_not_called()
+        assert stat.similarity == 0.0
+        data = self.mock_file_stat_repository.add_or_get.call_args[1]["data"]
+        assert data["minhash"] is None and data["lsh_buckets"] is None
+
+
+class TestAnalysisServicePipeline(BaseTestAnalysisService):
+
+    @pytest.fixture(autouse=True)
+    def _pipeline(self, _setup, mocker):
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value="x y")
+        self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=True)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(1, True))
+        self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc")
+        self.mock_pic_storage.save = mocker.AsyncMock(return_value="loc")
+        self.mock_pic_storage.delete = mocker.AsyncMock()
+
+    @pytest.mark.asyncio
+    async def test_unique_check_and_word_cloud_run_concurrently(self):
+        # Arrange
+        started = []
+        both_started = asyncio.Event()
+
+        async def stage(name, result):
+            started.append(name)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return result
+
+        async def check_unique(normalized_hash):
+            return await stage("unique", True)
+
+        async def get_word_cloud(terms):
+            return await stage("cloud", b"wc")
+
+        self.mock_file_stat_repository.check_unique.side_effect = check_unique
+        self.mock_word_cloud.get_word_cloud.side_effect = get_word_cloud
+
+        # Act
+        stat = await self.service.get_file_stat(1)
+
+        # Assert
+        assert sorted(started) == ["cloud", "unique"]
+        assert stat.wordcloud_location == "loc"
+
+    @pytest.mark.asyncio
+    async def test_failed_stage_cancels_sibling(self):
+        # Arrange
+        cancelled = asyncio.Event()
+
+        async def hanging_cloud(terms):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        self.mock_word_cloud.get_word_cloud.side_effect = hanging_cloud
+        self.mock_file_stat_repository.check_unique.side_effect = RuntimeError("db down")
+
+        # Act
+        with pytest.raises(RuntimeError, match="db down"):
+            await self.service.get_file_stat(1)
+
+        # Assert
+        assert cancelled.is_set()
+        self.mock_pic_storage.save.assert_not_called()
+        self.mock_pic_storage.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_picture_kept_for_reuse_when_insert_fails(self):
+        # Arrange
+        self.mock_file_stat_repository.add_or_get.side_effect = RuntimeError("db down")
+
+        # Act
+        with pytest.raises(RuntimeError, match="db down"):
+            await self.service.get_file_stat(1)
+
+        # Assert
+        self.mock_pic_storage.save.assert_awaited_once()
+        self.mock_pic_storage.delete.assert_not_called()
+
+
+class TestAnalysisServiceWordCloudCache(BaseTestAnalysisService):
+
+    @pytest.fixture(autouse=True)
+    def _pipeline(self, _setup, mocker):
+        self.mock_file_stat_repository.check_unique = mocker.AsyncMock(return_value=False)
+        self.mock_file_stat_repository.add_or_get = mocker.AsyncMock(return_value=(1, True))
+        self.mock_word_cloud.get_word_cloud = mocker.AsyncMock(return_value=b"wc")
+        self.mock_pic_storage.save = mocker.AsyncMock(side_effect=lambda content, key: f"picture/{key}.png")
+
+    @pytest.mark.asyncio
+    async def test_existing_picture_is_reused_without_rendering(self, mocker):
+        # Arrange
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(return_value="same text")
+        self.mock_pic_storage.find.return_value = "picture/existing.png"
+
+        # Act
+        stat = await self.service.get_file_stat(1)
+
+        # Assert
+        assert stat.wordcloud_location == "picture/existing.png"
+        self.mock_word_cloud.get_word_cloud.assert_not_called()
+        self.mock_pic_storage.save.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_same_normalized_text_maps_to_same_picture(self, mocker):
+        # Arrange
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(side_effect=["Same  Text", "same text\n"])
+
+        # Act
+        first = await self.service.get_file_stat(1)
+        second = await self.service.get_file_stat(2)
+
+        # Assert
+        assert first.wordcloud_location == second.wordcloud_location
+        keys = [call.args[0] for call in self.mock_pic_storage.find.await_args_list]
+        assert keys[0] == keys[1]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_files_with_same_text_render_picture_once(self, mocker):
+        # Arrange
+        release = asyncio.Event()
+
+        async def slow_render(terms):
+            await release.wait()
+            return b"wc"
+
+        self.mock_text_reader.get_file_text_by_id = mocker.AsyncMock(side_effect=["Same text", "same  TEXT"])
+        self.mock_word_cloud.get_word_cloud.side_effect = slow_render
+
+        # Act
+        waiters = [asyncio.create_task(self.service.get_file_stat(file_id)) for file_id in (1, 2)]
+        await asyncio.sleep(0.01)
+        release.set()
+        first, second = await asyncio.gather(*waiters)
+
+        # Assert
+        assert first.wordcloud_location == second.wordcloud_location
+        self.mock_word_cloud.get_word_cloud.assert_awaited_once()
+        self.mock_pic_storage.save.assert_awaited_once()
+
+    def test_key_depends_on_render_parameters(self):
+        key = self.service._get_word_cloud_key("h")
+        self.mock_word_cloud.fingerprint = "other-render"
+
+        assert self.service._get_word_cloud_key("h") != key
+        assert self.service._get_word_cloud_key("h2") != self.service._get_word_cloud_key("h")
+
+
 def test_static_normalization():
     text = "  A  B\nC "
     expected = hashlib.sha256("a b c".encode()).hexdigest()
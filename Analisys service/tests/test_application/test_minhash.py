@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from src.application.services.minhash import MinHasher
+
+
+class TestMinHasher:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.hasher = MinHasher(num_perm=128, bands=32, shingle_size=3)
+        self.text = " ".join(f"w{i}" for i in range(300))
+
+    def test_signature_is_deterministic_across_instances(self):
+        assert self.hasher.signature(self.text) == MinHasher().signature(self.text)
+        assert len(self.hasher.signature(self.text)) == 128
+
+    def test_similarity_estimates_jaccard(self):
+        # Arrange: меняется одно слово из 300 — пропадают 3 шингла из 298
+        edited = self.text.replace("w150", "x")
+
+        # Act
+        score = self.hasher.similarity(self.hasher.signature(self.text), self.hasher.signature(edited))
+
+        # Assert
+        assert score > 0.85
+
+    def test_near_duplicates_share_a_bucket_and_unrelated_texts_do_not(self):
+        edited = self.text.replace("w150", "x")
+        other = " ".join(f"z{i}" for i in range(300))
+
+        buckets = set(self.hasher.buckets(self.hasher.signature(self.text)))
+
+        assert buckets & set(self.hasher.buckets(self.hasher.signature(edited)))
+        assert not buckets & set(self.hasher.buckets(self.hasher.signature(other)))
+
+    def test_bucket_keys_depend_on_band_number(self):
+        signature = [7] * 128
+
+        assert len(set(self.hasher.buckets(signature))) == 32
+
+    def test_short_and_empty_texts(self):
+        assert len(self.hasher.signature("a b")) == 128
+        assert self.hasher.signature("") == []
+        assert self.hasher.buckets([]) == []
+        assert self.hasher.similarity([], []) == 0.0
+
+    def test_rank_applies_threshold_and_top_k(self):
+        hasher = MinHasher(threshold=0.5, top_k=1)
+        signature = [1, 2, 3, 4] * 32
+        candidates = [(5, [1, 2, 3, 0] * 32), (6, signature), (7, [0] * 128)]
+
+        ranked = hasher.rank(signature, candidates)
+
+        assert [(match.file_id, match.score) for match in ranked] == [(6, 1.0)]
+
+    def test_large_text_signature_uses_capped_shingle_sample(self):
+        # Arrange: около 1 МБ текста, ~170 тыс. шинглов
+        hasher = MinHasher(max_shingles=2000)
+        text = " ".join(f"слово{i}" for i in range(170_000))
+        edited = text.replace("слово85000 ", "")
+
+        # Act
+        started = time.perf_counter()
+        signature = hasher.signature(text)
+        elapsed = time.perf_counter() - started
+
+        # Assert
+        assert len(hasher.shingles(text)) == 2000
+        assert elapsed < 2
+        assert hasher.similarity(signature, hasher.signature(edited)) > 0.9
+
+    @pytest.mark.asyncio
+    async def test_get_signature_runs_in_process_pool(self):
+        hasher = MinHasher(workers=1)
+        try:
+            assert await hasher.get_signature(self.text) == self.hasher.signature(self.text)
+        finally:
+            await hasher.close()
+
+    def test_bands_must_divide_permutations(self):
+        with pytest.raises(ValueError):
+            MinHasher(num_perm=100, bands=32)
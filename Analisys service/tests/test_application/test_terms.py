@@ -0,0 +1,29 @@
+import pytest
+
+from src.application.services.terms import TermExtractor
+from src.domain.schemas.terms import WeightedTerm
+
+
+class TestTermExtractor:
+
+    def test_counts_words_case_insensitive_without_digits(self):
+        extractor = TermExtractor(top_n=10, languages=[])
+
+        terms = extractor.extract("Отчёт отчёт ОТЧЁТ report 2024 a report_1 x")
+
+        assert terms == [WeightedTerm(text="отчёт", weight=3), WeightedTerm(text="report", weight=2)]
+
+    def test_filters_stopwords_of_selected_languages(self):
+        text = "и the отчёт и the отчёт report"
+
+        assert [t.text for t in TermExtractor(languages=["ru", "en"]).extract(text)] == ["отчёт", "report"]
+        assert "the" in [t.text for t in TermExtractor(languages=["ru"]).extract(text)]
+
+    def test_keeps_top_n(self):
+        terms = TermExtractor(top_n=2, languages=[]).extract("aa aa aa bb bb cc")
+
+        assert terms == [WeightedTerm(text="aa", weight=3), WeightedTerm(text="bb", weight=2)]
+
+    def test_unknown_language_is_rejected(self):
+        with pytest.raises(ValueError):
+            TermExtractor(languages=["xx"])
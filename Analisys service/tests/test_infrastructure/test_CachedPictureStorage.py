@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from src.domain.interfaces.base_picture_storage import BasePictureStorage
+from src.infrastructure.picture_storage.CachedPictureStorage import CachedPictureStorage
+
+
+class TestCachedPictureStorage:
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker):
+        self.objects = {"a": b"a" * 10, "b": b"b" * 10, "c": b"c" * 10, "big": b"x" * 30}
+
+        async def load(location):
+            return self.objects[location]
+
+        self.mock_storage = mocker.Mock(spec=BasePictureStorage)
+        self.mock_storage.load = mocker.AsyncMock(side_effect=load)
+        self.mock_storage.save = mocker.AsyncMock(side_effect=lambda content, key: f"{key}.png")
+        self.mock_storage.delete = mocker.AsyncMock()
+        self.streamed = []
+
+        async def stream(location, offset=0, length=None):
+            self.streamed.append(location)
+            content = self.objects[location][offset:offset + length if length is not None else None]
+            for i in range(0, len(content), 4):
+                yield content[i:i + 4]
+
+        self.mock_storage.stream = stream
+        self.cache = CachedPictureStorage(self.mock_storage, max_bytes=25, max_item_bytes=20)
+
+    @pytest.mark.asyncio
+    async def test_second_load_is_served_from_memory(self):
+        assert await self.cache.load("a") == self.objects["a"]
+        assert await self.cache.load("a") == self.objects["a"]
+
+        self.mock_storage.load.assert_awaited_once_with(location="a")
+        assert self.cache.stats()["hits"] == 1
+        assert self.cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_by_bytes(self):
+        await self.cache.load("a")
+        await self.cache.load("b")
+        await self.cache.load("a")
+        await self.cache.load("c")
+
+        stats = self.cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["size_bytes"] == 20
+        await self.cache.load("a")
+        assert self.mock_storage.load.await_count == 3
+        await self.cache.load("b")
+        assert self.mock_storage.load.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_oversized_items_are_not_cached(self):
+        await self.cache.load("big")
+        await self.cache.load("big")
+
+        assert self.mock_storage.load.await_count == 2
+        assert self.cache.stats()["items"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self):
+        await asyncio.gather(*(self.cache.load("a") for _ in range(5)))
+
+        self.mock_storage.load.assert_awaited_once_with(location="a")
+
+    @pytest.mark.asyncio
+    async def test_save_populates_and_delete_invalidates(self):
+        location = await self.cache.save(b"new")
+        assert await self.cache.load(location) == b"new"
+        self.mock_storage.load.assert_not_called()
+
+        await self.cache.delete(location)
+        self.mock_storage.delete.assert_awaited_once_with(location)
+        assert self.cache.stats()["size_bytes"] == 0
+
+    @pytest.mark.asyncio
+    async def test_keyed_save_is_not_cached_because_another_render_may_win(self):
+        self.objects["k.png"] = b"winner"
+        self.cache._put("k.png", b"stale")
+
+        location = await self.cache.save(b"loser", key="k")
+
+        assert await self.cache.load(location) == b"winner"
+        self.mock_storage.load.assert_awaited_once_with(location="k.png")
+
+    @pytest.mark.asyncio
+    async def test_full_stream_populates_cache(self):
+        first = b"".join([chunk async for chunk in self.cache.stream("a")])
+        second = b"".join([chunk async for chunk in self.cache.stream("a", offset=2, length=3)])
+
+        assert first == self.objects["a"]
+        assert second == self.objects["a"][2:5]
+        assert self.streamed == ["a"]
+        assert self.cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_or_oversized_streams_are_not_cached(self):
+        [chunk async for chunk in self.cache.stream("b", offset=1, length=2)]
+        [chunk async for chunk in self.cache.stream("big")]
+
+        assert self.cache.stats()["items"] == 0
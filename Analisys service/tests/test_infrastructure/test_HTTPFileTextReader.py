@@ -11,7 +11,7 @@ class TestHTTPFileTextReader:
         mock_response = mocker.Mock()
         mock_response.status_code = 200
         mock_response.raise_for_status = mocker.Mock()
-        mock_response.json = mocker.Mock()
+        mock_response.content = b""
 
         # Create a fake AsyncClient
         mock_client = mocker.MagicMock()
@@ -30,44 +30,44 @@ class TestHTTPFileTextReader:
     @pytest.mark.asyncio
     async def test_successfully_retrieves_file_text_and_constructs_https_url(self, patch_async_client):
         client, response = patch_async_client
-        response.json.return_value = {"file_text": "content"}
+        response.content = "content".encode("utf-8")
 
         reader = HTTPFileTextReader(host="example.com", port=443, path="/api/files", secure=True)
         result = await reader.get_file_text_by_id(123)
 
         assert result == "content"
-        client.get.assert_awaited_once_with("https://example.com:443/api/files/123")
+        client.get.assert_awaited_once_with("https://example.com:443/api/files/123/raw")
 
     @pytest.mark.asyncio
     async def test_constructs_http_url_when_secure_false(self, patch_async_client):
         client, response = patch_async_client
-        response.json.return_value = {"file_text": "x"}
+        response.content = "x".encode("utf-8")
 
         reader = HTTPFileTextReader(host="host.com", port=80, path="files", secure=False)
         await reader.get_file_text_by_id(1)
 
-        client.get.assert_awaited_once_with("http://host.com:80/files/1")
+        client.get.assert_awaited_once_with("http://host.com:80/files/1/raw")
 
     @pytest.mark.asyncio
     async def test_strips_slashes_and_handles_multiple_edge_cases(self, patch_async_client):
         client, response = patch_async_client
-        response.json.return_value = {"file_text": "z"}
+        response.content = "z".encode("utf-8")
 
         # multiple leading/trailing slashes
         reader1 = HTTPFileTextReader(host="h.com", port=1234, path="///p//q///", secure=True)
         await reader1.get_file_text_by_id(7)
-        client.get.assert_awaited_with("https://h.com:1234/p//q/7")
+        client.get.assert_awaited_with("https://h.com:1234/p//q/7/raw")
 
         # empty path yields a double slash
         client.get.reset_mock()
         reader2 = HTTPFileTextReader(host="h.com", port=1234, path="", secure=False)
         await reader2.get_file_text_by_id(8)
-        client.get.assert_awaited_with("http://h.com:1234//8")
+        client.get.assert_awaited_with("http://h.com:1234//8/raw")
 
     @pytest.mark.asyncio
     async def test_handles_file_id_zero_negative_and_large(self, patch_async_client):
         client, response = patch_async_client
-        response.json.return_value = {"file_text": "ok"}
+        response.content = "ok".encode("utf-8")
 
         reader = HTTPFileTextReader(host="h", port=9, path="api", secure=False)
         await reader.get_file_text_by_id(0)
@@ -83,23 +83,23 @@ class TestHTTPFileTextReader:
     @pytest.mark.asyncio
     async def test_manages_special_host_chars(self, patch_async_client):
         client, response = patch_async_client
-        response.json.return_value = {"file_text": "spec"}
+        response.content = "spec".encode("utf-8")
 
         special_host = "ex-ample_1.com"
         reader = HTTPFileTextReader(host=special_host, port=99, path="p", secure=True)
         await reader.get_file_text_by_id(22)
 
-        client.get.assert_awaited_once_with(f"https://{special_host}:99/p/22")
+        client.get.assert_awaited_once_with(f"https://{special_host}:99/p/22/raw")
 
     @pytest.mark.asyncio
     async def test_non_200_and_network_errors(self, patch_async_client):
         client, response = patch_async_client
 
-        # non-200 status: code doesn't call raise_for_status, so .json returns default None → TypeError on indexing
+        # non-200 status: raise_for_status surfaces the HTTP error
         response.status_code = 404
-        response.json.return_value = None
+        response.raise_for_status.side_effect = httpx.HTTPStatusError("not found", request=None, response=None)
         reader = HTTPFileTextReader(host="h", port=9, path="api", secure=False)
-        with pytest.raises(TypeError):
+        with pytest.raises(httpx.HTTPStatusError):
             await reader.get_file_text_by_id(1)
 
         # network error
@@ -108,30 +108,74 @@ class TestHTTPFileTextReader:
             await reader.get_file_text_by_id(2)
 
     @pytest.mark.asyncio
-    async def test_fails_on_bad_json_or_missing_key(self, patch_async_client):
+    async def test_decodes_raw_utf8_body(self, patch_async_client):
         client, response = patch_async_client
+        response.content = "Привет, мир".encode("utf-8")
 
-        # malformed JSON
-        response.status_code = 200
-        response.raise_for_status = lambda: None
-        response.json.side_effect = ValueError("Bad JSON")
         reader = HTTPFileTextReader(host="h", port=9, path="api", secure=False)
-        with pytest.raises(ValueError):
-            await reader.get_file_text_by_id(3)
 
-        # missing 'file_text'
-        response.json.side_effect = None
-        response.json.return_value = {"other": "v"}
-        with pytest.raises(KeyError):
-            await reader.get_file_text_by_id(4)
+        assert await reader.get_file_text_by_id(3) == "Привет, мир"
 
     @pytest.mark.asyncio
-    async def test_respects_context_manager_lifecycle(self, patch_async_client):
+    async def test_reuses_single_client_across_calls(self, patch_async_client):
         client, response = patch_async_client
-        response.json.return_value = {"file_text": "ok"}
+        response.content = "ok".encode("utf-8")
 
         reader = HTTPFileTextReader(host="a", port=1, path="", secure=False)
         await reader.get_file_text_by_id(5)
+        await reader.get_file_text_by_id(6)
 
-        client.__aenter__.assert_awaited_once()
-        client.__aexit__.assert_awaited_once()
+        assert reader.client is client
+        assert client.get.await_count == 2
+        client.__aenter__.assert_not_called()
+        client.__aexit__.assert_not_called()
+
+    def test_client_built_with_pool_settings(self, mocker):
+        client_cls = mocker.patch('src.infrastructure.external_api.HTTPFileTextReader.AsyncClient')
+
+        HTTPFileTextReader(
+            host="a", port=1, path="", secure=False,
+            max_connections=7, max_keepalive_connections=3, keepalive_expiry=12,
+            connect_timeout=1.5, read_timeout=9, http2=False,
+        )
+
+        kwargs = client_cls.call_args.kwargs
+        assert kwargs["limits"] == httpx.Limits(
+            max_connections=7, max_keepalive_connections=3, keepalive_expiry=12
+        )
+        assert kwargs["timeout"] == httpx.Timeout(9, connect=1.5)
+        assert kwargs["http2"] is False
+
+    @pytest.mark.asyncio
+    async def test_close_closes_client(self, patch_async_client, mocker):
+        client, _ = patch_async_client
+        client.aclose = mocker.AsyncMock()
+
+        reader = HTTPFileTextReader(host="a", port=1, path="", secure=False)
+        await reader.close()
+
+        client.aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_batch_read_parses_ndjson_stream(self, patch_async_client, mocker):
+        client, _ = patch_async_client
+        stream_response = mocker.Mock()
+        stream_response.raise_for_status = mocker.Mock()
+
+        async def lines():
+            yield '{"file_id": 2, "file_text": "два"}'
+            yield ""
+            yield '{"file_id": 1, "file_text": null, "error": null}'
+
+        stream_response.aiter_lines = lines
+        stream_ctx = mocker.MagicMock()
+        stream_ctx.__aenter__ = mocker.AsyncMock(return_value=stream_response)
+        stream_ctx.__aexit__ = mocker.AsyncMock(return_value=None)
+        client.stream = mocker.Mock(return_value=stream_ctx)
+
+        reader = HTTPFileTextReader(host="h", port=9, path="files", secure=False)
+        result = [item async for item in reader.get_file_texts_by_ids([1, 2])]
+
+        assert result == [(2, "два"), (1, None)]
+        client.stream.assert_called_once_with("POST", "http://h:9/files/batch-get", json={"file_ids": [1, 2]})
+        stream_response.raise_for_status.assert_called_once()
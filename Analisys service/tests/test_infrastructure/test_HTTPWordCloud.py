@@ -1,6 +1,7 @@
 import pytest
 import httpx
 
+from src.domain.schemas.terms import WeightedTerm
 from src.infrastructure.external_api.HTTPWordCloud import HTTPWordCloud
 
 
@@ -61,9 +62,9 @@ class TestHTTPWordCloud:
             font_scale=3,
             scale="log"
         )
-        text = "some file text"
+        terms = [WeightedTerm(text="отчёт", weight=3), WeightedTerm(text="text", weight=1)]
 
-        result = await wc.get_word_cloud(text)
+        result = await wc.get_word_cloud(terms)
 
         # returns the content
         assert result == b"fake-bytes"
@@ -75,7 +76,8 @@ class TestHTTPWordCloud:
             "fontFamily": "Times",
             "fontScale": 3,
             "scale": "log",
-            "text": text
+            "useWordList": True,
+            "text": "отчёт:3,text:1"
         }
         expected_headers = {"Content-Type": "application/json"}
 
@@ -101,7 +103,7 @@ class TestHTTPWordCloud:
         )
 
         with pytest.raises(httpx.HTTPStatusError):
-            await wc.get_word_cloud("txt")
+            await wc.get_word_cloud([])
 
     @pytest.mark.asyncio
     async def test_handles_network_errors(self, patch_async_client):
@@ -116,4 +118,43 @@ class TestHTTPWordCloud:
         )
 
         with pytest.raises(httpx.ConnectError):
-            await wc.get_word_cloud("txt")
+            await wc.get_word_cloud([])
+
+    @pytest.mark.asyncio
+    async def test_reuses_single_client_across_calls(self, patch_async_client):
+        client, _ = patch_async_client
+
+        wc = HTTPWordCloud(
+            host="h", path="p", pic_format="", width=0, height=0,
+            font_family="", font_scale=0, scale=""
+        )
+        await wc.get_word_cloud([])
+        await wc.get_word_cloud([])
+
+        assert wc.client is client
+        assert client.post.await_count == 2
+        client.__aenter__.assert_not_called()
+
+    def test_http2_requires_h2_package(self, mocker):
+        client_cls = mocker.patch('src.infrastructure.external_api.HTTPWordCloud.AsyncClient')
+        mocker.patch('src.infrastructure.external_api.http_client.HTTP2_AVAILABLE', False)
+
+        HTTPWordCloud(
+            host="h", path="p", pic_format="", width=0, height=0,
+            font_family="", font_scale=0, scale="", http2=True
+        )
+
+        assert client_cls.call_args.kwargs["http2"] is False
+
+    @pytest.mark.asyncio
+    async def test_close_closes_client(self, patch_async_client, mocker):
+        client, _ = patch_async_client
+        client.aclose = mocker.AsyncMock()
+
+        wc = HTTPWordCloud(
+            host="h", path="p", pic_format="", width=0, height=0,
+            font_family="", font_scale=0, scale=""
+        )
+        await wc.close()
+
+        client.aclose.assert_awaited_once()
@@ -0,0 +1,61 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from src.domain.schemas.terms import WeightedTerm
+from src.infrastructure.word_cloud.LocalWordCloud import (
+    LocalWordCloud,
+    _GridIndex,
+    render_word_cloud,
+)
+
+RENDER_OPTIONS = {
+    "pic_format": "png",
+    "width": 200,
+    "height": 120,
+    "font_family": "sans-serif",
+    "font_scale": 15,
+    "scale": "linear",
+}
+
+
+class TestLocalWordCloud:
+
+    def test_grid_index_detects_overlap(self):
+        index = _GridIndex(cell=10)
+        index.add((0, 0, 15, 15))
+
+        assert index.intersects((10, 10, 30, 30))
+        assert not index.intersects((15, 0, 30, 15))
+        assert not index.intersects((100, 100, 120, 120))
+
+    def test_render_returns_image_of_configured_size(self):
+        content = render_word_cloud([("world", 2), ("hello", 5)], **RENDER_OPTIONS)
+
+        image = Image.open(BytesIO(content))
+        assert image.format == "PNG"
+        assert image.size == (200, 120)
+        assert image.getextrema() != ((255, 255), (255, 255), (255, 255))
+
+    def test_render_empty_text_gives_blank_image(self):
+        content = render_word_cloud([], **RENDER_OPTIONS)
+
+        image = Image.open(BytesIO(content))
+        assert image.getextrema() == ((255, 255), (255, 255), (255, 255))
+
+    def test_rejects_unsupported_format(self):
+        with pytest.raises(ValueError):
+            LocalWordCloud(
+                pic_format="svg", width=1, height=1, font_family="", font_scale=1, scale="linear", workers=1
+            )
+
+    @pytest.mark.asyncio
+    async def test_get_word_cloud_renders_in_process_pool(self):
+        wc = LocalWordCloud(workers=1, **RENDER_OPTIONS)
+        try:
+            content = await wc.get_word_cloud([WeightedTerm(text="hello", weight=2), WeightedTerm(text="world", weight=1)])
+        finally:
+            await wc.close()
+
+        assert Image.open(BytesIO(content)).size == (200, 120)
@@ -3,6 +3,7 @@ import asyncio
 import importlib
 
 import pytest
+from minio.error import S3Error
 
 from src.infrastructure.picture_storage.MiniOPictureStorage import MiniOPictureStorage
 
@@ -95,6 +96,85 @@ class TestMiniOPictureStorage:
         self.response.close.assert_called_once()
         self.response.release_conn.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_save_with_content_key_is_conditional(self):
+        key = await self.storage.save(b"hello", key="abc")
+
+        assert key == "pic/abc.png"
+        self.client.put_object.assert_not_called()
+        bucket, location, data = self.client._put_object.call_args.args
+        assert (bucket, location, data) == ("mybucket", "pic/abc.png", b"hello")
+        assert self.client._put_object.call_args.kwargs["headers"]["If-None-Match"] == "*"
+
+    @pytest.mark.asyncio
+    async def test_save_keeps_object_created_by_someone_else(self, mocker):
+        self.client._put_object.side_effect = S3Error(
+            response=mocker.Mock(), code="PreconditionFailed", message="exists",
+            resource="pic/abc.png", request_id="req", host_id="host",
+        )
+
+        assert await self.storage.save(b"other render", key="abc") == "pic/abc.png"
+
+    @pytest.mark.asyncio
+    async def test_save_propagates_other_put_errors(self, mocker):
+        self.client._put_object.side_effect = S3Error(
+            response=mocker.Mock(), code="AccessDenied", message="denied",
+            resource="pic/abc.png", request_id="req", host_id="host",
+        )
+
+        with pytest.raises(S3Error):
+            await self.storage.save(b"hello", key="abc")
+
+    @pytest.mark.asyncio
+    async def test_find_returns_location_when_object_exists(self):
+        assert await self.storage.find("abc") == "pic/abc.png"
+        self.client.stat_object.assert_called_once_with("mybucket", "pic/abc.png")
+
+    @pytest.mark.asyncio
+    async def test_find_returns_none_when_object_missing(self, mocker):
+        self.client.stat_object.side_effect = S3Error(
+            response=mocker.Mock(), code="NoSuchKey", message="missing",
+            resource="pic/abc.png", request_id="req", host_id="host",
+        )
+        assert await self.storage.find("abc") is None
+
+    @pytest.mark.asyncio
+    async def test_find_propagates_other_errors(self, mocker):
+        self.client.stat_object.side_effect = S3Error(
+            response=mocker.Mock(), code="AccessDenied", message="denied",
+            resource="pic/abc.png", request_id="req", host_id="host",
+        )
+        with pytest.raises(S3Error):
+            await self.storage.find("abc")
+
+    @pytest.mark.asyncio
+    async def test_stat_returns_size(self, mocker):
+        self.client.stat_object.return_value = mocker.Mock(size=123)
+        assert await self.storage.stat("pic/abc.png") == 123
+
+    @pytest.mark.asyncio
+    async def test_stream_reads_in_chunks_and_releases_connection(self):
+        self.response.read.side_effect = [b"ab", b"cd", b""]
+
+        chunks = [chunk async for chunk in self.storage.stream("some/key.png", offset=2, length=4)]
+
+        assert chunks == [b"ab", b"cd"]
+        self.client.get_object.assert_called_once_with("mybucket", "some/key.png", offset=2, length=4)
+        self.response.read.assert_called_with(MiniOPictureStorage.chunk_size)
+        self.response.close.assert_called_once()
+        self.response.release_conn.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_releases_connection_when_consumer_stops(self):
+        self.response.read.side_effect = [b"ab", b"cd", b""]
+
+        stream = self.storage.stream("some/key.png")
+        assert await anext(stream) == b"ab"
+        await stream.aclose()
+
+        self.response.close.assert_called_once()
+        self.response.release_conn.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_delete_removes_object(self):
         await self.storage.delete("old/key.png")
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.domain.schemas.analysis_job import JobStatus
+from src.infrastructure.database.models.analysis_job import AnalysisJob
+from src.infrastructure.database.repositories.analysis_job import SQLAnalysisJob
+
+
+class TestSQLAnalysisJob:
+
+    @pytest.fixture(autouse=True)
+    def _session(self, mocker):
+        self.mock_session = mocker.AsyncMock()
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = self.mock_session
+        mocker.patch(
+            'src.infrastructure.database.repositories.analysis_job.async_session_maker',
+            return_value=mock_ctx
+        )
+        self.mock_scalars = mocker.Mock()
+
+        async def fake_scalars(stmt):
+            return self.mock_scalars
+        self.mock_session.scalars.side_effect = fake_scalars
+
+    @pytest.mark.asyncio
+    async def test_claim_takes_one_row_with_skip_locked(self):
+        # Arrange
+        self.mock_scalars.one_or_none.return_value = AnalysisJob(id=3, file_id=7, status=JobStatus.RUNNING)
+        repo = SQLAnalysisJob()
+
+        # Act
+        job = await repo.claim(lease_time=60)
+
+        # Assert
+        assert (job.id, job.file_id, job.status) == (3, 7, JobStatus.RUNNING)
+        sql = str(self.mock_session.scalars.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE analysis_job SET status=")
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "analysis_job.lease_until < now()" in sql
+        assert "RETURNING" in sql
+        self.mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_claim_returns_none_when_nothing_to_do(self):
+        # Arrange
+        self.mock_scalars.one_or_none.return_value = None
+        repo = SQLAnalysisJob()
+
+        # Act & Assert
+        assert await repo.claim(lease_time=60) is None
+
+    @pytest.mark.asyncio
+    async def test_renew_lease_only_touches_running_job(self):
+        # Arrange
+        repo = SQLAnalysisJob()
+
+        # Act
+        await repo.renew_lease(3, lease_time=60)
+
+        # Assert
+        sql = str(self.mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "SET lease_until=(now() + " in sql
+        assert "analysis_job.status = " in sql
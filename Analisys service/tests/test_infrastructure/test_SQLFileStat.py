@@ -1,5 +1,6 @@
 import pytest
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 from src.infrastructure.database.repositories.file_stat import SQLFileStat, FileStat
 
 class TestSQLFileStat:
@@ -117,7 +118,7 @@ class TestSQLFileStat:
 
         # Assert
         assert result is None
-        expected = select(FileStat).filter(FileStat.id == 42)
+        expected = select(FileStat).filter(FileStat.file_id == 42)
         called = mock_session.scalars.call_args[0][0]
         assert str(called) == str(expected)
 
@@ -151,3 +152,166 @@ class TestSQLFileStat:
         assert isinstance(result, FileStat)
         assert result.id == 7
         assert result.normalized_hash == "abc"
+
+
+    @pytest.mark.asyncio
+    async def test_get_file_stat_hit_is_single_indexed_lookup(self, mocker):
+        # Arrange
+        dummy = FileStat(id=1, file_id=42, normalized_hash="abc")
+        mock_session = mocker.AsyncMock()
+
+        mock_scalars = mocker.Mock()
+        mock_scalars.one_or_none.return_value = dummy
+
+        async def fake_scalars(stmt):
+            return mock_scalars
+        mock_session.scalars.side_effect = fake_scalars
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'src.infrastructure.database.repositories.file_stat.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileStat()
+
+        # Act
+        result = await repo.get_file_stat(42)
+
+        # Assert
+        assert result.file_id == 42
+        assert mock_session.scalars.await_count == 1
+        mock_session.execute.assert_not_called()
+        stmt = mock_session.scalars.call_args[0][0]
+        filtered = {col.name for col in stmt.whereclause.get_children() if hasattr(col, "table")}
+        assert filtered == {"file_id"}
+        assert FileStat.__table__.c.file_id.unique
+
+
+    @pytest.mark.asyncio
+    async def test_get_file_stats_uses_single_in_query(self, mocker):
+        # Arrange
+        rows = [FileStat(id=1, file_id=1), FileStat(id=2, file_id=5)]
+        mock_session = mocker.AsyncMock()
+        mock_scalars = mocker.Mock()
+        mock_scalars.all.return_value = rows
+
+        async def fake_scalars(stmt):
+            return mock_scalars
+        mock_session.scalars.side_effect = fake_scalars
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'src.infrastructure.database.repositories.file_stat.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileStat()
+
+        # Act
+        result = await repo.get_file_stats([1, 5, 9])
+
+        # Assert
+        assert result == rows
+        assert mock_session.scalars.await_count == 1
+        expected = select(FileStat).filter(FileStat.file_id.in_([1, 5, 9]))
+        assert str(mock_session.scalars.call_args[0][0]) == str(expected)
+
+
+    @pytest.mark.asyncio
+    async def test_find_similar_candidates_uses_bucket_overlap(self, mocker):
+        # Arrange
+        mock_session = mocker.AsyncMock()
+        mock_session.execute.return_value = [(3, [1, 2]), (4, [5, 6])]
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'src.infrastructure.database.repositories.file_stat.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileStat()
+
+        # Act
+        result = await repo.find_similar_candidates([10, -20], exclude_file_id=1)
+
+        # Assert
+        assert result == [(3, [1, 2]), (4, [5, 6])]
+        sql = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "file_stat.lsh_buckets && " in sql
+        assert "file_stat.file_id != " in sql
+
+
+    def test_lsh_buckets_have_gin_index(self):
+        index = next(index for index in FileStat.__table__.indexes if index.name == "ix_file_stat_lsh_buckets")
+        assert [col.name for col in index.columns] == ["lsh_buckets"]
+        assert index.dialect_options["postgresql"]["using"] == "gin"
+
+
+    def test_normalized_hash_is_indexed(self):
+        indexed = {col.name for index in FileStat.__table__.indexes for col in index.columns}
+        assert "normalized_hash" in indexed
+
+
+    @pytest.mark.asyncio
+    async def test_add_or_get_inserts_with_on_conflict_do_nothing(self, mocker):
+        # Arrange
+        mock_session = mocker.AsyncMock()
+        mock_result = mocker.Mock()
+        mock_result.scalar_one_or_none.return_value = 5
+        mock_session.execute.return_value = mock_result
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'src.infrastructure.database.repositories.file_stat.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileStat()
+
+        # Act
+        result = await repo.add_or_get({"file_id": 42, "normalized_hash": "h"})
+
+        # Assert
+        assert result == (5, True)
+        sql = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (file_id) DO NOTHING" in sql
+        mock_session.scalars.assert_not_called()
+        mock_session.commit.assert_awaited_once()
+
+
+    @pytest.mark.asyncio
+    async def test_add_or_get_rereads_row_on_conflict(self, mocker):
+        # Arrange
+        mock_session = mocker.AsyncMock()
+        mock_result = mocker.Mock()
+        mock_result.scalar_one_or_none.return_value = None
+        mock_session.execute.return_value = mock_result
+
+        mock_scalars = mocker.Mock()
+        mock_scalars.one.return_value = 7
+
+        async def fake_scalars(stmt):
+            return mock_scalars
+        mock_session.scalars.side_effect = fake_scalars
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'src.infrastructure.database.repositories.file_stat.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileStat()
+
+        # Act
+        result = await repo.add_or_get({"file_id": 42, "normalized_hash": "h"})
+
+        # Assert
+        assert result == (7, False)
+        expected = select(FileStat.id).filter(FileStat.file_id == 42)
+        assert str(mock_session.scalars.call_args[0][0]) == str(expected)
@@ -0,0 +1,60 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.services.analysis_jobs import AnalysisJobService, JobQueueFullError
+from src.domain.schemas.analysis_job import AnalysisJobSchema, JobStatus
+from src.domain.schemas.file_stats import FileStatSchema
+from src.presentation.API.analysis import router
+from src.presentation.dependencies.analysis_service import get_analysis_job_service
+
+
+class TestAnalysisJobsAPI:
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker):
+        self.mock_job_service = mocker.Mock(spec=AnalysisJobService)
+        self.mock_job_service.submit = mocker.AsyncMock()
+        self.mock_job_service.get_job = mocker.AsyncMock()
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_analysis_job_service] = lambda: self.mock_job_service
+        self.client = TestClient(app)
+
+    def test_create_job_returns_accepted(self):
+        self.mock_job_service.submit.return_value = AnalysisJobSchema(id=3, file_id=7, status=JobStatus.QUEUED)
+
+        response = self.client.post("/analysis/7/jobs")
+
+        assert response.status_code == 202
+        assert response.headers["Location"] == "/analysis/jobs/3"
+        assert response.json() == {"id": 3, "file_id": 7, "status": "queued", "error": None, "result": None}
+
+    def test_create_job_when_queue_is_full(self):
+        self.mock_job_service.submit.side_effect = JobQueueFullError
+
+        response = self.client.post("/analysis/7/jobs")
+
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+    def test_get_finished_job(self):
+        stat = FileStatSchema(id=1, file_id=7, word_count=2, char_count=3, is_unique=True, wordcloud_location="x")
+        self.mock_job_service.get_job.return_value = AnalysisJobSchema(
+            id=3, file_id=7, status=JobStatus.DONE, result=stat
+        )
+
+        response = self.client.get("/analysis/jobs/3")
+
+        assert response.status_code == 200
+        assert response.json()["result"] == {
+            "file_id": 7, "word_count": 2, "char_count": 3, "is_unique": True, "wordcloud_location": "x",
+            "similarity": 0.0, "similar_files": None,
+        }
+
+    def test_get_missing_job(self):
+        self.mock_job_service.get_job.return_value = None
+
+        response = self.client.get("/analysis/jobs/404")
+
+        assert response.status_code == 404
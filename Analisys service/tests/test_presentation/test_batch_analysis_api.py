@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.services.analysis import AnalysisService
+from src.domain.schemas.file_stats import FileStatSchema
+from src.presentation.API.analysis import router
+from src.presentation.dependencies.analysis_service import get_analysis_service
+
+
+class TestBatchAnalysisAPI:
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker):
+        async def get_file_stats(file_ids):
+            self.requested = file_ids
+            yield 2, FileStatSchema(
+                id=1, file_id=2, word_count=3, char_count=5, is_unique=True, wordcloud_location="picture/a.png"
+            )
+            yield 1, RuntimeError("store down")
+
+        self.mock_service = mocker.Mock(spec=AnalysisService)
+        self.mock_service.get_file_stats = get_file_stats
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_analysis_service] = lambda: self.mock_service
+        self.client = TestClient(app)
+
+    def test_streams_ndjson_in_completion_order(self):
+        response = self.client.post("/analysis/batch", json={"file_ids": [1, 2]})
+
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == [
+            {
+                "file_id": 2,
+                "result": {
+                    "file_id": 2, "word_count": 3, "char_count": 5,
+                    "is_unique": True, "wordcloud_location": "picture/a.png",
+                    "similarity": 0.0, "similar_files": None,
+                },
+                "error": None,
+            },
+            {"file_id": 1, "result": None, "error": "store down"},
+        ]
+        assert self.requested == [1, 2]
+
+    def test_rejects_empty_batch(self):
+        response = self.client.post("/analysis/batch", json={"file_ids": []})
+
+        assert response.status_code == 422
@@ -0,0 +1,76 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import src.main as main_module
+from src.application.services.analysis import AnalysisService
+from src.domain.schemas.file_stats import FileStatSchema
+from src.presentation.dependencies.analysis_service import get_analysis_service
+from src.presentation.dependencies.container import Container
+from src.utils.config import load_config
+
+
+class TestContainerLifespan:
+
+    @pytest.fixture(autouse=True)
+    def _no_pending_jobs(self, mocker):
+        mocker.patch(
+            "src.infrastructure.database.repositories.analysis_job.SQLAnalysisJob.claim",
+            new=mocker.AsyncMock(return_value=None),
+        )
+
+    def test_dependencies_are_built_once_per_app(self, mocker):
+        # Arrange
+        load_spy = mocker.patch.object(main_module, "load_config", wraps=load_config)
+
+        # Act
+        with TestClient(main_module.app) as client:
+            container = main_module.app.state.container
+            for _ in range(3):
+                assert client.get("/metrics/picture_cache").status_code == 200
+            same = main_module.app.state.container
+
+        # Assert
+        assert load_spy.call_count == 1
+        assert isinstance(container, Container)
+        assert container is same
+
+    def test_shutdown_releases_resources(self, mocker):
+        # Arrange
+        close_mock = mocker.patch(
+            "src.infrastructure.picture_storage.MiniOPictureStorage.MiniOPictureStorage.close",
+            new=mocker.AsyncMock(),
+        )
+        hasher_close_mock = mocker.patch(
+            "src.application.services.minhash.MinHasher.close",
+            new=mocker.AsyncMock(),
+        )
+        dispose_mock = mocker.patch("src.presentation.dependencies.container.engine")
+        dispose_mock.dispose = mocker.AsyncMock()
+
+        # Act
+        with TestClient(main_module.app):
+            close_mock.assert_not_awaited()
+
+        # Assert
+        close_mock.assert_awaited_once()
+        hasher_close_mock.assert_awaited_once()
+        dispose_mock.dispose.assert_awaited_once()
+
+    def test_service_can_be_overridden(self, mocker):
+        # Arrange
+        fake_service = mocker.Mock(spec=AnalysisService)
+        fake_service.get_file_stat = mocker.AsyncMock(return_value=FileStatSchema(
+            id=1, file_id=2, word_count=3, char_count=4, is_unique=True, wordcloud_location="b.png"
+        ))
+        main_module.app.dependency_overrides[get_analysis_service] = lambda: fake_service
+
+        # Act
+        try:
+            with TestClient(main_module.app) as client:
+                response = client.get("/analysis/2")
+        finally:
+            main_module.app.dependency_overrides.clear()
+
+        # Assert
+        assert response.json()["wordcloud_location"] == "b.png"
+        fake_service.get_file_stat.assert_awaited_once_with(2)
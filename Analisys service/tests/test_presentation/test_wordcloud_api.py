@@ -0,0 +1,113 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.services.analysis import AnalysisService
+from src.presentation.API.analysis import router
+from src.presentation.dependencies.analysis_service import get_analysis_service
+from src.presentation.http_cache import RangeNotSatisfiableError, make_etag, parse_range
+
+CONTENT = b"0123456789"
+
+
+class TestWordCloudAPI:
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker):
+        self.stream_calls = []
+
+        async def stream(location, offset=0, length=None):
+            self.stream_calls.append((location, offset, length))
+            end = offset + length if length is not None else None
+            for i in range(offset, end or len(CONTENT), 3):
+                yield CONTENT[i:min(i + 3, end or len(CONTENT))]
+
+        self.mock_service = mocker.Mock(spec=AnalysisService)
+        self.mock_service.get_word_cloud_size = mocker.AsyncMock(return_value=len(CONTENT))
+        self.mock_service.stream_word_cloud = stream
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_analysis_service] = lambda: self.mock_service
+        self.client = TestClient(app)
+        self.etag = make_etag("picture/a.png")
+
+    def test_full_response_has_cache_headers(self):
+        response = self.client.get("/analysis/wordcloud/picture/a.png")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["ETag"] == self.etag
+        assert "immutable" in response.headers["Cache-Control"]
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert response.headers["Content-Length"] == "10"
+        assert self.stream_calls == [("picture/a.png", 0, None)]
+
+    def test_missing_picture(self):
+        self.mock_service.get_word_cloud_size.return_value = None
+
+        response = self.client.get("/analysis/wordcloud/picture/missing.png")
+
+        assert response.status_code == 404
+
+    def test_if_none_match_returns_304_without_streaming(self):
+        response = self.client.get(
+            "/analysis/wordcloud/picture/a.png", headers={"If-None-Match": f'"other", W/{self.etag}'}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == self.etag
+        assert self.stream_calls == []
+
+    def test_if_none_match_star_does_not_match_missing_picture(self):
+        self.mock_service.get_word_cloud_size.return_value = None
+
+        response = self.client.get("/analysis/wordcloud/picture/missing.png", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 404
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get("/analysis/wordcloud/picture/a.png", headers={"Range": "bytes=2-5"})
+
+        assert response.status_code == 206
+        assert response.content == b"2345"
+        assert response.headers["Content-Range"] == "bytes 2-5/10"
+        assert self.stream_calls == [("picture/a.png", 2, 4)]
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get("/analysis/wordcloud/picture/a.png", headers={"Range": "bytes=20-"})
+
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == "bytes */10"
+
+    def test_stale_if_range_ignores_range(self):
+        response = self.client.get(
+            "/analysis/wordcloud/picture/a.png", headers={"Range": "bytes=2-5", "If-Range": '"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-0", (0, 0)),
+        ("bytes=4-", (4, 9)),
+        ("bytes=-3", (7, 9)),
+        ("bytes=-30", (0, 9)),
+        ("bytes=5-100", (5, 9)),
+        ("bytes=0-1,4-5", None),
+        ("items=0-1", None),
+        ("bytes=a-b", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, 10) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=5-2", "bytes=-0"])
+def test_parse_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range(header, 10)
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from src.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_same_key_runs_once(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+        assert results == ["result"] * 5
+        assert calls == [1]
+        assert not flight.in_flight("k")
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_independently(self):
+        flight = SingleFlight()
+
+        async def work(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(flight.do(1, lambda: work("a")), flight.do(2, lambda: work("b")))
+
+        assert results == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return 42
+
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == 42
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    @pytest.mark.asyncio
+    async def test_work_is_cancelled_when_every_waiter_is_cancelled(self):
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert not flight.in_flight("k")
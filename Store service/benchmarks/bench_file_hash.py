@@ -0,0 +1,70 @@
+"""
+Бенчмарк хеширования при сохранении файла.
+
+Запуск (хранилище и репозиторий подменяются заглушками, база не нужна):
+
+    docker compose run --rm store-service python -m benchmarks.bench_file_hash
+
+Сравнивает прежний путь (файл целиком читается в память, декодируется в str,
+хеш считается в save_file и ещё раз в _save_file, каждый раз с encode всего текста)
+с FileService.upload_file: хеш и проверка UTF-8 за тот же проход частями,
+которым содержимое уходит в хранилище.
+"""
+import asyncio
+import hashlib
+import time
+import tracemalloc
+from io import BytesIO
+from types import SimpleNamespace
+
+from application.services.file_service import FileService
+
+SIZES_MB = (1, 8, 32)
+ITERATIONS = 5
+PART_SIZE = 8 * 2 ** 20
+
+
+class _Repo:
+    async def add_or_get(self, data):
+        return 1, True
+
+
+class _Storage:
+    async def save_stream(self, stream):
+        while stream.read(PART_SIZE):
+            pass
+        return "bench.txt"
+
+
+def legacy_save(stream: BytesIO) -> str:
+    text = stream.read().decode("utf-8")
+    hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def measure(func) -> SimpleNamespace:
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    elapsed = (time.perf_counter() - started) / ITERATIONS
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return SimpleNamespace(ms=elapsed * 1000, peak_mb=peak / 2 ** 20)
+
+
+def main() -> None:
+    service = FileService(file_repo=_Repo(), file_storage=_Storage())
+    for size in SIZES_MB:
+        content = ("Съешь же ещё этих мягких французских булок. " * (size * 2 ** 20 // 80)).encode("utf-8")
+        legacy = measure(lambda: legacy_save(BytesIO(content)))
+        current = measure(lambda: asyncio.run(service.upload_file("bench.txt", BytesIO(content))))
+        print(
+            f"{len(content) / 2 ** 20:5.1f} MiB | "
+            f"legacy {legacy.ms:7.1f} ms, peak {legacy.peak_mb:6.1f} MiB | "
+            f"current {current.ms:7.1f} ms, peak {current.peak_mb:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,92 @@
-import hashlib
+import asyncio
+import logging
+from typing import AsyncIterator, BinaryIO
 
 from domain.interfaces.storage import AbstractFileStorage
+from domain.schemas.file import FileSchema, UploadResult
 from infrastructure.database.repositories.files import AbstractFileRepository
+from utils.streams import DigestingUTF8Reader
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
 
 
 class FileService:
-    def __init__(self, file_repo: AbstractFileRepository, file_storage: AbstractFileStorage):
+    def __init__(
+            self,
+            file_repo: AbstractFileRepository,
+            file_storage: AbstractFileStorage,
+            upload_concurrency: int = 8,
+            download_concurrency: int = 16,
+    ):
         self._file_repo: AbstractFileRepository = file_repo
         self._file_storage: AbstractFileStorage = file_storage
+        self._upload_concurrency = upload_concurrency
+        self._download_concurrency = download_concurrency
+
+    async def upload_file(self, file_name: str, stream: BinaryIO) -> int:
+        """
+        Потоковая загрузка: хеш и проверка UTF-8 считаются за тот же проход,
+        которым содержимое уходит в хранилище.
+        Бросает UnicodeDecodeError, если файл не является текстом в UTF-8.
+        """
+        reader = DigestingUTF8Reader(stream)
+        location = await self._file_storage.save_stream(reader)
+        return await self._add_file(file_name, reader.hexdigest(), location)
+
+    async def upload_files(self, files: list[tuple[str, BinaryIO]]) -> list[UploadResult]:
+        """
+        Пакетная загрузка: хеши всех файлов, один запрос на поиск уже известных,
+        параллельная (не более upload_concurrency) запись новых объектов
+        и одна многострочная вставка. Результат — по элементу на каждый входной файл.
+        """
+        results = [UploadResult(name=name) for name, _ in files]
+        by_hash: dict[str, list[int]] = {}
+        for i, (_, stream) in enumerate(files):
+            try:
+                file_hash = await asyncio.to_thread(self._get_stream_hash, stream)
+            except UnicodeDecodeError:
+                results[i].error = "Файл должен быть в кодировке UTF-8"
+                continue
+            by_hash.setdefault(file_hash, []).append(i)
+        if not by_hash:
+            return results
+
+        file_ids = await self._file_repo.get_ids_by_hashes(list(by_hash))
+        new_hashes = [file_hash for file_hash in by_hash if file_hash not in file_ids]
+        semaphore = asyncio.Semaphore(self._upload_concurrency)
 
-    async def save_file(self, file_name: str, file_text: str) -> int:
-        file_hash = await self._get_file_hash(file_text)
-        file = await self._file_repo.get_file_by_hash(file_hash)
-        if not file:
-            return await self._save_file(file_name, file_text)
-        return file.id
+        async def _upload(file_hash: str) -> str:
+            async with semaphore:
+                return await self._file_storage.save_stream(files[by_hash[file_hash][0]][1])
+
+        locations = await asyncio.gather(*(_upload(file_hash) for file_hash in new_hashes), return_exceptions=True)
+        rows = []
+        for file_hash, location in zip(new_hashes, locations):
+            if isinstance(location, Exception):
+                logger.error("Не удалось записать файл в хранилище", exc_info=location)
+                for i in by_hash[file_hash]:
+                    results[i].error = "Не удалось сохранить файл"
+                continue
+            rows.append({"name": files[by_hash[file_hash][0]][0], "hash": file_hash, "location": str(location)})
+
+        if rows:
+            try:
+                added = await self._file_repo.add_or_get_many(rows)
+            except Exception:
+                await asyncio.gather(*(self._delete_orphan(row["location"]) for row in rows))
+                raise
+            for row in rows:
+                file_id, created = added[row["hash"]]
+                file_ids[row["hash"]] = file_id
+                if not created:
+                    await self._delete_orphan(row["location"])
+
+        for file_hash, file_id in file_ids.items():
+            for i in by_hash[file_hash]:
+                results[i].file_id = file_id
+        return results
 
     async def get_file(self, file_id: int) -> str | None:
         file_location = await self._file_repo.get_location(file_id)
@@ -22,19 +94,107 @@ class FileService:
             return None
         return await self._file_storage.load(location=file_location)
 
+    async def get_files(self, file_ids: list[int]) -> AsyncIterator[tuple[int, str | None | Exception]]:
+        """
+        Тексты нескольких файлов в порядке готовности: расположения берутся одним
+        запросом, объекты читаются из хранилища параллельно (не более download_concurrency
+        прочитанных, но ещё не отданных текстов).
+        Для неизвестного id отдаётся None, при ошибке чтения — само исключение.
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        locations = await self._file_repo.get_locations(file_ids)
+        for file_id in file_ids:
+            if file_id not in locations:
+                yield file_id, None
+
+        pending = [file_id for file_id in file_ids if file_id in locations]
+        if not pending:
+            return
+        # слот держится, пока результат не отдан потребителю: при медленном
+        # клиенте в памяти не больше download_concurrency прочитанных текстов
+        slots = asyncio.Semaphore(self._download_concurrency)
+        ready: asyncio.Queue[tuple[int, str | Exception]] = asyncio.Queue()
+        next_ids = iter(pending)
+
+        async def _worker() -> None:
+            for file_id in next_ids:
+                await slots.acquire()
+                try:
+                    ready.put_nowait((file_id, await self._file_storage.load(location=locations[file_id])))
+                except Exception as e:
+                    ready.put_nowait((file_id, e))
+
+        workers = [asyncio.create_task(_worker()) for _ in range(min(self._download_concurrency, len(pending)))]
+        try:
+            for _ in pending:
+                yield await ready.get()
+                slots.release()
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    async def get_file_info(self, file_id: int) -> FileSchema | None:
+        return await self._file_repo.get_file_by_id(file_id)
+
+    async def get_file_size(self, location: str) -> int | None:
+        return await self._file_storage.stat(location)
+
+    def stream_file(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        return self._file_storage.stream(location, offset=offset, length=length)
+
+
+    async def collect_orphans(self, batch_size: int = 100) -> int:
+        """
+        Удаляет из хранилища объекты, на которые больше не ссылается ни одна запись.
+        Объект, который удалить не удалось, остаётся в списке до следующего запуска.
+        Возвращает число удалённых объектов.
+        """
+        removed = 0
+        while locations := await self._file_repo.get_orphaned_locations(batch_size):
+            deleted = []
+            for location in locations:
+                try:
+                    await self._file_storage.delete(location)
+                    deleted.append(location)
+                except Exception:
+                    logger.exception("Не удалось удалить осиротевший объект %s", location)
+            if not deleted:
+                break
+            await self._file_repo.forget_orphaned_locations(deleted)
+            removed += len(deleted)
+        return removed
+
+    async def _add_file(self, file_name: str, file_hash: str, location: str) -> int:
+        """
+        Регистрирует уже записанный в хранилище объект. Если файл с таким хешем
+        успел сохранить другой запрос, возвращает его id, а свой объект удаляет.
+        """
+        try:
+            file_id, created = await self._file_repo.add_or_get(
+                data={
+                    "name": file_name,
+                    "hash": file_hash,
+                    "location": str(location)
+                }
+            )
+        except Exception:
+            await self._delete_orphan(location)
+            raise
+        if not created:
+            await self._delete_orphan(location)
+        return file_id
 
-    async def _save_file(self, file_name: str, file_text: str) -> int:
-        location = await self._file_storage.save(file_text)
-        return await self._file_repo.add_one(
-            data={
-                "name": file_name,
-                "hash": await self._get_file_hash(file_text),
-                "location": str(location)
-            }
-        )
+    async def _delete_orphan(self, location: str) -> None:
+        try:
+            await self._file_storage.delete(str(location))
+        except Exception:
+            logger.exception("Не удалось удалить осиротевший объект %s", location)
 
     @staticmethod
-    async def _get_file_hash(content: str, algo: str = "sha256") -> str:
-        hash_func = getattr(hashlib, algo)()
-        hash_func.update(content.encode("utf-8"))
-        return hash_func.hexdigest()
+    def _get_stream_hash(stream: BinaryIO, algo: str = "sha256") -> str:
+        """Хеш по исходным байтам потока с попутной проверкой UTF-8; после чтения поток перематывается в начало."""
+        reader = DigestingUTF8Reader(stream, algo=algo)
+        while reader.read(HASH_CHUNK_SIZE):
+            pass
+        stream.seek(0)
+        return reader.hexdigest()
@@ -9,5 +9,45 @@ class AbstractFileRepository(AbstractRepository, ABC):
     async def get_location(self, file_id: int) -> str:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_locations(self, file_ids: list[int]) -> dict[int, str]:
+        """Расположение нескольких файлов одним запросом; отсутствующих id в ответе нет."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_file_by_id(self, file_id: int) -> FileSchema | None:
+        raise NotImplementedError
+
     async def get_file_by_hash(self, file_hash: str) -> FileSchema | None:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_or_get(self, data: dict) -> tuple[int, bool]:
+        """
+        Добавляет файл, если файла с таким же хешем ещё нет.
+        Возвращает id записи и признак того, что запись создана этим вызовом.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_ids_by_hashes(self, hashes: list[str]) -> dict[str, int]:
+        """Id уже сохранённых файлов по их хешам одним запросом."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_or_get_many(self, rows: list[dict]) -> dict[str, tuple[int, bool]]:
+        """
+        Пакетный вариант add_or_get: одна многострочная вставка.
+        Возвращает для каждого хеша id записи и признак того, что она создана этим вызовом.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_orphaned_locations(self, limit: int) -> list[str]:
+        """Объекты хранилища, на которые больше не ссылается ни одна запись."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def forget_orphaned_locations(self, locations: list[str]) -> None:
+        """Убирает из списка объекты, уже удалённые из хранилища."""
+        raise NotImplementedError
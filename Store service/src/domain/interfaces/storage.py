@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import AsyncIterator, BinaryIO, Union
 
 
 class AbstractFileStorage(ABC):
@@ -8,11 +8,26 @@ class AbstractFileStorage(ABC):
         """Сохраняет данные и возвращает строковый идентификатор (путь)."""
         raise NotImplementedError
 
+    @abstractmethod
+    async def save_stream(self, stream: BinaryIO) -> str:
+        """Сохраняет содержимое файлового объекта, читая его частями."""
+        raise NotImplementedError
+
     @abstractmethod
     async def load(self, location: str) -> Union[str, bytes]:
         """Загружает данные по строковому идентификатору."""
         raise NotImplementedError
 
+    @abstractmethod
+    async def stat(self, location: str) -> int | None:
+        """Размер объекта в байтах или None, если объекта нет."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        """Отдаёт объект (или его диапазон) частями, не загружая целиком в память."""
+        raise NotImplementedError
+
     @abstractmethod
     async def delete(self, location: str) -> None:
         """Удаляет данные по строковому идентификатору."""
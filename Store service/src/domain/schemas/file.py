@@ -8,4 +8,10 @@ class FileSchema(BaseModel):
     location: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class UploadResult(BaseModel):
+    name: str
+    file_id: int | None = None
+    error: str | None = None
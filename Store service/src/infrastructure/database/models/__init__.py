@@ -1 +1,2 @@
-from .file import File
\ No newline at end of file
+from .file import File
+from .orphaned_object import OrphanedObject
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from domain.schemas.file import FileSchema
@@ -8,11 +8,18 @@ from infrastructure.database.models.types import String64
 
 class File(Base):
     __tablename__ = "files"
+    # хеш уникален среди канонических записей; дубликаты, оставшиеся от загрузок
+    # до появления индекса, в нём не участвуют
+    __table_args__ = (
+        Index("files_hash_key", "hash", unique=True, postgresql_where=text("canonical_id IS NULL")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[String64]
-    hash: Mapped[String64] = mapped_column(unique=True)
+    hash: Mapped[String64]
     location: Mapped[str] = mapped_column(String)
+    # у дубликата id остаётся рабочим, а location указывает на объект канонической записи
+    canonical_id: Mapped[int | None] = mapped_column(ForeignKey("files.id"))
 
     def to_read_model(self):
         return FileSchema(
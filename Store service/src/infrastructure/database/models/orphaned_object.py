@@ -0,0 +1,11 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from infrastructure.database.db_context import Base
+
+
+class OrphanedObject(Base):
+    """Объект хранилища, на который больше не ссылается ни одна запись; ждёт удаления."""
+    __tablename__ = "orphaned_objects"
+
+    location: Mapped[str] = mapped_column(String, primary_key=True)
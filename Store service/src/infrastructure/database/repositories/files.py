@@ -1,10 +1,11 @@
-from sqlalchemy import select
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
 
 from domain.interfaces.base_repository import SQLAlchemyRepository
 from domain.interfaces.file_repository import AbstractFileRepository
 from domain.schemas.file import FileSchema
 from infrastructure.database.db_context import async_session_maker
-from infrastructure.database.models import File
+from infrastructure.database.models import File, OrphanedObject
 
 
 class SQLFileRepository(AbstractFileRepository, SQLAlchemyRepository):
@@ -18,10 +19,81 @@ class SQLFileRepository(AbstractFileRepository, SQLAlchemyRepository):
                 return None
             return file_location
 
+    async def get_locations(self, file_ids: list[int]) -> dict[int, str]:
+        async with async_session_maker() as session:
+            stmt = select(self.model.id, self.model.location).filter(self.model.id.in_(file_ids))
+            return {file_id: location for file_id, location in await session.execute(stmt)}
+
+    async def get_file_by_id(self, file_id: int) -> FileSchema | None:
+        async with async_session_maker() as session:
+            file = await session.get(self.model, file_id)
+            if file:
+                return file.to_read_model()
+            return None
+
     async def get_file_by_hash(self, file_hash: str) -> FileSchema | None:
         async with async_session_maker() as session:
-            stmt = select(self.model).filter(self.model.hash == file_hash)
+            stmt = select(self.model).filter(self.model.hash == file_hash, self.model.canonical_id.is_(None))
             file = (await session.scalars(stmt)).one_or_none()
             if file:
                 return file.to_read_model()
             return None
+
+    async def add_or_get(self, data: dict) -> tuple[int, bool]:
+        async with async_session_maker() as session:
+            stmt = (
+                insert(self.model)
+                .values(**data)
+                .on_conflict_do_nothing(
+                    index_elements=[self.model.hash], index_where=self.model.canonical_id.is_(None)
+                )
+                .returning(self.model.id)
+            )
+            file_id = (await session.execute(stmt)).scalar_one_or_none()
+            created = file_id is not None
+            if not created:
+                # конкурирующая вставка уже зафиксирована: INSERT дождался её
+                # коммита, поэтому следующий запрос гарантированно видит строку
+                stmt = select(self.model.id).filter(
+                    self.model.hash == data["hash"], self.model.canonical_id.is_(None)
+                )
+                file_id = (await session.scalars(stmt)).one()
+            await session.commit()
+            return file_id, created
+
+    async def get_ids_by_hashes(self, hashes: list[str]) -> dict[str, int]:
+        async with async_session_maker() as session:
+            stmt = select(self.model.hash, self.model.id).filter(
+                self.model.hash.in_(hashes), self.model.canonical_id.is_(None)
+            )
+            return {file_hash: file_id for file_hash, file_id in await session.execute(stmt)}
+
+    async def add_or_get_many(self, rows: list[dict]) -> dict[str, tuple[int, bool]]:
+        async with async_session_maker() as session:
+            stmt = (
+                insert(self.model)
+                .values(rows)
+                .on_conflict_do_nothing(
+                    index_elements=[self.model.hash], index_where=self.model.canonical_id.is_(None)
+                )
+                .returning(self.model.hash, self.model.id)
+            )
+            result = {file_hash: (file_id, True) for file_hash, file_id in await session.execute(stmt)}
+            missing = [row["hash"] for row in rows if row["hash"] not in result]
+            if missing:
+                stmt = select(self.model.hash, self.model.id).filter(
+                    self.model.hash.in_(missing), self.model.canonical_id.is_(None)
+                )
+                result.update({file_hash: (file_id, False) for file_hash, file_id in await session.execute(stmt)})
+            await session.commit()
+            return result
+
+    async def get_orphaned_locations(self, limit: int) -> list[str]:
+        async with async_session_maker() as session:
+            stmt = select(OrphanedObject.location).limit(limit)
+            return list(await session.scalars(stmt))
+
+    async def forget_orphaned_locations(self, locations: list[str]) -> None:
+        async with async_session_maker() as session:
+            await session.execute(delete(OrphanedObject).filter(OrphanedObject.location.in_(locations)))
+            await session.commit()
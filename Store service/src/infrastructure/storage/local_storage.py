@@ -1,8 +1,10 @@
+import asyncio
 import os
+import shutil
 import uuid
 
 import aiofiles
-from typing import Union
+from typing import AsyncIterator, BinaryIO, Union
 
 from domain.interfaces.storage import AbstractFileStorage
 
@@ -21,12 +23,44 @@ class LocalFileStorage(AbstractFileStorage):
             await f.write(content)
         return location
 
+    async def save_stream(self, stream: BinaryIO) -> str:
+        location = uuid.uuid4()
+        full_path = os.path.join(self.base_path, f"{location}")
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        def _copy():
+            with open(full_path, "wb") as f:
+                shutil.copyfileobj(stream, f)
+
+        await asyncio.get_running_loop().run_in_executor(None, _copy)
+        return location
+
     async def load(self, location: str) -> str:
         full_path = os.path.join(self.base_path, location)
         mode = 'r' if full_path.endswith('.txt') else 'rb'
         async with aiofiles.open(full_path, mode) as f:
             return await f.read()
 
+    async def stat(self, location: str) -> int | None:
+        full_path = os.path.join(self.base_path, location)
+        if not os.path.exists(full_path):
+            return None
+        return os.path.getsize(full_path)
+
+    async def stream(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        full_path = os.path.join(self.base_path, location)
+        remaining = length
+        async with aiofiles.open(full_path, 'rb') as f:
+            await f.seek(offset)
+            while remaining is None or remaining > 0:
+                size = 64 * 1024 if remaining is None else min(64 * 1024, remaining)
+                chunk = await f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
     async def delete(self, location: str) -> None:
         full_path = os.path.join(self.base_path, location)
         if os.path.exists(full_path):
@@ -1,8 +1,10 @@
 import asyncio
 import uuid
-from typing import Union
+from functools import partial
+from typing import AsyncIterator, BinaryIO, Union
 
 from minio import Minio
+from minio.error import S3Error
 from domain.interfaces.storage import AbstractFileStorage
 
 
@@ -10,6 +12,9 @@ class MinioFileStorage(AbstractFileStorage):
     """
     Асинхронная обёртка над MinIO Python SDK.
     """
+    part_size = 5 * 1024 * 1024  # минимальный размер части multipart-загрузки
+    chunk_size = 64 * 1024
+
     def __init__(
         self,
         endpoint: str,
@@ -62,6 +67,29 @@ class MinioFileStorage(AbstractFileStorage):
         await asyncio.get_running_loop().run_in_executor(None, _put)
         return key
 
+    async def save_stream(self, stream: BinaryIO) -> str:
+        """
+        Загружает файловый объект в MinIO multipart-загрузкой: в памяти
+        одновременно находятся только несколько частей по part_size байт.
+        Если чтение потока упало, SDK сам отменяет незавершённую загрузку.
+        """
+        await self.init()
+
+        key = f"{self.prefix}{uuid.uuid4()}.txt"
+
+        def _put():
+            self.client.put_object(
+                bucket_name=self.bucket_name,
+                object_name=key,
+                data=stream,
+                length=-1,
+                part_size=self.part_size,
+                content_type="text/plain; charset=utf-8",
+            )
+
+        await asyncio.get_running_loop().run_in_executor(None, _put)
+        return key
+
     async def load(self, location: str) -> Union[str, bytes]:
         """Загружает объект из MinIO по ключу."""
         await self.init()
@@ -78,6 +106,39 @@ class MinioFileStorage(AbstractFileStorage):
         except UnicodeDecodeError:
             return data
 
+    async def stat(self, location: str) -> int | None:
+        """Размер объекта в байтах или None, если объекта нет."""
+        await self.init()
+
+        def _stat():
+            try:
+                return self.client.stat_object(self.bucket_name, location).size
+            except S3Error as e:
+                if e.code in ("NoSuchKey", "NoSuchObject"):
+                    return None
+                raise
+
+        return await asyncio.get_running_loop().run_in_executor(None, _stat)
+
+    async def stream(self, location: str, offset: int = 0, length: int | None = None) -> AsyncIterator[bytes]:
+        """
+        Читает объект из MinIO частями по chunk_size. Следующая часть запрашивается,
+        только когда потребитель забрал предыдущую, а соединение освобождается
+        и при обрыве клиента (закрытие генератора).
+        """
+        await self.init()
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None,
+            partial(self.client.get_object, self.bucket_name, location, offset=offset, length=length or 0),
+        )
+        try:
+            while chunk := await loop.run_in_executor(None, response.read, self.chunk_size):
+                yield chunk
+        finally:
+            response.close()
+            response.release_conn()
+
     async def delete(self, location: str) -> None:
         """Удаляет объект из MinIO по ключу."""
         def _remove():
@@ -1,8 +1,36 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from presentation.API.files import router
+from presentation.dependencies.sevices import file_service
+
+logger = logging.getLogger(__name__)
+
+
+async def collect_orphans() -> None:
+    try:
+        removed = await file_service().collect_orphans()
+    except Exception:
+        logger.exception("Не удалось удалить осиротевшие объекты хранилища")
+        return
+    if removed:
+        logger.info("Удалено осиротевших объектов хранилища: %s", removed)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # объекты, на которые больше не ссылаются записи, удаляются в фоне и не задерживают старт
+    task = asyncio.create_task(collect_orphans())
+    try:
+        yield
+    finally:
+        task.cancel()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
 
 
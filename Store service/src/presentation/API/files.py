@@ -1,11 +1,21 @@
 import logging
-import traceback
+from typing import AsyncIterator
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, Path
-from pydantic import BaseModel
+from fastapi import APIRouter, File, UploadFile, HTTPException, Path, Request, Response
+from pydantic import BaseModel, Field
 from starlette import status
+from starlette.responses import StreamingResponse
 
-from presentation.dependencies.sevices import FileServiceDep
+from application.services.file_service import FileService
+from domain.schemas.file import UploadResult
+from presentation.dependencies.sevices import ConfigDep, FileServiceDep
+from presentation.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    RangeNotSatisfiableError,
+    etag_matches,
+    make_etag,
+    parse_range,
+)
 
 router = APIRouter(prefix="/files", tags=["Работа с файлами"])
 
@@ -21,15 +31,75 @@ async def upload_file(file_service: FileServiceDep, file: UploadFile = File(...)
     if not file.filename.endswith(".txt"):
         raise HTTPException(status_code=400, detail="Only .txt files allowed")
     try:
-        content = await file.read()
-        text = content.decode("utf-8")
-        return {"file_id": await file_service.save_file(file_name=file.filename, file_text=text)}
+        return {"file_id": await file_service.upload_file(file_name=file.filename, stream=file.file)}
 
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Файл должен быть в кодировке UTF-8")
     except Exception as e:
         logger.exception(e)
         raise HTTPException(status_code=500, detail=f"Ошибка обработки файла: {str(e)}")
 
 
+class BatchUploadResponse(BaseModel):
+    files: list[UploadResult]
+
+
+@router.post("/batch", response_model=BatchUploadResponse)
+async def upload_files(file_service: FileServiceDep, config: ConfigDep, files: list[UploadFile] = File(...)):
+    max_files = config.uploads.max_batch_files
+    if len(files) > max_files:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Не больше {max_files} файлов за один запрос"
+        )
+    accepted = [file for file in files if file.filename.endswith(".txt")]
+    try:
+        uploaded = iter(await file_service.upload_files([(file.filename, file.file) for file in accepted]))
+    except Exception as e:
+        logger.exception(e)
+        raise HTTPException(status_code=500, detail=f"Ошибка обработки файлов: {str(e)}")
+
+    return {
+        "files": [
+            next(uploaded) if file.filename.endswith(".txt")
+            else UploadResult(name=file.filename, error="Only .txt files allowed")
+            for file in files
+        ]
+    }
+
+
+class BatchGetRequest(BaseModel):
+    file_ids: list[int] = Field(min_length=1)
+
+
+class BatchGetItem(BaseModel):
+    """Одна строка NDJSON-ответа пакетного чтения; file_text = null без error — файла нет."""
+    file_id: int
+    file_text: str | None = None
+    error: str | None = None
+
+
+@router.post("/batch-get", response_class=StreamingResponse)
+async def get_files(file_service: FileServiceDep, config: ConfigDep, body: BatchGetRequest):
+    max_files = config.downloads.max_batch_files
+    if len(body.file_ids) > max_files:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Не больше {max_files} файлов за один запрос"
+        )
+    return StreamingResponse(_batch_get_lines(file_service, body.file_ids), media_type="application/x-ndjson")
+
+
+async def _batch_get_lines(file_service: FileService, file_ids: list[int]) -> AsyncIterator[str]:
+    async for file_id, file_text in file_service.get_files(file_ids):
+        if isinstance(file_text, Exception):
+            logger.error("Не удалось прочитать файл %s", file_id, exc_info=file_text)
+            item = BatchGetItem(file_id=file_id, error=f"Ошибка чтения файла: {str(file_text)}")
+        else:
+            item = BatchGetItem(file_id=file_id, file_text=file_text)
+        yield item.model_dump_json() + "\n"
+
+
 class FileContentResponse(BaseModel):
     file_text: str
 
@@ -44,4 +114,57 @@ async def get_file(file_service: FileServiceDep, file_id: int = Path(...,ge=1)):
             detail=f"Файл с id={file_id} не найден"
         )
 
-    return {"file_text": file_text}
\ No newline at end of file
+    return {"file_text": file_text}
+
+
+@router.get("/{file_id}/raw", response_class=StreamingResponse)
+async def get_file_raw(file_service: FileServiceDep, request: Request, file_id: int = Path(..., ge=1)):
+    file = await file_service.get_file_info(file_id)
+    if file is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Файл с id={file_id} не найден"
+        )
+
+    etag = make_etag(file.hash)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    size = await file_service.get_file_size(file.location)
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Содержимое файла с id={file_id} не найдено в хранилище"
+        )
+
+    # If-None-Match, в том числе "*", совпадает, только если объект существует (RFC 9110, 13.1.2)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag:
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+    if byte_range is None:
+        return StreamingResponse(
+            file_service.stream_file(file.location),
+            media_type="text/plain; charset=utf-8",
+            headers={**headers, "Content-Length": str(size)},
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        file_service.stream_file(file.location, offset=start, length=end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="text/plain; charset=utf-8",
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)},
+    )
@@ -5,7 +5,11 @@ from fastapi import Depends
 from application.services.file_service import FileService
 from infrastructure.database.repositories.files import SQLFileRepository
 from infrastructure.storage.minio_storage import MinioFileStorage
-from utils.config import load_config
+from utils.config import Config, load_config
+
+
+def app_config() -> Config:
+    return load_config()
 
 
 def file_service():
@@ -19,8 +23,11 @@ def file_service():
             bucket_name=config.minio.bucket_name,
             secure=config.minio.secure,
             prefix="files/",
-        )
+        ),
+        upload_concurrency=config.uploads.batch_concurrency,
+        download_concurrency=config.downloads.batch_concurrency,
     )
 
 
 FileServiceDep = Annotated[FileService, Depends(file_service)]
+ConfigDep = Annotated[Config, Depends(app_config)]
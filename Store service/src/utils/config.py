@@ -58,9 +58,23 @@ class MinioConfig(BaseModel):
     def endpoint(self):
         return f"{self.host}:{self.port}"
 
+class UploadsConfig(BaseModel):
+    # сколько объектов пакетной загрузки одновременно пишется в MinIO
+    batch_concurrency: int = 8
+    max_batch_files: int = 500
+
+
+class DownloadsConfig(BaseModel):
+    # сколько объектов пакетного чтения одновременно читается из MinIO
+    batch_concurrency: int = 16
+    max_batch_files: int = 1000
+
+
 class Config(BaseModel):
     database: DatabaseConfig
     minio: MinioConfig
+    uploads: UploadsConfig = UploadsConfig()
+    downloads: DownloadsConfig = DownloadsConfig()
 
 def load_config() -> Config:
     data = load_yaml_config()
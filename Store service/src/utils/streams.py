@@ -0,0 +1,33 @@
+import codecs
+import hashlib
+from typing import BinaryIO
+
+
+class DigestingUTF8Reader:
+    """
+    Обёртка над бинарным файловым объектом: по мере чтения считает хеш
+    и проверяет, что содержимое является корректным UTF-8.
+    Декодированный текст не сохраняется, поэтому память не зависит от размера файла.
+    """
+
+    def __init__(self, raw: BinaryIO, algo: str = "sha256"):
+        self._raw = raw
+        self._hash = hashlib.new(algo)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._finished = False
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._raw.read(size)
+        if chunk:
+            self._hash.update(chunk)
+            self._decoder.decode(chunk)
+            self.size += len(chunk)
+        elif not self._finished:
+            # обрезанная в конце многобайтовая последовательность
+            self._decoder.decode(b"", final=True)
+            self._finished = True
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
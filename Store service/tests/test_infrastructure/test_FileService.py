@@ -1,5 +1,9 @@
 # tests/test_application/test_file_service.py
 
+import asyncio
+import hashlib
+from io import BytesIO
+
 import pytest
 from unittest.mock import AsyncMock, Mock
 from application.services.file_service import FileService  # путь адаптируй под себя
@@ -10,13 +14,21 @@ class TestFileService:
     @pytest.fixture(autouse=True)
     def _setup(self, mocker):
         self.mock_repo = mocker.Mock()
-        self.mock_repo.get_file_by_hash = AsyncMock()
         self.mock_repo.get_location = AsyncMock()
-        self.mock_repo.add_one = AsyncMock()
+        self.mock_repo.add_or_get = AsyncMock(return_value=(42, True))
 
         self.mock_storage = mocker.Mock()
-        self.mock_storage.save = AsyncMock()
         self.mock_storage.load = AsyncMock()
+        self.mock_storage.delete = AsyncMock()
+
+        async def save_stream(stream):
+            self.uploaded = stream.read(3) + stream.read()
+            stream.read()
+            return "file/key"
+
+        self.mock_storage.save_stream = AsyncMock(side_effect=save_stream)
+        self.mock_repo.get_ids_by_hashes = AsyncMock(return_value={})
+        self.mock_repo.add_or_get_many = AsyncMock()
 
         self.service = FileService(
             file_repo=self.mock_repo,
@@ -24,44 +36,203 @@ class TestFileService:
         )
 
     @pytest.mark.asyncio
-    async def test_save_file_when_not_exists(self):
+    async def test_upload_file_streams_and_hashes_in_one_pass(self):
         # Arrange
-        file_name = "test.txt"
-        file_text = "hello world"
-        fake_hash = await self.service._get_file_hash(file_text)
-        self.mock_repo.get_file_by_hash.return_value = None
-        self.mock_storage.save.return_value = "file/key"
-        self.mock_repo.add_one.return_value = 42
+        content = "потоковая загрузка".encode("utf-8")
+        self.mock_repo.add_or_get.return_value = (5, True)
 
         # Act
-        file_id = await self.service.save_file(file_name, file_text)
+        file_id = await self.service.upload_file("a.txt", BytesIO(content))
 
         # Assert
-        assert file_id == 42
-        self.mock_repo.get_file_by_hash.assert_called_once_with(fake_hash)
-        self.mock_storage.save.assert_called_once_with(file_text)
-        self.mock_repo.add_one.assert_called_once()
-        data = self.mock_repo.add_one.call_args[1]["data"]
-        assert data["name"] == file_name
-        assert data["hash"] == fake_hash
-        assert data["location"] == "file/key"
+        assert file_id == 5
+        assert self.uploaded == content
+        file_hash = hashlib.sha256(content).hexdigest()
+        data = self.mock_repo.add_or_get.call_args[1]["data"]
+        assert data == {"name": "a.txt", "hash": file_hash, "location": "file/key"}
+        self.mock_storage.delete.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_save_file_when_already_exists(self):
+    async def test_upload_file_duplicate_removes_uploaded_object(self):
         # Arrange
-        file_text = "same content"
-        fake_hash = await self.service._get_file_hash(file_text)
-        existing_file = Mock(id=99)
-        self.mock_repo.get_file_by_hash.return_value = existing_file
+        self.mock_repo.add_or_get.return_value = (99, False)
 
         # Act
-        file_id = await self.service.save_file("ignored.txt", file_text)
+        file_id = await self.service.upload_file("a.txt", BytesIO(b"dup"))
 
         # Assert
         assert file_id == 99
-        self.mock_repo.get_file_by_hash.assert_called_once_with(fake_hash)
-        self.mock_storage.save.assert_not_called()
-        self.mock_repo.add_one.assert_not_called()
+        self.mock_storage.delete.assert_called_once_with("file/key")
+
+    @pytest.mark.asyncio
+    async def test_upload_file_db_error_removes_uploaded_object(self):
+        # Arrange
+        self.mock_repo.add_or_get.side_effect = RuntimeError("db down")
+
+        # Act / Assert
+        with pytest.raises(RuntimeError):
+            await self.service.upload_file("a.txt", BytesIO(b"text"))
+        self.mock_storage.delete.assert_called_once_with("file/key")
+
+    @pytest.mark.asyncio
+    async def test_upload_file_rejects_invalid_utf8(self):
+        with pytest.raises(UnicodeDecodeError):
+            await self.service.upload_file("a.txt", BytesIO(b"\xff\xfe"))
+
+        self.mock_repo.add_or_get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upload_files_dedupes_and_inserts_once(self):
+        # Arrange
+        known, new = b"known", b"new"
+        known_hash = hashlib.sha256(known).hexdigest()
+        new_hash = hashlib.sha256(new).hexdigest()
+        self.mock_repo.get_ids_by_hashes.return_value = {known_hash: 1}
+        self.mock_repo.add_or_get_many.return_value = {new_hash: (2, True)}
+
+        # Act
+        results = await self.service.upload_files([
+            ("a.txt", BytesIO(known)),
+            ("b.txt", BytesIO(new)),
+            ("c.txt", BytesIO(new)),
+            ("d.txt", BytesIO(b"\xff")),
+        ])
+
+        # Assert
+        assert [(r.name, r.file_id) for r in results] == [("a.txt", 1), ("b.txt", 2), ("c.txt", 2), ("d.txt", None)]
+        assert results[3].error
+        self.mock_repo.get_ids_by_hashes.assert_awaited_once()
+        assert set(self.mock_repo.get_ids_by_hashes.call_args[0][0]) == {known_hash, new_hash}
+        assert self.mock_storage.save_stream.await_count == 1
+        assert self.uploaded == new
+        self.mock_repo.add_or_get_many.assert_awaited_once_with(
+            [{"name": "b.txt", "hash": new_hash, "location": "file/key"}]
+        )
+        self.mock_storage.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upload_files_bounds_parallel_uploads(self):
+        # Arrange
+        self.service._upload_concurrency = 2
+        running = peak = 0
+
+        async def save_stream(stream):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return f"file/{stream.read().decode()}"
+
+        self.mock_storage.save_stream.side_effect = save_stream
+
+        async def add_or_get_many(rows):
+            return {row["hash"]: (i, True) for i, row in enumerate(rows)}
+
+        self.mock_repo.add_or_get_many.side_effect = add_or_get_many
+
+        # Act
+        results = await self.service.upload_files([(f"{i}.txt", BytesIO(str(i).encode())) for i in range(6)])
+
+        # Assert
+        assert peak == 2
+        assert [r.file_id for r in results] == list(range(6))
+
+    @pytest.mark.asyncio
+    async def test_upload_files_reports_failed_upload_and_gc_lost_race(self):
+        # Arrange
+        async def save_stream(stream):
+            content = stream.read()
+            if content == b"broken":
+                raise RuntimeError("minio down")
+            return f"file/{content.decode()}"
+
+        self.mock_storage.save_stream.side_effect = save_stream
+        raced_hash = hashlib.sha256(b"raced").hexdigest()
+        self.mock_repo.add_or_get_many.return_value = {raced_hash: (9, False)}
+
+        # Act
+        results = await self.service.upload_files([("a.txt", BytesIO(b"broken")), ("b.txt", BytesIO(b"raced"))])
+
+        # Assert
+        assert results[0].file_id is None and results[0].error
+        assert results[1].file_id == 9
+        self.mock_storage.delete.assert_called_once_with("file/raced")
+
+    @pytest.mark.asyncio
+    async def test_get_files_resolves_locations_once_and_loads_concurrently(self):
+        # Arrange
+        self.mock_repo.get_locations = AsyncMock(return_value={1: "files/1.txt", 3: "files/3.txt", 4: "files/4.txt"})
+        self.service._download_concurrency = 2
+        running = peak = 0
+
+        async def load(location):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if location == "files/4.txt":
+                raise RuntimeError("minio down")
+            return f"text of {location}"
+
+        self.mock_storage.load.side_effect = load
+
+        # Act
+        results = [item async for item in self.service.get_files([1, 2, 3, 4, 1])]
+
+        # Assert
+        self.mock_repo.get_locations.assert_awaited_once_with([1, 2, 3, 4])
+        assert results[0] == (2, None)
+        results = dict(results[1:])
+        assert results[1] == "text of files/1.txt"
+        assert results[3] == "text of files/3.txt"
+        assert isinstance(results[4], RuntimeError)
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_get_files_holds_slot_until_item_is_consumed(self):
+        # Arrange
+        self.mock_repo.get_locations = AsyncMock(return_value={i: f"files/{i}.txt" for i in range(6)})
+        self.service._download_concurrency = 2
+        self.mock_storage.load.side_effect = lambda location: f"text of {location}"
+        files = self.service.get_files(list(range(6)))
+
+        # Act
+        await anext(files)
+        await asyncio.sleep(0.01)
+        loaded_while_first_held = self.mock_storage.load.call_count
+        await anext(files)
+        await asyncio.sleep(0.01)
+        loaded_while_second_held = self.mock_storage.load.call_count
+        rest = [item async for item in files]
+
+        # Assert
+        assert loaded_while_first_held == 2
+        assert loaded_while_second_held == 3
+        assert len(rest) == 4
+
+    @pytest.mark.asyncio
+    async def test_collect_orphans_keeps_objects_that_failed_to_delete(self):
+        # Arrange
+        self.mock_repo.get_orphaned_locations = AsyncMock(
+            side_effect=[["files/a.txt", "files/b.txt"], ["files/b.txt"]]
+        )
+        self.mock_repo.forget_orphaned_locations = AsyncMock()
+
+        async def delete(location):
+            if location == "files/b.txt":
+                raise RuntimeError("minio down")
+
+        self.mock_storage.delete.side_effect = delete
+
+        # Act
+        removed = await self.service.collect_orphans(batch_size=2)
+
+        # Assert
+        assert removed == 1
+        self.mock_repo.get_orphaned_locations.assert_awaited_with(2)
+        self.mock_repo.forget_orphaned_locations.assert_awaited_once_with(["files/a.txt"])
 
     @pytest.mark.asyncio
     async def test_get_file_when_exists(self):
@@ -3,6 +3,7 @@
 import asyncio
 import uuid
 import importlib
+from io import BytesIO
 
 import pytest
 from infrastructure.storage.minio_storage import MinioFileStorage  # путь адаптируй под себя
@@ -94,6 +95,18 @@ class TestMinioFileStorage:
         assert isinstance(data, bytes)
         assert data == "Привет, мир!".encode("utf-8")
 
+    @pytest.mark.asyncio
+    async def test_save_stream_uses_multipart_upload_of_unknown_length(self):
+        stream = BytesIO(b"streamed")
+
+        key = await self.storage.save_stream(stream)
+
+        assert key == self.fixed_key
+        _, kwargs = self.client.put_object.call_args
+        assert kwargs["data"] is stream
+        assert kwargs["length"] == -1
+        assert kwargs["part_size"] == MinioFileStorage.part_size
+
     @pytest.mark.asyncio
     async def test_load_decodes_utf8_to_string(self):
         self.response.read.return_value = b"binary-data"
@@ -114,6 +127,17 @@ class TestMinioFileStorage:
         data = await self.storage.load("binfile")
         assert isinstance(data, bytes)
 
+    @pytest.mark.asyncio
+    async def test_stream_reads_range_in_chunks_and_releases_connection(self):
+        self.response.read.side_effect = [b"ab", b"cd", b""]
+
+        chunks = [chunk async for chunk in self.storage.stream("docs/a.txt", offset=3, length=4)]
+
+        assert chunks == [b"ab", b"cd"]
+        self.client.get_object.assert_called_once_with("test-bucket", "docs/a.txt", offset=3, length=4)
+        self.response.close.assert_called_once()
+        self.response.release_conn.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_delete_removes_file(self):
         await self.storage.delete("old/file.txt")
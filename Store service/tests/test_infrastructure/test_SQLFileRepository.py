@@ -1,5 +1,6 @@
 import pytest
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 from infrastructure.database.models import File
 from infrastructure.database.repositories.files import SQLFileRepository
 
@@ -92,7 +93,7 @@ class TestSQLFileRepository:
 
         # Assert
         assert result is fake_schema
-        expected = select(File).filter(File.hash == "hash_abc")
+        expected = select(File).filter(File.hash == "hash_abc", File.canonical_id.is_(None))
         called_stmt = mock_session.scalars.call_args[0][0]
         assert str(called_stmt) == str(expected)
 
@@ -121,6 +122,123 @@ class TestSQLFileRepository:
 
         # Assert
         assert result is None
-        expected = select(File).filter(File.hash == "no_such_hash")
+        expected = select(File).filter(File.hash == "no_such_hash", File.canonical_id.is_(None))
         called_stmt = mock_session.scalars.call_args[0][0]
         assert str(called_stmt) == str(expected)
+
+    @pytest.mark.asyncio
+    async def test_add_or_get_inserts_with_on_conflict(self, mocker):
+        # Arrange
+        mock_session = mocker.AsyncMock()
+        mock_result = mocker.Mock()
+        mock_result.scalar_one_or_none.return_value = 10
+        mock_session.execute.return_value = mock_result
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'infrastructure.database.repositories.files.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileRepository()
+
+        # Act
+        result = await repo.add_or_get({"name": "a.txt", "hash": "h", "location": "files/a.txt"})
+
+        # Assert
+        assert result == (10, True)
+        called_stmt = mock_session.execute.call_args[0][0]
+        assert "ON CONFLICT (hash) WHERE canonical_id IS NULL DO NOTHING" in str(called_stmt.compile(dialect=postgresql.dialect()))
+        mock_session.scalars.assert_not_called()
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_add_or_get_returns_existing_id_on_conflict(self, mocker):
+        # Arrange
+        mock_session = mocker.AsyncMock()
+        mock_result = mocker.Mock()
+        mock_result.scalar_one_or_none.return_value = None
+        mock_session.execute.return_value = mock_result
+        mock_scalars = mocker.Mock()
+        mock_scalars.one.return_value = 3
+
+        async def fake_scalars(stmt):
+            return mock_scalars
+        mock_session.scalars.side_effect = fake_scalars
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'infrastructure.database.repositories.files.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileRepository()
+
+        # Act
+        result = await repo.add_or_get({"name": "a.txt", "hash": "h", "location": "files/a.txt"})
+
+        # Assert
+        assert result == (3, False)
+        expected = select(File.id).filter(File.hash == "h", File.canonical_id.is_(None))
+        called_stmt = mock_session.scalars.call_args[0][0]
+        assert str(called_stmt) == str(expected)
+
+    @pytest.mark.asyncio
+    async def test_add_or_get_many_uses_single_insert_and_resolves_conflicts(self, mocker):
+        # Arrange
+        mock_session = mocker.AsyncMock()
+        mock_session.execute.side_effect = [[("h1", 1)], [("h2", 2)]]
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'infrastructure.database.repositories.files.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileRepository()
+        rows = [
+            {"name": "a.txt", "hash": "h1", "location": "files/a.txt"},
+            {"name": "b.txt", "hash": "h2", "location": "files/b.txt"},
+        ]
+
+        # Act
+        result = await repo.add_or_get_many(rows)
+
+        # Assert
+        assert result == {"h1": (1, True), "h2": (2, False)}
+        insert_stmt = mock_session.execute.call_args_list[0][0][0]
+        compiled = str(insert_stmt.compile(dialect=postgresql.dialect()))
+        assert compiled.count("INSERT") == 1
+        assert "ON CONFLICT (hash) WHERE canonical_id IS NULL DO NOTHING" in compiled
+        select_stmt = mock_session.execute.call_args_list[1][0][0]
+        assert "IN" in str(select_stmt)
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_orphaned_locations_are_listed_and_forgotten(self, mocker):
+        # Arrange
+        mock_session = mocker.AsyncMock()
+        mock_session.scalars.return_value = ["files/old.txt"]
+
+        mock_ctx = mocker.AsyncMock()
+        mock_ctx.__aenter__.return_value = mock_session
+        mocker.patch(
+            'infrastructure.database.repositories.files.async_session_maker',
+            return_value=mock_ctx
+        )
+
+        repo = SQLFileRepository()
+
+        # Act
+        locations = await repo.get_orphaned_locations(10)
+        await repo.forget_orphaned_locations(locations)
+
+        # Assert
+        assert locations == ["files/old.txt"]
+        assert "LIMIT" in str(mock_session.scalars.call_args[0][0])
+        delete_stmt = str(mock_session.execute.call_args[0][0])
+        assert delete_stmt.startswith("DELETE FROM orphaned_objects")
+        mock_session.commit.assert_awaited_once()
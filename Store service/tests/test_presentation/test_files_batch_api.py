@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from application.services.file_service import FileService
+from domain.schemas.file import UploadResult
+from presentation.API import files as files_api
+from presentation.dependencies.sevices import app_config, file_service
+from utils.config import load_config
+
+
+class TestBatchFilesAPI:
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker):
+        self.mock_service = mocker.Mock(spec=FileService)
+
+        async def upload_files(files):
+            self.received = [(name, stream.read()) for name, stream in files]
+            return [UploadResult(name=name, file_id=i + 1) for i, (name, _) in enumerate(files)]
+
+        self.mock_service.upload_files = mocker.AsyncMock(side_effect=upload_files)
+
+        async def get_files(file_ids):
+            self.requested = file_ids
+            yield 2, None
+            yield 1, "Привет"
+            yield 3, RuntimeError("minio down")
+
+        self.mock_service.get_files = get_files
+
+        app = FastAPI()
+        app.include_router(files_api.router)
+        app.dependency_overrides[file_service] = lambda: self.mock_service
+        self.client = TestClient(app)
+
+    def test_returns_result_per_file_in_order(self):
+        response = self.client.post(
+            "/files/batch",
+            files=[
+                ("files", ("a.txt", b"first", "text/plain")),
+                ("files", ("b.pdf", b"%PDF", "application/pdf")),
+                ("files", ("c.txt", b"second", "text/plain")),
+            ],
+        )
+
+        assert response.status_code == 200
+        body = response.json()["files"]
+        assert [(f["name"], f["file_id"]) for f in body] == [("a.txt", 1), ("b.pdf", None), ("c.txt", 2)]
+        assert body[1]["error"]
+        assert self.received == [("a.txt", b"first"), ("c.txt", b"second")]
+
+    def test_rejects_too_many_files(self):
+        config = load_config()
+        config.uploads.max_batch_files = 1
+        self.client.app.dependency_overrides[app_config] = lambda: config
+
+        response = self.client.post(
+            "/files/batch",
+            files=[("files", ("a.txt", b"1", "text/plain")), ("files", ("b.txt", b"2", "text/plain"))],
+        )
+
+        assert response.status_code == 413
+        self.mock_service.upload_files.assert_not_called()
+
+    def test_batch_get_streams_ndjson(self):
+        response = self.client.post("/files/batch-get", json={"file_ids": [1, 2, 3]})
+
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[:2] == [
+            {"file_id": 2, "file_text": None, "error": None},
+            {"file_id": 1, "file_text": "Привет", "error": None},
+        ]
+        assert lines[2]["file_id"] == 3 and lines[2]["file_text"] is None and lines[2]["error"]
+        assert self.requested == [1, 2, 3]
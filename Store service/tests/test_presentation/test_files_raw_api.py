@@ -0,0 +1,79 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from application.services.file_service import FileService
+from domain.schemas.file import FileSchema
+from presentation.API.files import router
+from presentation.dependencies.sevices import file_service
+
+CONTENT = "Привет".encode("utf-8")
+FILE_HASH = "a" * 64
+
+
+class TestFileRawAPI:
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker):
+        self.stream_calls = []
+
+        async def stream(location, offset=0, length=None):
+            self.stream_calls.append((location, offset, length))
+            end = offset + length if length is not None else len(CONTENT)
+            for i in range(offset, end, 4):
+                yield CONTENT[i:min(i + 4, end)]
+
+        self.mock_service = mocker.Mock(spec=FileService)
+        self.mock_service.get_file_info = mocker.AsyncMock(
+            return_value=FileSchema(id=1, name="a.txt", hash=FILE_HASH, location="files/a.txt")
+        )
+        self.mock_service.get_file_size = mocker.AsyncMock(return_value=len(CONTENT))
+        self.mock_service.stream_file = stream
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[file_service] = lambda: self.mock_service
+        self.client = TestClient(app)
+
+    def test_streams_raw_bytes_with_headers(self):
+        response = self.client.get("/files/1/raw")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["Content-Type"] == "text/plain; charset=utf-8"
+        assert response.headers["Content-Length"] == str(len(CONTENT))
+        assert response.headers["ETag"] == f'"{FILE_HASH}"'
+        assert self.stream_calls == [("files/a.txt", 0, None)]
+
+    def test_unknown_file(self):
+        self.mock_service.get_file_info.return_value = None
+
+        response = self.client.get("/files/2/raw")
+
+        assert response.status_code == 404
+        self.mock_service.get_file_size.assert_not_called()
+
+    def test_if_none_match_skips_streaming(self):
+        response = self.client.get("/files/1/raw", headers={"If-None-Match": f'"{FILE_HASH}"'})
+
+        assert response.status_code == 304
+        assert self.stream_calls == []
+
+    def test_if_none_match_star_does_not_match_missing_object(self):
+        self.mock_service.get_file_size.return_value = None
+
+        response = self.client.get("/files/1/raw", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 404
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get("/files/1/raw", headers={"Range": "bytes=2-5"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[2:6]
+        assert response.headers["Content-Range"] == f"bytes 2-5/{len(CONTENT)}"
+        assert self.stream_calls == [("files/a.txt", 2, 4)]
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get("/files/1/raw", headers={"Range": "bytes=100-"})
+
+        assert response.status_code == 416
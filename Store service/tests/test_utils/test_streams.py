@@ -0,0 +1,51 @@
+import hashlib
+from io import BytesIO
+
+import pytest
+
+from utils.streams import DigestingUTF8Reader
+
+
+class TestDigestingUTF8Reader:
+
+    def test_hash_matches_whole_content(self):
+        # Arrange
+        content = "Привет, мир! ".encode("utf-8") * 1000
+        reader = DigestingUTF8Reader(BytesIO(content))
+
+        # Act
+        chunks = []
+        while chunk := reader.read(7):
+            chunks.append(chunk)
+
+        # Assert
+        assert b"".join(chunks) == content
+        assert reader.size == len(content)
+        assert reader.hexdigest() == hashlib.sha256(content).hexdigest()
+
+    def test_multibyte_char_split_between_chunks_is_valid(self):
+        # Arrange
+        reader = DigestingUTF8Reader(BytesIO("ж".encode("utf-8")))
+
+        # Act
+        reader.read(1)
+        reader.read(1)
+        reader.read(1)
+
+        # Assert
+        assert reader.hexdigest() == hashlib.sha256("ж".encode("utf-8")).hexdigest()
+
+    def test_invalid_utf8_raises(self):
+        reader = DigestingUTF8Reader(BytesIO(b"ok\xff\xfe"))
+
+        with pytest.raises(UnicodeDecodeError):
+            reader.read()
+
+    def test_truncated_sequence_raises_at_eof(self):
+        # Arrange
+        reader = DigestingUTF8Reader(BytesIO("ж".encode("utf-8")[:1]))
+        reader.read()
+
+        # Act / Assert
+        with pytest.raises(UnicodeDecodeError):
+            reader.read()